@@ -2,9 +2,12 @@ const $ = (id) => document.getElementById(id);
 
 let currentJobId = null;
 let pollTimer = null;
+let statusSource = null;
 let nounsCache = [];
+let nounsTotal = 0;
+let nounsRequestSeq = 0;
 let uploadingDict = false;
-let drawerState = { noun: "", count: 0, inDict: false };
+let drawerState = { noun: "", count: 0, inDict: false, items: [] };
 let marksCache = [];
 let dictWordsCache = [];
 
@@ -33,6 +36,19 @@ function escapeHtml(str) {
     .replaceAll("'", "&#039;");
 }
 
+function highlightSpans(text, spans) {
+  if (!spans || !spans.length) return escapeHtml(text);
+  const chars = Array.from(String(text));
+  let out = "";
+  let pos = 0;
+  for (const [start, end] of spans) {
+    out += escapeHtml(chars.slice(pos, start).join(""));
+    out += `<mark>${escapeHtml(chars.slice(start, end).join(""))}</mark>`;
+    pos = end;
+  }
+  return out + escapeHtml(chars.slice(pos).join(""));
+}
+
 function highlight(sentence, noun) {
   const s = escapeHtml(sentence);
   const n = escapeHtml(noun);
@@ -57,23 +73,61 @@ function stopPolling() {
     clearInterval(pollTimer);
     pollTimer = null;
   }
+  if (statusSource) {
+    statusSource.close();
+    statusSource = null;
+  }
+}
+
+function formatStatus(st) {
+  let text = st.message || st.state;
+  if (st.state === "running" && st.pages_total) {
+    text += `（${st.pages_done ?? 0}/${st.pages_total} 页`;
+    if (st.eta_seconds != null) text += `，约剩 ${Math.ceil(st.eta_seconds)} 秒`;
+    text += "）";
+  }
+  return text;
+}
+
+async function applyStatus(st) {
+  setStatus(formatStatus(st), st.progress ?? 0);
+
+  if (st.state === "done") {
+    stopPolling();
+    $("uploadBtn").disabled = false;
+    await refreshNouns();
+  }
+  if (st.state === "error") {
+    stopPolling();
+    $("uploadBtn").disabled = false;
+  }
+}
+
+function watchStatus() {
+  stopPolling();
+  if (!window.EventSource) {
+    pollTimer = setInterval(pollStatus, 1000);
+    return;
+  }
+  const jobId = currentJobId;
+  statusSource = new EventSource(`/api/jobs/${jobId}/events`);
+  statusSource.addEventListener("status", (ev) => {
+    if (jobId !== currentJobId) return;
+    applyStatus(JSON.parse(ev.data));
+  });
+  statusSource.onerror = () => {
+    // stream unavailable (proxy, server restart): fall back to polling
+    if (jobId !== currentJobId || !statusSource) return;
+    stopPolling();
+    pollTimer = setInterval(pollStatus, 1000);
+  };
 }
 
 async function pollStatus() {
   if (!currentJobId) return;
   try {
     const st = await api(`/api/jobs/${currentJobId}/status`);
-    setStatus(st.message || st.state, st.progress ?? 0);
-
-    if (st.state === "done") {
-      stopPolling();
-      $("uploadBtn").disabled = false;
-      await refreshNouns();
-    }
-    if (st.state === "error") {
-      stopPolling();
-      $("uploadBtn").disabled = false;
-    }
+    await applyStatus(st);
   } catch (e) {
     setStatus(`发生错误: ${e.message}`, 100);
     $("uploadBtn").disabled = false;
@@ -82,13 +136,25 @@ async function pollStatus() {
 }
 
 async function refreshNouns() {
-  if (!currentJobId) return;
   currentPage = 1; // Reset to first page on refresh/filter
+  await loadNounsPage();
+}
+
+async function loadNounsPage() {
+  if (!currentJobId) return;
   const query = $("query").value.trim();
   const sort = $("sort").value;
+  const match = $("matchMode").value;
+  const minLen = parseInt($("minLen").value, 10) || 0;
+  const seq = ++nounsRequestSeq;
   try {
-    const nouns = await api(`/api/jobs/${currentJobId}/nouns?query=${encodeURIComponent(query)}&sort=${encodeURIComponent(sort)}`);
-    nounsCache = nouns;
+    const res = await api(
+      `/api/jobs/${currentJobId}/nouns?query=${encodeURIComponent(query)}&sort=${encodeURIComponent(sort)}` +
+        `&match=${match}&min_len=${minLen}&page=${currentPage}&page_size=${pageSize}`
+    );
+    if (seq !== nounsRequestSeq) return; // a newer filter/page request superseded this one
+    nounsCache = res.items || [];
+    nounsTotal = res.total || 0;
     renderNouns();
   } catch (e) {
     console.error("刷新列表失败:", e);
@@ -96,12 +162,9 @@ async function refreshNouns() {
 }
 
 function renderNouns() {
-  const minLen = parseInt($("minLen").value, 10);
-  const filtered = nounsCache.filter((x) => String(x.noun || "").length >= minLen);
-  
   const metaEl = $("nounsMeta");
-  if (nounsCache.length > 0) {
-    metaEl.textContent = `找到 ${nounsCache.length} 个名词，已显示 ${filtered.length} 个`;
+  if (nounsTotal > 0) {
+    metaEl.textContent = `找到 ${nounsTotal} 个名词，当前显示 ${nounsCache.length} 个`;
   } else {
     metaEl.textContent = "未解析或未提取到相关名词";
   }
@@ -109,7 +172,7 @@ function renderNouns() {
   const el = $("nouns");
   el.innerHTML = "";
   
-  if (filtered.length === 0) {
+  if (nounsCache.length === 0) {
     el.innerHTML = `
       <div class="empty-state">
         <i data-lucide="search"></i>
@@ -121,20 +184,15 @@ function renderNouns() {
     return;
   }
 
-  // Pagination logic
-  const totalPages = Math.ceil(filtered.length / pageSize);
-  if (currentPage > totalPages) currentPage = Math.max(1, totalPages);
-  
-  const start = (currentPage - 1) * pageSize;
-  const end = start + pageSize;
-  const pageItems = filtered.slice(start, end);
+  // Pagination is done server-side; nounsCache holds the current page only
+  const totalPages = Math.ceil(nounsTotal / pageSize);
 
-  for (const item of pageItems) {
+  for (const item of nounsCache) {
     const card = document.createElement("div");
     card.className = "noun-card";
     card.innerHTML = `
       <div class="noun-header">
-        <span class="noun-word">${escapeHtml(item.noun)}</span>
+        <span class="noun-word">${highlightSpans(item.noun, item.match)}</span>
         <span class="noun-count">${escapeHtml(item.count)}</span>
       </div>
       <div class="noun-badges">
@@ -165,9 +223,9 @@ function renderPagination(totalPages) {
     btn.innerHTML = text;
     btn.disabled = disabled;
     if (!disabled && !active) {
-      btn.addEventListener("click", () => {
+      btn.addEventListener("click", async () => {
         currentPage = page;
-        renderNouns();
+        await loadNounsPage();
         window.scrollTo({ top: $("nouns").offsetTop - 100, behavior: "smooth" });
       });
     }
@@ -210,7 +268,7 @@ function renderPagination(totalPages) {
 }
 
 function openDrawer(noun, count, inDict, maybeWrong) {
-  drawerState = { noun, count, inDict: !!inDict, maybeWrong: !!maybeWrong };
+  drawerState = { noun, count, inDict: !!inDict, maybeWrong: !!maybeWrong, items: [] };
   $("drawerTitle").textContent = escapeHtml(noun);
   $("drawerSubtitle").textContent = `累计出现 ${count} 次`;
   updateDrawerDictStatus();
@@ -228,21 +286,40 @@ function closeDrawer() {
   $("drawerOverlay").classList.remove("active");
 }
 
-async function loadOccurrences(noun) {
+const occPageSize = 100;
+
+function markButtonHtml(marked) {
+  return marked
+    ? '<i data-lucide="bookmark-minus" style="width:14px"></i> 取消标记'
+    : '<i data-lucide="bookmark-plus" style="width:14px"></i> 标记句子';
+}
+
+async function loadOccurrences(noun, cursor = 0) {
   if (!currentJobId) return;
   try {
-    const occ = await api(`/api/jobs/${currentJobId}/nouns/${encodeURIComponent(noun)}/occurrences`);
+    const occ = await api(
+      `/api/jobs/${currentJobId}/nouns/${encodeURIComponent(noun)}/occurrences?cursor=${cursor}&limit=${occPageSize}`
+    );
+    // the drawer may have moved on to another noun while this page loaded
+    if (drawerState.noun !== noun) return;
     const list = $("occList");
-    list.innerHTML = "";
-    
-    if (!occ.length) {
+    if (cursor === 0) {
+      list.innerHTML = "";
+      drawerState.items = [];
+    }
+    list.querySelector(".occ-more")?.remove();
+
+    if (!occ.total) {
       list.innerHTML = `<div class="empty-state"><p>没有记录</p></div>`;
       return;
     }
-    
-    for (const x of occ) {
+    $("drawerSubtitle").textContent = `累计出现 ${occ.total} 次`;
+
+    for (const x of occ.items) {
       const item = document.createElement("div");
       item.className = "occ-card";
+      item.dataset.index = String(drawerState.items.length);
+      drawerState.items.push(x);
       item.innerHTML = `
         <div class="occ-meta">
           <span>PAGE ${x.page} · LINE ${x.line}</span>
@@ -253,14 +330,39 @@ async function loadOccurrences(noun) {
       const actions = item.querySelector(".occ-actions");
       const markBtn = document.createElement("button");
       markBtn.className = "btn btn-sm";
-      markBtn.innerHTML = isMarked(noun, x) ? '<i data-lucide="bookmark-minus" style="width:14px"></i> 取消标记' : '<i data-lucide="bookmark-plus" style="width:14px"></i> 标记句子';
+      markBtn.innerHTML = markButtonHtml(isMarked(noun, x));
       markBtn.addEventListener("click", () => markSentence(noun, x));
       actions.appendChild(markBtn);
       list.appendChild(item);
     }
+
+    if (occ.next_cursor != null) {
+      const more = document.createElement("div");
+      more.className = "occ-more";
+      more.style.cssText = "display: flex; justify-content: center; padding: 12px 0;";
+      const moreBtn = document.createElement("button");
+      moreBtn.className = "btn btn-sm";
+      moreBtn.textContent = `加载更多（已显示 ${drawerState.items.length} / ${occ.total}）`;
+      moreBtn.addEventListener("click", () => {
+        moreBtn.disabled = true;
+        moreBtn.textContent = "正在加载...";
+        loadOccurrences(noun, occ.next_cursor);
+      });
+      more.appendChild(moreBtn);
+      list.appendChild(more);
+    }
     lucide.createIcons();
   } catch (e) {
-    $("occList").innerHTML = `<div class="empty-state"><p>加载失败: ${e.message}</p></div>`;
+    if (cursor === 0) {
+      $("occList").innerHTML = `<div class="empty-state"><p>加载失败: ${e.message}</p></div>`;
+    } else {
+      alert(`加载失败：${e.message}`);
+      const moreBtn = $("occList").querySelector(".occ-more .btn");
+      if (moreBtn) {
+        moreBtn.disabled = false;
+        moreBtn.textContent = "加载更多";
+      }
+    }
   }
 }
 
@@ -321,21 +423,12 @@ function isMarked(noun, occ) {
 }
 
 function renderOccurrencesWithMarks(currentNoun) {
-  const cards = Array.from(document.querySelectorAll(".occ-card"));
-  if (!cards.length) return;
-  marksCache = marksCache || [];
-  cards.forEach((div) => {
-    const locText = div.querySelector(".occ-meta")?.textContent || "";
-    const match = /PAGE\s+(\d+)\s+·\s+LINE\s+(\d+)/.exec(locText);
-    const sentenceEl = div.querySelector(".occ-text");
-    const sentence = sentenceEl ? sentenceEl.textContent || "" : "";
-    if (!match) return;
-    const page = parseInt(match[1], 10);
-    const line = parseInt(match[2], 10);
-    const marked = isMarked(currentNoun, { page, line, sentence });
+  const items = drawerState.items || [];
+  document.querySelectorAll(".occ-card").forEach((div) => {
+    const x = items[Number(div.dataset.index)];
     const btn = div.querySelector(".occ-actions .btn");
-    if (btn) {
-      btn.innerHTML = marked ? '<i data-lucide="bookmark-minus" style="width:14px"></i> 取消标记' : '<i data-lucide="bookmark-plus" style="width:14px"></i> 标记句子';
+    if (x && btn) {
+      btn.innerHTML = markButtonHtml(isMarked(currentNoun, x));
     }
   });
   lucide.createIcons();
@@ -386,6 +479,7 @@ async function uploadFile() {
   closeUploadModal(); // Auto close on start
   stopPolling();
   nounsCache = [];
+  nounsTotal = 0;
   renderNouns();
 
   setStatus("准备上传...", 1);
@@ -398,7 +492,7 @@ async function uploadFile() {
     currentJobId = res.job_id;
     
     setStatus("上传成功，正在解析内容...", 5);
-    pollTimer = setInterval(pollStatus, 1000);
+    watchStatus();
   } catch (e) {
     setStatus(`上传失败: ${e.message}`, 100);
     $("uploadBtn").disabled = false;
@@ -544,10 +638,8 @@ function wire() {
   $("uploadBtn").addEventListener("click", uploadFile);
   $("query").addEventListener("input", refreshNouns);
   $("sort").addEventListener("change", refreshNouns);
-  $("minLen").addEventListener("change", () => {
-    currentPage = 1;
-    renderNouns();
-  });
+  $("matchMode").addEventListener("change", refreshNouns);
+  $("minLen").addEventListener("change", refreshNouns);
 
   $("dictDownload").addEventListener("click", downloadDict);
   $("dictUpload").addEventListener("click", uploadDict);
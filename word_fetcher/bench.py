@@ -0,0 +1,381 @@
+"""
+Benchmark harness for the extraction / indexing pipeline and the query API.
+
+    python -m word_fetcher.bench --pages 50 --out bench.json
+
+Runs against a throwaway data directory (WORD_FETCHER_DATA_DIR) seeded with a
+copy of the real dictionaries, so numbers reflect the production analyzer but
+nothing under data/ is touched. Synthetic Chinese PDFs are generated with
+PyMuPDF from a fixed seed, so runs with the same arguments are comparable.
+Results are printed (or written with --out) as JSON.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None  # type: ignore[assignment]
+
+# --------- synthetic input ----------
+_MODIFIERS = ["智能", "金融", "医疗", "教育", "交通", "能源", "安全", "工业", "农业", "城市", "数字", "环境"]
+_HEADS = [
+    "数据", "模型", "平台", "合同", "供应商", "服务", "系统", "算法", "设备", "项目", "银行", "医院",
+    "学校", "公司", "网络", "技术", "市场", "产品", "客户", "政策", "标准", "机构", "资金", "方案",
+]
+_TEMPLATES = [
+    "{0}与{1}共同推进{2}建设。",
+    "甲方应当按照{0}约定向乙方支付{1}费用；",
+    "{0}在{1}领域的应用越来越广泛！",
+    "乙方负责提供{0}的部署和{1}维护服务。",
+    "本条款所称{0}包括{1}、{2}等相关内容",
+    "双方同意由{0}协调解决{1}纠纷。",
+]
+_BOILERPLATE = ["本合同一式两份，具有同等法律效力。", "未经书面许可不得向第三方披露。"]
+# frequent characters for synthetic noun tables (query benchmarks)
+_CHARS = "的一是在不了有和人这中大为上个国我以要他时来用们生到作地于出就分对成会可主发年动同工也能下过子说产种面而方后多定行学法所民得经十三之进着等部度家电力里如水化高自二理起小物现实加量都两体制机当使点从业本去把性好应开它合还因由其些然前外天政四日那社义事平形相全表间样与关各重新线内数正心反你明看原又么利比或但质气第向道命此变条只没结解问意建月公无系军很情者最立代想已通并提直题党程展五果料象员革位入常文总次品式活设及管特件长求老头基资边流路级少图山统接知较将组见计别她手角期根论运农指几九区强放决西被干做必战先回则任取据处队南给色光门即保治北造百规热领七海口东导器压志世金增争济阶油思术极交受联什认六共权收证改清己美再采转更单风切打白教速花带安场身车例真务具万每目至达走积示议声报斗完类八离华名确才科张信马节话米整空元况今集温传土许步群广石记需段研界拉林律叫且究观越织装影算低持音众书布复容儿须际商非验连断深难近矿千周委素技备半办青省列习响约支般史感劳便团往酸历市克何除消构府称太准精值号率族维划选标写存候毛亲快效斯院查江型眼王按格养易置派层片始却专状育厂京识适属圆包火住调满县局照参红细引听该铁价严"
+
+
+def _vocabulary(rng: random.Random) -> List[str]:
+    words = [m + h for m in _MODIFIERS for h in _HEADS]
+    rng.shuffle(words)
+    return words
+
+
+def _sentence(rng: random.Random, vocab: List[str]) -> str:
+    template = rng.choice(_TEMPLATES)
+    return template.format(*(rng.choice(vocab) for _ in range(3)))
+
+
+def make_pdf(path: Path, pages: int, lines_per_page: int, seed: int = 1) -> None:
+    """
+    A Chinese PDF with templated sentences over a fixed noun vocabulary plus
+    repeated header/footer boilerplate, like the contracts we process.
+    """
+    import fitz  # PyMuPDF
+
+    rng = random.Random(seed)
+    vocab = _vocabulary(rng)
+    doc = fitz.open()
+    for p in range(1, pages + 1):
+        page = doc.new_page()
+        y = 60
+        page.insert_text((60, y), f"第{p}页 合同编号 WF-{seed:04d}", fontname="china-s", fontsize=9)
+        for _ in range(lines_per_page):
+            y += 22
+            page.insert_text((60, y), _sentence(rng, vocab), fontname="china-s", fontsize=10)
+        page.insert_text((60, y + 30), rng.choice(_BOILERPLATE), fontname="china-s", fontsize=9)
+    doc.save(str(path))
+    doc.close()
+
+
+def synthetic_index(noun_count: int, seed: int = 1) -> Dict[str, Any]:
+    """
+    An index dict (the _build_index shape) with noun_count distinct nouns and
+    Zipf-like counts, for query benchmarks at sizes no test PDF reaches.
+    """
+    rng = random.Random(seed)
+    nouns: List[str] = []
+    seen = set()
+    while len(nouns) < noun_count:
+        word = "".join(rng.choice(_CHARS) for _ in range(rng.randint(2, 4)))
+        if word not in seen:
+            seen.add(word)
+            nouns.append(word)
+    sentences = [_sentence(rng, _vocabulary(rng)) for _ in range(2000)]
+    occurrences: Dict[str, List[Dict[str, Any]]] = {}
+    for rank, noun in enumerate(nouns, start=1):
+        count = max(1, int(200 / rank**0.7))
+        occ = [
+            {"page": rng.randint(1, 500), "line": rng.randint(1, 40), "sentence": rng.choice(sentences)}
+            for _ in range(count)
+        ]
+        occ.sort(key=lambda o: (o["page"], o["line"]))
+        occurrences[noun] = occ
+    items = [{"noun": n, "count": len(o)} for n, o in occurrences.items()]
+    items.sort(key=lambda x: (-x["count"], x["noun"]))
+    return {"nouns": items, "occurrences_by_noun": occurrences}
+
+
+# --------- measurement helpers ----------
+def _timed(fn: Callable[[], Any]) -> Tuple[Any, float]:
+    t0 = time.perf_counter()
+    out = fn()
+    return out, time.perf_counter() - t0
+
+
+def _peak_bytes(fn: Callable[[], Any]) -> int:
+    """
+    Peak Python heap allocated while fn runs (separate pass: tracemalloc
+    slows the code down, so it never overlaps a timed run).
+    """
+    tracemalloc.start()
+    try:
+        fn()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def _rate(n: float, seconds: float) -> float:
+    return round(n / seconds, 1) if seconds > 0 else 0.0
+
+
+def _latency(fn: Callable[[], Any], repeat: int) -> Dict[str, float]:
+    samples = []
+    for _ in range(repeat):
+        _out, dt = _timed(fn)
+        samples.append(dt * 1000)
+    samples.sort()
+    return {
+        "median_ms": round(statistics.median(samples), 3),
+        "p95_ms": round(samples[min(len(samples) - 1, int(len(samples) * 0.95))], 3),
+        "min_ms": round(samples[0], 3),
+    }
+
+
+def _log(msg: str) -> None:
+    print(msg, file=sys.stderr, flush=True)
+
+
+# --------- benchmarks ----------
+def bench_pipeline(pdf: Path, repeat_memory: bool) -> Dict[str, Any]:
+    from word_fetcher.work import jobs
+    from word_fetcher.work.layout import extract_pages
+    from word_fetcher.work.nlp import iter_nouns_batch
+    from word_fetcher.work.storage import base_data_dir
+
+    out: Dict[str, Any] = {}
+    pages, dt = _timed(lambda: list(extract_pages(pdf)))
+    line_count = sum(len(para) for _p, paragraphs in pages for para in paragraphs)
+    out["extract"] = {"seconds": round(dt, 4), "pages": len(pages), "lines": line_count, "pages_per_s": _rate(len(pages), dt)}
+
+    def split() -> List[str]:
+        return [s for _p, paragraphs in pages for _line, s in jobs._page_sentences(paragraphs)]
+
+    sentences, dt = _timed(split)
+    out["sentences"] = {"seconds": round(dt, 4), "sentences": len(sentences), "sentences_per_s": _rate(len(sentences), dt)}
+
+    def analyze() -> int:
+        n = 0
+        step = jobs._NOUN_BATCH_SENTENCES
+        for i in range(0, len(sentences), step):
+            n += sum(len(nouns) for nouns in iter_nouns_batch(sentences[i : i + step]))
+        return n
+
+    noun_count, dt = _timed(analyze)
+    out["nouns"] = {
+        "seconds": round(dt, 4),
+        "nouns": noun_count,
+        "sentences_per_s": _rate(len(sentences), dt),
+        "nouns_per_s": _rate(noun_count, dt),
+    }
+
+    index, dt = _timed(lambda: jobs._build_index(iter(pages)))
+    out["build_index"] = {
+        "seconds": round(dt, 4),
+        "distinct_nouns": index.distinct_nouns(),
+        "pages_per_s": _rate(len(pages), dt),
+        "sentences_per_s": _rate(len(sentences), dt),
+    }
+
+    result_path = base_data_dir() / "bench-result.bin"
+    _none, dt = _timed(lambda: jobs.write_result(result_path, index))
+    out["write_result"] = {"seconds": round(dt, 4), "bytes": result_path.stat().st_size}
+
+    if repeat_memory:
+        out["extract"]["peak_bytes"] = _peak_bytes(lambda: list(extract_pages(pdf)))
+        out["sentences"]["peak_bytes"] = _peak_bytes(split)
+        out["nouns"]["peak_bytes"] = _peak_bytes(analyze)
+        out["build_index"]["peak_bytes"] = _peak_bytes(lambda: jobs._build_index(iter(pages)))
+    return out
+
+
+def bench_run_job(pdf: Path, workers: int) -> Dict[str, Any]:
+    """
+    End to end through run_job, sequential and with the page-shard pool.
+    """
+    from word_fetcher.work import jobs
+    from word_fetcher.work.storage import job_dir
+
+    out: Dict[str, Any] = {}
+    page_count = jobs._pdf_page_count(pdf)
+    for label, n in (("sequential", 1), ("parallel", workers)):
+        if label == "parallel" and (n <= 1 or page_count < jobs._PARALLEL_MIN_PAGES):
+            continue
+        os.environ["WORD_FETCHER_WORKERS"] = str(n)
+        if n > 1:
+            # the server starts its shard pool at start-up, not in the first job
+            jobs.warm_shard_pool()
+        job_id = f"bench-{label}"
+        shutil.copy(pdf, job_dir(job_id) / pdf.name)
+        _none, dt = _timed(lambda: jobs.run_job(job_id))
+        state = (jobs.get_job_status(job_id) or {}).get("state")
+        out[label] = {"seconds": round(dt, 4), "workers": n, "pages_per_s": _rate(page_count, dt), "state": state}
+    # stop the shard pool's workers before the temporary data directory goes away
+    jobs.shutdown_shard_pool()
+    return out
+
+
+def bench_endpoints(sizes: List[int], repeat: int) -> Dict[str, Any]:
+    from word_fetcher.work import jobs
+    from word_fetcher.work.results import result_cache
+
+    out: Dict[str, Any] = {}
+    for size in sizes:
+        _log(f"endpoints: {size} nouns")
+        job_id = f"bench-nouns-{size}"
+        index = synthetic_index(size)
+        path = jobs._result_path(job_id)
+        _none, write_s = _timed(lambda: jobs.write_result(path, index))
+        nouns = [x["noun"] for x in index["nouns"]]
+        top, median = nouns[0], nouns[len(nouns) // 2]
+        del index
+
+        calls: Dict[str, Callable[[], Any]] = {
+            "nouns_first_page": lambda: jobs.list_job_nouns(job_id, None, "count_desc"),
+            "nouns_alpha_mid_page": lambda: jobs.list_job_nouns(job_id, None, "alpha", page=max(1, size // 100)),
+            "nouns_substring_1char": lambda: jobs.list_job_nouns(job_id, median[0], "count_desc"),
+            "nouns_substring_2char": lambda: jobs.list_job_nouns(job_id, median[:2], "count_desc"),
+            "nouns_prefix": lambda: jobs.list_job_nouns(job_id, median[0], "count_desc", match="prefix"),
+            "nouns_min_len": lambda: jobs.list_job_nouns(job_id, None, "count_desc", min_len=3),
+            "occurrences_top": lambda: jobs.list_noun_occurrences(job_id, top),
+            "occurrences_median": lambda: jobs.list_noun_occurrences(job_id, median),
+            "occurrences_top_page_range": lambda: jobs.list_noun_occurrences(job_id, top, page_from=200, page_to=300),
+        }
+        result_cache.invalidate(job_id)
+        _none, cold = _timed(calls["nouns_first_page"])
+        row: Dict[str, Any] = {
+            "write_result_s": round(write_s, 4),
+            "result_bytes": path.stat().st_size,
+            "cold_first_page_ms": round(cold * 1000, 3),
+        }
+        for name, fn in calls.items():
+            fn()  # warm
+            row[name] = _latency(fn, repeat)
+        out[str(size)] = row
+    return out
+
+
+def _meta(args: argparse.Namespace) -> Dict[str, Any]:
+    import fitz
+    import jieba
+
+    from word_fetcher.work.nlp import _get_batch_analyzer, sentence_cache
+
+    try:
+        rev = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=Path(__file__).resolve().parent.parent,
+            capture_output=True,
+            text=True,
+            timeout=10,
+        ).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        rev = ""
+    return {
+        "timestamp": int(time.time()),
+        "git_rev": rev,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "pymupdf": fitz.VersionBind,
+        "jieba": jieba.__version__,
+        "analyzer": _get_batch_analyzer()[0],
+        "sentence_cache": sentence_cache.enabled,
+        "args": vars(args),
+    }
+
+
+def _peak_rss_bytes() -> Optional[int]:
+    """
+    Peak resident set size of this process; None where the resource module is
+    unavailable (Windows).
+    """
+    if resource is None:
+        return None
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss if sys.platform == "darwin" else rss * 1024
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m word_fetcher.bench", description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--pages", type=int, default=50, help="pages in the synthetic PDF")
+    parser.add_argument("--lines-per-page", type=int, default=30)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--nouns", default="1000,10000,100000", help="comma-separated vocabulary sizes for API latency")
+    parser.add_argument("--repeat", type=int, default=20, help="timed calls per endpoint")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="processes for the parallel run_job pass")
+    parser.add_argument("--sentence-cache", action="store_true", help="keep the sentence memo enabled (off by default)")
+    parser.add_argument("--no-memory", action="store_true", help="skip the tracemalloc pass")
+    parser.add_argument("--skip-pipeline", action="store_true")
+    parser.add_argument("--skip-endpoints", action="store_true")
+    parser.add_argument("--keep", action="store_true", help="keep the temporary data directory")
+    parser.add_argument("--out", help="write JSON here instead of stdout")
+    args = parser.parse_args(argv)
+
+    from word_fetcher.work.storage import dicts_dir
+
+    real_dicts = dicts_dir()
+    data_dir = Path(tempfile.mkdtemp(prefix="word_fetcher_bench_"))
+    shutil.copytree(real_dicts, data_dir / "dicts")
+    # must be set before the work modules are imported (module-level caches)
+    os.environ["WORD_FETCHER_DATA_DIR"] = str(data_dir)
+    if not args.sentence_cache:
+        os.environ["WORD_FETCHER_SENTENCE_CACHE"] = "0"
+    os.environ.pop("WORD_FETCHER_SENTENCE_CACHE_DISK", None)
+
+    try:
+        from word_fetcher.work.nlp import warm_up
+
+        report: Dict[str, Any] = {}
+        _none, warm_s = _timed(warm_up)
+        report["warm_up_s"] = round(warm_s, 4)
+        report["meta"] = _meta(args)
+
+        if not args.skip_pipeline:
+            pdf = data_dir / "bench.pdf"
+            _log(f"generating {args.pages}-page PDF")
+            make_pdf(pdf, args.pages, args.lines_per_page, args.seed)
+            _log("pipeline stages")
+            report["pipeline"] = bench_pipeline(pdf, not args.no_memory)
+            _log("run_job")
+            report["run_job"] = bench_run_job(pdf, args.workers)
+
+        if not args.skip_endpoints:
+            sizes = [int(x) for x in args.nouns.split(",") if x.strip()]
+            report["endpoints"] = bench_endpoints(sizes, max(1, args.repeat))
+
+        report["peak_rss_bytes"] = _peak_rss_bytes()
+    finally:
+        if args.keep:
+            _log(f"data kept in {data_dir}")
+        else:
+            shutil.rmtree(data_dir, ignore_errors=True)
+
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.out:
+        Path(args.out).write_text(text + "\n", encoding="utf-8")
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
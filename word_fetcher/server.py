@@ -1,4 +1,5 @@
 import os
+import threading
 from pathlib import Path
 
 import uvicorn
@@ -7,6 +8,18 @@ from fastapi.responses import FileResponse
 from fastapi.staticfiles import StaticFiles
 
 from word_fetcher.web.api import api_router
+from word_fetcher.web.limits import BodySizeLimitMiddleware
+from word_fetcher.web.timing import RequestMetricsMiddleware
+from word_fetcher.work.batches import max_batch_bytes
+from word_fetcher.work.jobs import flush_statuses, max_upload_bytes, shutdown_shard_pool, sync_corpus, warm_shard_pool
+from word_fetcher.work.nlp import warm_up
+
+
+def _warm_up() -> None:
+    warm_up()
+    warm_shard_pool()
+    # backfill the corpus index with jobs it has not seen (e.g. after an upgrade)
+    sync_corpus()
 
 
 def create_app() -> FastAPI:
@@ -17,6 +30,17 @@ def create_app() -> FastAPI:
     static_dir = web_dir / "static"
 
     app.include_router(api_router, prefix="/api")
+    app.add_middleware(BodySizeLimitMiddleware, max_bytes=max_upload_bytes(), paths=("/api/upload",))
+    app.add_middleware(BodySizeLimitMiddleware, max_bytes=max_batch_bytes(), paths=("/api/batches",))
+    app.add_middleware(RequestMetricsMiddleware)
+
+    # load dictionaries in the background; /api/health reports when done
+    app.add_event_handler(
+        "startup", lambda: threading.Thread(target=_warm_up, name="dict-warm-up", daemon=True).start()
+    )
+    # statuses are persisted lazily; write out whatever is pending
+    app.add_event_handler("shutdown", flush_statuses)
+    app.add_event_handler("shutdown", shutdown_shard_pool)
 
     app.mount("/static", StaticFiles(directory=str(static_dir)), name="static")
 
@@ -1,12 +1,18 @@
 from fastapi import APIRouter
 
+from word_fetcher.web.routes.batches import router as batches_router
+from word_fetcher.web.routes.corpus import router as corpus_router
 from word_fetcher.web.routes.dict import router as dict_router
 from word_fetcher.web.routes.jobs import router as jobs_router
+from word_fetcher.web.routes.system import router as system_router
 from word_fetcher.web.routes.upload import router as upload_router
 
 api_router = APIRouter()
 api_router.include_router(upload_router)
+api_router.include_router(batches_router)
 api_router.include_router(jobs_router)
 api_router.include_router(dict_router)
+api_router.include_router(corpus_router)
+api_router.include_router(system_router)
 
 
@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+import json
+from typing import Tuple
+
+# multipart boundaries and form fields on top of the file itself
+_MULTIPART_SLACK = 64 * 1024
+
+
+class BodySizeLimitMiddleware:
+    """
+    Cap the whole request body on upload paths (all parts of one multipart
+    request together), answering 413: by Content-Length before anything is
+    read, otherwise as soon as the stream passes the limit, when the route sees
+    a disconnected client and its upload sinks discard what they wrote (see
+    web/multipart.py). Per-file limits are enforced by the sinks themselves.
+    """
+
+    def __init__(self, app, max_bytes: int, paths: Tuple[str, ...]):
+        self.app = app
+        self.max_bytes = max_bytes + _MULTIPART_SLACK
+        self.paths = paths
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not scope["path"].startswith(self.paths):
+            await self.app(scope, receive, send)
+            return
+
+        for name, value in scope.get("headers", []):
+            if name == b"content-length" and value.isdigit() and int(value) > self.max_bytes:
+                await self._reject(send)
+                return
+
+        received = 0
+        started = False
+        rejected = False
+
+        async def limited_receive():
+            nonlocal received, rejected
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_bytes and not started:
+                    # answer 413 now and make the app see a disconnected client
+                    rejected = True
+                    await self._reject(send)
+                    return {"type": "http.disconnect"}
+            return message
+
+        async def guarded_send(message):
+            nonlocal started
+            if rejected:
+                return
+            if message["type"] == "http.response.start":
+                started = True
+            await send(message)
+
+        try:
+            await self.app(scope, limited_receive, guarded_send)
+        except Exception:
+            if not rejected:
+                raise
+
+    async def _reject(self, send) -> None:
+        limit_mb = (self.max_bytes - _MULTIPART_SLACK) // (1024 * 1024)
+        body = json.dumps({"detail": f"upload exceeds {limit_mb} MB limit"}).encode("utf-8")
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 413,
+                "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())],
+            }
+        )
+        await send({"type": "http.response.body", "body": body})
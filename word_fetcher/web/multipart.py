@@ -0,0 +1,130 @@
+"""
+Streaming multipart/form-data reader for the upload routes.
+
+With UploadFile parameters Starlette spools the whole body to a temporary file
+before the handler runs, and storing it means copying it a second time. Here
+the request stream is parsed as it arrives and the bytes of each file part go
+straight to a sink (e.g. the job's input file), so an upload is written and
+hashed once, in a single pass.
+
+A sink has write(chunk), close() -> result and abort(); they run in the
+threadpool. abort() must also undo a sink that was already closed: when the
+request fails midway, every sink opened for it is aborted.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Callable, List, Tuple
+
+from python_multipart.multipart import MultipartParser, parse_options_header
+from starlette.concurrency import run_in_threadpool
+from starlette.requests import Request
+
+
+class MultipartError(ValueError):
+    pass
+
+
+class _Events:
+    """
+    Parser callbacks, recorded as ("part", (name, filename)), ("data", bytes)
+    and ("end", None) for the caller to replay after each chunk.
+    """
+
+    def __init__(self) -> None:
+        self.events: List[Tuple[str, Any]] = []
+        self._field = b""
+        self._value = b""
+        self._disposition = b""
+
+    def callbacks(self):
+        return {
+            "on_part_begin": self._part_begin,
+            "on_header_field": self._header_field,
+            "on_header_value": self._header_value,
+            "on_header_end": self._header_end,
+            "on_headers_finished": self._headers_finished,
+            "on_part_data": self._part_data,
+            "on_part_end": self._part_end,
+        }
+
+    def _part_begin(self) -> None:
+        self._disposition = b""
+
+    def _header_field(self, data: bytes, start: int, end: int) -> None:
+        self._field += data[start:end]
+
+    def _header_value(self, data: bytes, start: int, end: int) -> None:
+        self._value += data[start:end]
+
+    def _header_end(self) -> None:
+        if self._field.lower() == b"content-disposition":
+            self._disposition = self._value
+        self._field = self._value = b""
+
+    def _headers_finished(self) -> None:
+        _kind, options = parse_options_header(self._disposition)
+        name = options.get(b"name", b"").decode("utf-8", "replace")
+        filename = options.get(b"filename")
+        self.events.append(("part", (name, filename.decode("utf-8", "replace") if filename is not None else None)))
+
+    def _part_data(self, data: bytes, start: int, end: int) -> None:
+        self.events.append(("data", data[start:end]))
+
+    def _part_end(self) -> None:
+        self.events.append(("end", None))
+
+
+async def stream_files(request: Request, field: str, open_sink: Callable[[str], Any]) -> List[Any]:
+    """
+    Feed every file part of form field `field` to a sink from open_sink(filename)
+    and return the sinks' close() results in order. Other fields and file parts
+    without a filename are skipped. Raises MultipartError for malformed bodies.
+    """
+    content_type, params = parse_options_header(request.headers.get("content-type", ""))
+    if content_type != b"multipart/form-data" or not params.get(b"boundary"):
+        raise MultipartError("expected a multipart/form-data body")
+    recorder = _Events()
+    parser = MultipartParser(params[b"boundary"], recorder.callbacks())
+
+    opened: List[Any] = []
+    results: List[Any] = []
+    sink = None
+    pending: List[bytes] = []
+
+    async def flush() -> None:
+        if sink is not None and pending:
+            data = b"".join(pending)
+            pending.clear()
+            await run_in_threadpool(sink.write, data)
+        pending.clear()
+
+    try:
+        async for chunk in request.stream():
+            try:
+                parser.write(chunk)
+            except Exception as e:
+                raise MultipartError(f"malformed multipart body: {e}") from e
+            for kind, value in recorder.events:
+                if kind == "part":
+                    name, filename = value
+                    if name == field and filename:
+                        sink = await run_in_threadpool(open_sink, filename)
+                        opened.append(sink)
+                elif kind == "data":
+                    if sink is not None:
+                        pending.append(value)
+                elif sink is not None:
+                    await flush()
+                    results.append(await run_in_threadpool(sink.close))
+                    sink = None
+            recorder.events.clear()
+            await flush()
+        if sink is not None:
+            raise MultipartError("multipart body ended inside a file part")
+        parser.finalize()
+    except BaseException:
+        for s in opened:
+            await run_in_threadpool(s.abort)
+        raise
+    return results
@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+from typing import Dict, List
+
+from fastapi import APIRouter, HTTPException, Query, Request
+from starlette.concurrency import run_in_threadpool
+
+from word_fetcher.web.multipart import MultipartError, stream_files
+from word_fetcher.work.batches import BatchUpload, get_batch_status, submit_batch
+from word_fetcher.work.jobs import queue_has_capacity
+from word_fetcher.work.models import Job
+from word_fetcher.work.scheduler import QueueFullError
+
+router = APIRouter(prefix="/batches")
+
+# the body is parsed by stream_files, not by FastAPI: document it by hand
+_FILES_BODY = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "multipart/form-data": {
+                "schema": {
+                    "type": "object",
+                    "required": ["files"],
+                    "properties": {"files": {"type": "array", "items": {"type": "string", "format": "binary"}}},
+                }
+            }
+        },
+    }
+}
+
+
+@router.post("", openapi_extra=_FILES_BODY)
+async def create_batch(
+    request: Request,
+    priority: int = Query(default=0),
+    mode: str = Query(default="full", pattern="^(full|dict)$"),
+):
+    # the whole batch takes one queue slot
+    if not queue_has_capacity():
+        raise HTTPException(status_code=429, detail="job queue is full, retry later")
+
+    try:
+        parts = await stream_files(request, "files", lambda filename: BatchUpload(filename, mode))
+    except MultipartError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    jobs: List[Job] = []
+    skipped: List[Dict[str, str]] = []
+    for found, bad in parts:
+        jobs.extend(found)
+        skipped.extend(bad)
+    if not jobs:
+        raise HTTPException(status_code=400, detail={"message": "no PDF files in upload", "skipped": skipped})
+    try:
+        return await run_in_threadpool(submit_batch, jobs, skipped, priority)
+    except QueueFullError as e:
+        raise HTTPException(status_code=429, detail=str(e))
+
+
+@router.get("/{batch_id}")
+def batch_status(batch_id: str):
+    st = get_batch_status(batch_id)
+    if st is None:
+        raise HTTPException(status_code=404, detail="batch not found")
+    return st
@@ -0,0 +1,48 @@
+from __future__ import annotations
+
+from fastapi import APIRouter, HTTPException, Query
+
+from word_fetcher.work.jobs import corpus
+
+router = APIRouter(prefix="/corpus")
+
+
+@router.get("/stats")
+def stats():
+    return corpus.stats()
+
+
+@router.get("/nouns")
+def nouns(
+    query: str | None = Query(default=None),
+    sort: str = Query(default="cf", pattern="^(cf|df|alpha)$"),
+    page: int = Query(default=1, ge=1),
+    page_size: int = Query(default=50, ge=1, le=1000),
+):
+    return corpus.noun_frequencies(query=query, sort=sort, page=page, page_size=page_size)
+
+
+@router.get("/nouns/{noun}")
+def noun_documents(noun: str, limit: int = Query(default=50, ge=1, le=1000)):
+    out = corpus.noun_documents(noun, limit=limit)
+    if out is None:
+        raise HTTPException(status_code=404, detail="noun not found")
+    return out
+
+
+@router.get("/nouns/{noun}/occurrences")
+def occurrences(
+    noun: str,
+    job_id: str | None = Query(default=None),
+    limit: int = Query(default=20, ge=1, le=200),
+    offset: int = Query(default=0, ge=0),
+):
+    return corpus.occurrences(noun, job_id=job_id, limit=limit, offset=offset)
+
+
+@router.get("/jobs/{job_id}/keywords")
+def keywords(job_id: str, limit: int = Query(default=20, ge=1, le=1000)):
+    out = corpus.keywords(job_id, limit=limit)
+    if out is None:
+        raise HTTPException(status_code=404, detail="job not in corpus")
+    return {"job_id": job_id, "keywords": out}
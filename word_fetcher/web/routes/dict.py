@@ -2,12 +2,13 @@ from __future__ import annotations
 
 from fastapi import APIRouter, File, Form, HTTPException, Query, UploadFile
 from fastapi.responses import FileResponse
+from starlette.concurrency import run_in_threadpool
 
 from word_fetcher.work.nlp import (
     add_to_custom_dict,
     list_custom_dict_words,
-    reload_resources,
     remove_from_custom_dict,
+    replace_custom_dict,
 )
 from word_fetcher.work.storage import custom_dict_path
 
@@ -26,10 +27,9 @@ def download_dict():
 async def upload_dict(file: UploadFile = File(...)):
     if not file.filename:
         raise HTTPException(status_code=400, detail="missing filename")
-    path = custom_dict_path()
     content = await file.read()
-    path.write_bytes(content)
-    reload_resources()
+    # rewrites the dict and reloads jieba: too slow for the event loop
+    await run_in_threadpool(replace_custom_dict, content)
     return {"message": "dictionary updated", "size": len(content)}
 
 
@@ -1,18 +1,32 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, HTTPException, Query
+import asyncio
+import json
+from typing import List
+
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
 
 from word_fetcher.work.jobs import (
+    PageTextPendingError,
     add_mark,
     get_job_status,
+    get_job_status_versioned,
+    get_page_lines,
     list_job_nouns,
     list_marks,
     list_noun_occurrences,
+    submit_reindex,
     toggle_mark,
 )
+from word_fetcher.work.scheduler import QueueFullError
 
 router = APIRouter(prefix="/jobs")
 
+# status changes are picked up from the in-memory registry, no disk access
+_EVENTS_POLL_S = 0.25
+_EVENTS_KEEPALIVE_S = 15.0
+
 
 @router.get("/{job_id}/status")
 def status(job_id: str):
@@ -22,30 +36,122 @@ def status(job_id: str):
     return st
 
 
+@router.get("/{job_id}/events")
+async def events(job_id: str, request: Request):
+    _version, st = get_job_status_versioned(job_id)
+    if st is None:
+        raise HTTPException(status_code=404, detail="job not found")
+
+    async def stream():
+        last_version = -1
+        idle = 0.0
+        while True:
+            version, st = get_job_status_versioned(job_id)
+            if st is not None and version != last_version:
+                last_version = version
+                idle = 0.0
+                yield f"event: status\ndata: {json.dumps(st, ensure_ascii=False)}\n\n"
+                if st.get("state") in ("done", "error"):
+                    return
+            elif idle >= _EVENTS_KEEPALIVE_S:
+                idle = 0.0
+                yield ": keep-alive\n\n"
+            if await request.is_disconnected():
+                return
+            await asyncio.sleep(_EVENTS_POLL_S)
+            idle += _EVENTS_POLL_S
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.post("/{job_id}/reindex")
+def reindex(job_id: str, word: List[str] = Query(default=[])):
+    try:
+        position = submit_reindex(job_id=job_id, words=[w.strip() for w in word if w.strip()] or None)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="job not found")
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except QueueFullError as e:
+        raise HTTPException(status_code=429, detail=str(e))
+    return {"job_id": job_id, "queue_position": position}
+
+
 @router.get("/{job_id}/nouns")
 def nouns(
     job_id: str,
     query: str | None = Query(default=None),
     sort: str = Query(default="count_desc"),
+    page: int = Query(default=1, ge=1),
+    page_size: int = Query(default=50, ge=1, le=1000),
+    min_len: int = Query(default=0, ge=0),
+    match: str = Query(default="substring", pattern="^(substring|prefix)$"),
 ):
     try:
-        return list_job_nouns(job_id=job_id, query=query, sort=sort)
+        return list_job_nouns(
+            job_id=job_id,
+            query=query,
+            sort=sort,
+            page=page,
+            page_size=page_size,
+            min_len=min_len,
+            match=match,
+        )
     except FileNotFoundError:
         raise HTTPException(status_code=404, detail="job not found")
 
 
 @router.get("/{job_id}/nouns/{noun}/occurrences")
-def occurrences(job_id: str, noun: str):
+def occurrences(
+    job_id: str,
+    noun: str,
+    cursor: int = Query(default=0, ge=0),
+    limit: int = Query(default=100, ge=1, le=1000),
+    page_from: int | None = Query(default=None, ge=1),
+    page_to: int | None = Query(default=None, ge=1),
+    context: int = Query(default=0, ge=0, le=10),
+):
+    try:
+        return list_noun_occurrences(
+            job_id=job_id,
+            noun=noun,
+            cursor=cursor,
+            limit=limit,
+            page_from=page_from,
+            page_to=page_to,
+            context=context,
+        )
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="job not found")
+    except PageTextPendingError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
+
+
+@router.get("/{job_id}/pages/{page}")
+def page_text(job_id: str, page: int):
     try:
-        return list_noun_occurrences(job_id=job_id, noun=noun)
+        return {"page": page, "lines": get_page_lines(job_id, page)}
     except FileNotFoundError:
         raise HTTPException(status_code=404, detail="job not found")
+    except PageTextPendingError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
+    except KeyError:
+        raise HTTPException(status_code=404, detail="page not found")
 
 
 @router.get("/{job_id}/marks")
-def marks(job_id: str):
+def marks(
+    job_id: str,
+    noun: str | None = Query(default=None),
+    page_from: int | None = Query(default=None, ge=1),
+    page_to: int | None = Query(default=None, ge=1),
+):
     try:
-        return list_marks(job_id=job_id)
+        return list_marks(job_id=job_id, noun=noun, page_from=page_from, page_to=page_to)
     except FileNotFoundError:
         raise HTTPException(status_code=404, detail="job not found")
 
@@ -0,0 +1,34 @@
+from __future__ import annotations
+
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from word_fetcher.work.jobs import result_cache_stats, scheduler_stats
+from word_fetcher.work.metrics import render
+from word_fetcher.work.nlp import dict_version, dictionary_ready, sentence_cache_stats
+
+router = APIRouter()
+
+
+@router.get("/stats")
+def stats():
+    return {
+        "result_cache": result_cache_stats(),
+        "sentence_cache": sentence_cache_stats(),
+        "scheduler": scheduler_stats(),
+    }
+
+
+@router.get("/health")
+def health():
+    # ready: dictionaries are loaded, so the first job will not pay for it
+    ready = dictionary_ready()
+    out = {"status": "ok", "ready": ready}
+    if ready:
+        out["dict_version"] = dict_version()
+    return out
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    return PlainTextResponse(render(), media_type="text/plain; version=0.0.4; charset=utf-8")
@@ -1,19 +1,61 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, BackgroundTasks, File, HTTPException, UploadFile
-
-from word_fetcher.work.jobs import create_job, run_job
+from fastapi import APIRouter, HTTPException, Query, Request
+from starlette.concurrency import run_in_threadpool
+
+from word_fetcher.web.multipart import MultipartError, stream_files
+from word_fetcher.work.jobs import (
+    JobUpload,
+    UploadTooLargeError,
+    discard_job,
+    queue_has_capacity,
+    submit_or_reuse,
+)
+from word_fetcher.work.scheduler import QueueFullError
 
 router = APIRouter()
 
-
-@router.post("/upload")
-async def upload(background_tasks: BackgroundTasks, file: UploadFile = File(...)):
-    if not file.filename:
-        raise HTTPException(status_code=400, detail="missing filename")
-
-    job = await create_job(file)
-    background_tasks.add_task(run_job, job.job_id)
-    return {"job_id": job.job_id}
-
-
+# the body is parsed by stream_files, not by FastAPI: document it by hand
+_FILE_BODY = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "multipart/form-data": {
+                "schema": {
+                    "type": "object",
+                    "required": ["file"],
+                    "properties": {"file": {"type": "string", "format": "binary"}},
+                }
+            }
+        },
+    }
+}
+
+
+@router.post("/upload", openapi_extra=_FILE_BODY)
+async def upload(
+    request: Request,
+    priority: int = Query(default=0),
+    mode: str = Query(default="full", pattern="^(full|dict)$"),
+):
+    # reject before spending time on the upload when the queue is already full
+    if not queue_has_capacity():
+        raise HTTPException(status_code=429, detail="job queue is full, retry later")
+
+    try:
+        jobs = await stream_files(request, "file", lambda filename: JobUpload(filename, mode))
+    except UploadTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except MultipartError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if not jobs:
+        raise HTTPException(status_code=400, detail="missing file")
+    job = jobs[0]
+    for extra in jobs[1:]:
+        await run_in_threadpool(discard_job, extra.job_id)
+    # dedup lookup, result linking and status writes touch the disk: keep them off the loop
+    try:
+        return await run_in_threadpool(submit_or_reuse, job, priority)
+    except QueueFullError as e:
+        await run_in_threadpool(discard_job, job.job_id)
+        raise HTTPException(status_code=429, detail=str(e))
@@ -0,0 +1,51 @@
+from __future__ import annotations
+
+import time
+
+from word_fetcher.work.metrics import Histogram
+
+http_request_seconds = Histogram(
+    "word_fetcher_http_request_seconds",
+    "API request latency by method, route template and status.",
+    ["method", "route", "status"],
+)
+
+
+class RequestMetricsMiddleware:
+    """
+    Time every /api request into word_fetcher_http_request_seconds, labelled by
+    route template (/api/jobs/{job_id}/nouns), not the raw path. Event streams
+    are skipped: their duration is the subscription, not the handler.
+    """
+
+    def __init__(self, app, prefix: str = "/api"):
+        self.app = app
+        self.prefix = prefix
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not scope["path"].startswith(self.prefix):
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        streaming = False
+
+        async def send_wrapper(message):
+            nonlocal status, streaming
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                for name, value in message.get("headers", []):
+                    if name == b"content-type" and value.startswith(b"text/event-stream"):
+                        streaming = True
+            await send(message)
+
+        t0 = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            if not streaming:
+                # set by FastAPI's router on the shared scope once a route matched
+                route = getattr(scope.get("route"), "path", "unmatched")
+                http_request_seconds.observe(
+                    time.perf_counter() - t0, method=scope["method"], route=route, status=status
+                )
@@ -0,0 +1,127 @@
+"""
+Per-job noun annotation flags (in_dict / maybe_wrong).
+
+Flags depend only on the noun and on the custom dictionary, so they are
+computed once per job and stored in annotations.bin together with the
+dictionary version they were computed against. When the dictionary changes by
+single words, only the nouns equal to those words are recomputed.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from word_fetcher.work.nlp import dict_changes_since, dict_version, get_dict_words, is_maybe_wrong_word
+from word_fetcher.work.results import JobResult
+from word_fetcher.work.storage import job_dir
+
+
+IN_DICT = 1
+MAYBE_WRONG = 2
+
+_lock = threading.Lock()
+
+
+class JobAnnotations:
+    def __init__(self, result_id: str, dict_version: str, flags: bytearray):
+        self.result_id = result_id
+        self.dict_version = dict_version
+        self.flags = flags
+
+    def in_dict(self, noun_id: int) -> bool:
+        return bool(self.flags[noun_id] & IN_DICT)
+
+    def maybe_wrong(self, noun_id: int) -> bool:
+        return bool(self.flags[noun_id] & MAYBE_WRONG)
+
+
+def _annotations_path(job_id: str) -> Path:
+    return job_dir(job_id) / "annotations.bin"
+
+
+def _flag(noun: str, dict_words) -> int:
+    flag = IN_DICT if noun in dict_words else 0
+    if is_maybe_wrong_word(noun, dict_words):
+        flag |= MAYBE_WRONG
+    return flag
+
+
+def _compute_all(result: JobResult) -> bytearray:
+    dict_words = get_dict_words()
+    return bytearray(_flag(noun, dict_words) for noun in result.nouns())
+
+
+def _patch(result: JobResult, ann: JobAnnotations, words: List[str]) -> None:
+    dict_words = get_dict_words()
+    for word in words:
+        noun_id = result.noun_id(word)
+        if noun_id is not None:
+            ann.flags[noun_id] = _flag(word, dict_words)
+
+
+def _read(job_id: str) -> Optional[JobAnnotations]:
+    path = _annotations_path(job_id)
+    if not path.exists():
+        return None
+    raw = path.read_bytes()
+    header_end = raw.find(b"\n")
+    if header_end < 0:
+        return None
+    header = json.loads(raw[:header_end].decode("utf-8"))
+    return JobAnnotations(header["result_id"], header["dict_version"], bytearray(raw[header_end + 1 :]))
+
+
+def _write(job_id: str, ann: JobAnnotations) -> None:
+    path = _annotations_path(job_id)
+    header = json.dumps({"result_id": ann.result_id, "dict_version": ann.dict_version}).encode("utf-8")
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    tmp.write_bytes(header + b"\n" + bytes(ann.flags))
+    os.replace(tmp, path)
+
+
+def _refresh(job_id: str, result: JobResult, ann: Optional[JobAnnotations]) -> JobAnnotations:
+    """
+    Bring ann up to the current dictionary, incrementally when possible.
+    """
+    current = dict_version()
+    if ann is not None and ann.result_id == result.result_id and len(ann.flags) == result.noun_count:
+        if ann.dict_version == current:
+            return ann
+        changed = dict_changes_since(ann.dict_version)
+        if changed is not None:
+            _patch(result, ann, changed)
+            ann.dict_version = current
+            _write(job_id, ann)
+            return ann
+    ann = JobAnnotations(result.result_id, current, _compute_all(result))
+    _write(job_id, ann)
+    return ann
+
+
+def job_annotations(job_id: str, result: JobResult) -> JobAnnotations:
+    """
+    Flags for every noun of a loaded result; kept on the reader so they live
+    exactly as long as it stays in the result cache.
+    """
+    with _lock:
+        ann = result.annotations
+        if ann is None:
+            ann = _read(job_id)
+        ann = _refresh(job_id, result, ann)
+        result.annotations = ann
+        return ann
+
+
+def refresh_loaded_annotations(loaded: List[Tuple[str, JobResult]]) -> None:
+    """
+    Dictionary listener: bring flags of already-loaded results up to date now,
+    so the next request does no annotation work at all.
+    """
+    with _lock:
+        for job_id, result in loaded:
+            if result.annotations is not None:
+                result.annotations = _refresh(job_id, result, result.annotations)
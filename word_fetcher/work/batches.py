@@ -0,0 +1,360 @@
+"""
+Batch uploads: many PDFs (directly or inside .zip archives) processed as one
+queue entry.
+
+Each document is still an ordinary job (results, status and dedup exactly as
+for single uploads); the batch only adds a record, data/batches/<id>.json,
+listing its jobs, and runs the documents that need processing together in
+run_batch, sharing one process pool.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+import uuid
+import zipfile
+from collections import OrderedDict, deque
+from concurrent.futures import FIRST_COMPLETED, Future, wait
+from pathlib import Path, PurePosixPath
+from typing import IO, Any, Dict, List, Optional, Tuple
+
+from word_fetcher.work.jobs import (
+    JobRun,
+    JobUpload,
+    UploadTooLargeError,
+    claim_job,
+    discard_job,
+    get_job_status,
+    job_workers,
+    max_upload_bytes,
+    release_job,
+    scheduler,
+    take_queue_wait,
+)
+from word_fetcher.work.models import Job
+from word_fetcher.work.nlp import ensure_resources
+from word_fetcher.work.storage import batches_dir, read_json, utc_ms, write_json
+
+# document shards kept in flight per pool worker; more documents are started as these finish
+_BATCH_SHARDS_PER_WORKER = 2
+_UPLOAD_CHUNK = 1024 * 1024
+# records of unfinished batches recently asked about; the files in
+# data/batches/ are the source of truth, finished batches are read from there
+_MAX_CACHED_BATCHES = 256
+_batches: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+_batches_lock = threading.Lock()
+
+
+def max_batch_bytes() -> int:
+    """
+    Batch upload size limit (all files, or one archive) from WORD_FETCHER_MAX_BATCH_MB (default 2000).
+    """
+    raw = os.getenv("WORD_FETCHER_MAX_BATCH_MB", "").strip()
+    try:
+        mb = float(raw) if raw else 2000.0
+    except ValueError:
+        mb = 2000.0
+    return int(mb * 1024 * 1024)
+
+
+def _batch_path(batch_id: str) -> Path:
+    return batches_dir() / f"{batch_id}.json"
+
+
+def _cached_record(batch_id: str) -> Optional[Dict[str, Any]]:
+    with _batches_lock:
+        record = _batches.get(batch_id)
+        if record is not None:
+            _batches.move_to_end(batch_id)
+            return record
+    path = _batch_path(batch_id)
+    if not path.exists():
+        return None
+    record = read_json(path)
+    _cache_record(batch_id, record)
+    return record
+
+
+def _cache_record(batch_id: str, record: Dict[str, Any]) -> None:
+    with _batches_lock:
+        _batches[batch_id] = record
+        _batches.move_to_end(batch_id)
+        while len(_batches) > _MAX_CACHED_BATCHES:
+            _batches.popitem(last=False)
+
+
+def _forget_record(batch_id: str) -> None:
+    with _batches_lock:
+        _batches.pop(batch_id, None)
+
+
+def _job_from_stream(filename: str, src: IO[bytes], mode: str = "full") -> Job:
+    """
+    Store a file read from src (e.g. an archive member) as a new queued job.
+    """
+    upload = JobUpload(filename, mode)
+    try:
+        while True:
+            chunk = src.read(_UPLOAD_CHUNK)
+            if not chunk:
+                break
+            upload.write(chunk)
+    except BaseException:
+        upload.abort()
+        raise
+    return upload.close()
+
+
+def _zip_member_name(info: zipfile.ZipInfo) -> str:
+    # archives made on Chinese Windows store GBK names without the UTF-8 flag
+    name = info.filename
+    if not info.flag_bits & 0x800:
+        try:
+            name = name.encode("cp437").decode("gbk")
+        except (UnicodeEncodeError, UnicodeDecodeError):
+            pass
+    return PurePosixPath(name.replace("\\", "/")).name
+
+
+def _jobs_from_zip(path: Path, archive_name: str, mode: str = "full") -> Tuple[List[Job], List[Dict[str, str]]]:
+    """
+    One job per PDF in the archive; other files are reported as skipped.
+    """
+    jobs: List[Job] = []
+    skipped: List[Dict[str, str]] = []
+    try:
+        zf = zipfile.ZipFile(path)
+    except zipfile.BadZipFile:
+        return jobs, [{"filename": archive_name, "reason": "not a valid zip archive"}]
+    limit = max_upload_bytes()
+    with zf:
+        for info in zf.infolist():
+            name = _zip_member_name(info)
+            if info.is_dir() or not name or name.startswith(".") or info.filename.startswith("__MACOSX/"):
+                continue
+            label = f"{archive_name}/{info.filename}"
+            if not name.lower().endswith(".pdf"):
+                skipped.append({"filename": label, "reason": "unsupported file type (only .pdf)"})
+                continue
+            if info.file_size > limit:
+                skipped.append({"filename": label, "reason": f"file exceeds {limit // (1024 * 1024)} MB limit"})
+                continue
+            try:
+                with zf.open(info) as src:
+                    jobs.append(_job_from_stream(name, src, mode))
+            except (UploadTooLargeError, zipfile.BadZipFile, OSError, RuntimeError) as e:
+                skipped.append({"filename": label, "reason": str(e)})
+    return jobs, skipped
+
+
+class BatchUpload:
+    """
+    One file of a batch upload (an upload sink, see JobUpload): a PDF becomes a
+    job, a .zip is spooled and becomes one job per PDF inside; other files and
+    PDFs over the size limit are reported as skipped. close() returns
+    (jobs, skipped files with a reason); abort() discards the jobs.
+    """
+
+    def __init__(self, filename: str, mode: str = "full"):
+        self.filename = filename
+        self.mode = mode
+        self._jobs: List[Job] = []
+        self._skipped: Optional[str] = None
+        self._job: Optional[JobUpload] = None
+        self._archive: Optional[Path] = None
+        self._f: Optional[IO[bytes]] = None
+        suffix = Path(filename).suffix.lower()
+        if suffix == ".pdf":
+            self._job = JobUpload(filename, mode)
+        elif suffix == ".zip":
+            self._archive = batches_dir() / f"upload-{uuid.uuid4().hex}.zip"
+            self._f = self._archive.open("wb")
+        else:
+            self._skipped = "unsupported file type (only .pdf or .zip)"
+
+    def write(self, chunk: bytes) -> None:
+        if self._job is not None:
+            try:
+                self._job.write(chunk)
+            except UploadTooLargeError as e:
+                self._job.abort()
+                self._job = None
+                self._skipped = str(e)
+        elif self._f is not None:
+            self._f.write(chunk)
+
+    def close(self) -> Tuple[List[Job], List[Dict[str, str]]]:
+        skipped: List[Dict[str, str]] = []
+        if self._job is not None:
+            self._jobs.append(self._job.close())
+            self._job = None
+        elif self._f is not None and self._archive is not None:
+            self._f.close()
+            try:
+                found, skipped = _jobs_from_zip(self._archive, self.filename, self.mode)
+                self._jobs.extend(found)
+            finally:
+                self._archive.unlink(missing_ok=True)
+        if self._skipped:
+            skipped.append({"filename": self.filename, "reason": self._skipped})
+        return list(self._jobs), skipped
+
+    def abort(self) -> None:
+        if self._job is not None:
+            self._job.abort()
+        if self._f is not None and self._archive is not None:
+            self._f.close()
+            self._archive.unlink(missing_ok=True)
+        for job in self._jobs:
+            discard_job(job.job_id)
+
+
+def submit_batch(jobs: List[Job], skipped: List[Dict[str, str]], priority: int = 0) -> Dict[str, Any]:
+    """
+    Queue new jobs as one batch: contents already processed or in flight are
+    reused/coalesced exactly as for single uploads, the rest take a single
+    queue slot and run together in run_batch. Raises QueueFullError (the
+    queued jobs are discarded).
+    """
+    batch_id = uuid.uuid4().hex
+    entries: List[Dict[str, Any]] = []
+    pending: List[str] = []
+    for job in jobs:
+        response = claim_job(job, "queued (batch)")
+        if response is None:
+            pending.append(job.job_id)
+            response = {"job_id": job.job_id}
+        entries.append({"filename": job.filename, **response})
+
+    position = None
+    if pending:
+        try:
+            position = scheduler.submit(batch_id, priority, task=lambda: run_batch(batch_id, pending))
+        except Exception:
+            for job_id in pending:
+                release_job(job_id)
+                discard_job(job_id)
+            raise
+
+    record = {"batch_id": batch_id, "created_ms": utc_ms(), "jobs": entries, "skipped": skipped}
+    write_json(_batch_path(batch_id), record)
+    _cache_record(batch_id, record)
+    out = dict(record)
+    if position is not None:
+        out["queue_position"] = position
+    return out
+
+
+def get_batch_status(batch_id: str) -> Optional[Dict[str, Any]]:
+    """
+    Batch progress aggregated from its jobs' statuses; None for unknown batches.
+    The batch is "done" once every job has finished (check counts.error).
+    """
+    record = _cached_record(batch_id)
+    if record is None:
+        return None
+
+    counts = {"queued": 0, "running": 0, "done": 0, "error": 0}
+    jobs: List[Dict[str, Any]] = []
+    progress = 0
+    for entry in record["jobs"]:
+        st = get_job_status(entry["job_id"]) or {"state": "error", "progress": 100, "message": "job not found"}
+        counts[st["state"]] = counts.get(st["state"], 0) + 1
+        progress += int(st.get("progress", 0))
+        jobs.append({**entry, "state": st["state"], "progress": st.get("progress", 0), "message": st.get("message", "")})
+
+    total = len(jobs)
+    finished = counts["done"] + counts["error"]
+    if finished == total:
+        state = "done"
+        # nothing changes any more: later requests read the record file
+        _forget_record(batch_id)
+    elif counts["running"] or finished:
+        state = "running"
+    else:
+        state = "queued"
+    out: Dict[str, Any] = {
+        "batch_id": batch_id,
+        "state": state,
+        "progress": progress // total if total else 100,
+        "message": f"{finished}/{total} files finished" + (f", {counts['error']} failed" if counts["error"] else ""),
+        "total": total,
+        "counts": counts,
+        "jobs": jobs,
+        "skipped": record.get("skipped", []),
+        "created_ms": record.get("created_ms"),
+    }
+    if state == "queued":
+        pos = scheduler.position(batch_id)
+        if pos is not None:
+            out["queue_position"] = pos
+    return out
+
+
+def run_batch(batch_id: str, job_ids: List[str]) -> None:
+    """
+    Process a batch's jobs as one unit: dictionaries are checked once, and the
+    documents are fed through the shard pool together, so small documents are
+    indexed side by side and large ones in page shards.
+    """
+    queue_wait = take_queue_wait(batch_id)
+    runs: List[JobRun] = []
+    try:
+        for job_id in job_ids:
+            run = JobRun(job_id, "batch", queue_wait)
+            try:
+                run.prepare()
+            except Exception as e:
+                run.fail(e)
+                continue
+            runs.append(run)
+
+        try:
+            ensure_resources()
+        except Exception as e:
+            for run in runs:
+                run.fail(e)
+            return
+
+        workers = job_workers()
+        if workers > 1:
+            _run_batch_pool(runs, workers)
+            return
+        for run in runs:
+            try:
+                run.index()
+            except Exception as e:
+                run.fail(e)
+    finally:
+        for job_id in job_ids:
+            release_job(job_id)
+
+
+def _run_batch_pool(runs: List[JobRun], workers: int) -> None:
+    """
+    Feed the documents' shards through the shard pool, starting the next document
+    whenever fewer than workers * _BATCH_SHARDS_PER_WORKER shards are in flight;
+    each document is merged and saved as soon as its last shard returns. A
+    document that cannot be started fails on its own; the others go on.
+    """
+    waiting = deque(runs)
+    futures: Dict[Future, Tuple[JobRun, int]] = {}
+    limit = workers * _BATCH_SHARDS_PER_WORKER
+
+    while waiting or futures:
+        while waiting and len(futures) < limit:
+            run = waiting.popleft()
+            try:
+                started = run.start_shards(workers)
+            except Exception as e:
+                run.fail(e)
+                continue
+            for fut, i in started.items():
+                futures[fut] = (run, i)
+        if not futures:
+            continue
+        done, _pending = wait(list(futures), return_when=FIRST_COMPLETED)
+        for fut in done:
+            run, i = futures.pop(fut)
+            run.shard_done(i, fut)
@@ -0,0 +1,258 @@
+"""
+Corpus-level inverted index over all finished jobs (data/corpus.sqlite).
+
+    docs      one row per indexed job (filename, total noun occurrences)
+    nouns     every noun with its document frequency (df) and collection
+              frequency (cf), maintained incrementally
+    postings  noun x job: occurrence count plus the (page, line) positions as
+              packed u32 arrays
+
+Jobs are added (or replaced) as they finish, so cross-document questions
+("which documents mention X, how often, where") are answered from this file
+alone, without opening any job directory.
+
+TF-IDF uses tf = count / document noun occurrences and the smoothed
+idf = ln((1 + N) / (1 + df)) + 1.
+"""
+
+from __future__ import annotations
+
+import math
+import os
+import sqlite3
+import threading
+from array import array
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set
+
+from word_fetcher.work.storage import utc_ms
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS docs (
+    job_id TEXT PRIMARY KEY,
+    filename TEXT NOT NULL,
+    noun_total INTEGER NOT NULL,
+    distinct_nouns INTEGER NOT NULL,
+    indexed_ms INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS nouns (
+    id INTEGER PRIMARY KEY,
+    noun TEXT NOT NULL UNIQUE,
+    df INTEGER NOT NULL,
+    cf INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS nouns_cf ON nouns (cf DESC);
+CREATE INDEX IF NOT EXISTS nouns_df ON nouns (df DESC);
+CREATE TABLE IF NOT EXISTS postings (
+    noun_id INTEGER NOT NULL,
+    job_id TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    pages BLOB NOT NULL,
+    lines BLOB NOT NULL,
+    PRIMARY KEY (noun_id, job_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS postings_job ON postings (job_id);
+"""
+
+_SORTS = {"cf": "cf DESC, noun", "df": "df DESC, cf DESC, noun", "alpha": "noun"}
+_CHUNK = 500
+
+
+def _u32(values: Any) -> bytes:
+    return array("I", values).tobytes()
+
+
+def _positions(pages: bytes, lines: bytes) -> List[Dict[str, int]]:
+    p, l = array("I"), array("I")
+    p.frombytes(pages)
+    l.frombytes(lines)
+    return [{"page": a, "line": b} for a, b in zip(p, l)]
+
+
+def _like(q: str) -> str:
+    return "%" + q.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+
+
+class CorpusIndex:
+    def __init__(self, path: Path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        self._db_pid = 0
+
+    def _conn(self) -> sqlite3.Connection:
+        # one connection per process; page-shard workers never use it
+        if self._db is None or self._db_pid != os.getpid():
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            db = sqlite3.connect(str(self.path), timeout=30, check_same_thread=False)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            db.executescript(_SCHEMA)
+            self._db, self._db_pid = db, os.getpid()
+        return self._db
+
+    def _idf(self, db: sqlite3.Connection, df: int) -> float:
+        n = db.execute("SELECT COUNT(*) FROM docs").fetchone()[0]
+        return math.log((1 + n) / (1 + df)) + 1
+
+    # --------- updates ----------
+    def add_document(self, job_id: str, filename: str, result: Any) -> None:
+        """
+        Index (or re-index) a job from its JobResult.
+        """
+        nouns = result.nouns()
+        counts = result.noun_counts
+        starts = result.occ_start
+        rows = []
+        for i in range(len(nouns)):
+            lo, hi = starts[i], starts[i + 1]
+            rows.append((i, int(counts[i]), _u32(result.occ_page[lo:hi]), _u32(result.occ_line[lo:hi])))
+
+        with self._lock:
+            db = self._conn()
+            with db:
+                self._remove(db, job_id)
+                db.executemany("INSERT OR IGNORE INTO nouns (noun, df, cf) VALUES (?, 0, 0)", ((n,) for n in nouns))
+                ids: Dict[str, int] = {}
+                for k in range(0, len(nouns), _CHUNK):
+                    chunk = nouns[k : k + _CHUNK]
+                    marks = ",".join("?" * len(chunk))
+                    ids.update((n, i) for i, n in db.execute(f"SELECT id, noun FROM nouns WHERE noun IN ({marks})", chunk))
+                db.executemany(
+                    "UPDATE nouns SET df = df + 1, cf = cf + ? WHERE id = ?",
+                    ((count, ids[nouns[i]]) for i, count, _p, _l in rows),
+                )
+                db.executemany(
+                    "INSERT INTO postings (noun_id, job_id, count, pages, lines) VALUES (?, ?, ?, ?, ?)",
+                    ((ids[nouns[i]], job_id, count, pages, lines) for i, count, pages, lines in rows),
+                )
+                db.execute(
+                    "INSERT INTO docs (job_id, filename, noun_total, distinct_nouns, indexed_ms) VALUES (?, ?, ?, ?, ?)",
+                    (job_id, filename, sum(r[1] for r in rows), len(rows), utc_ms()),
+                )
+
+    def remove_document(self, job_id: str) -> None:
+        with self._lock:
+            db = self._conn()
+            with db:
+                self._remove(db, job_id)
+
+    def _remove(self, db: sqlite3.Connection, job_id: str) -> None:
+        old = db.execute("SELECT noun_id, count FROM postings WHERE job_id = ?", (job_id,)).fetchall()
+        if old:
+            db.executemany("UPDATE nouns SET df = df - 1, cf = cf - ? WHERE id = ?", ((c, i) for i, c in old))
+            db.execute("DELETE FROM postings WHERE job_id = ?", (job_id,))
+            db.execute("DELETE FROM nouns WHERE df <= 0")
+        db.execute("DELETE FROM docs WHERE job_id = ?", (job_id,))
+
+    def document_ids(self) -> Set[str]:
+        with self._lock:
+            return {r[0] for r in self._conn().execute("SELECT job_id FROM docs")}
+
+    # --------- queries ----------
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            db = self._conn()
+            docs, occurrences = db.execute("SELECT COUNT(*), COALESCE(SUM(noun_total), 0) FROM docs").fetchone()
+            distinct = db.execute("SELECT COUNT(*) FROM nouns").fetchone()[0]
+        return {"documents": docs, "distinct_nouns": distinct, "occurrences": occurrences}
+
+    def noun_frequencies(
+        self, query: Optional[str] = None, sort: str = "cf", page: int = 1, page_size: int = 50
+    ) -> Dict[str, Any]:
+        """
+        Nouns across all documents with df, cf and idf; sort: cf | df | alpha.
+        """
+        order = _SORTS.get(sort, _SORTS["cf"])
+        page, page_size = max(1, page), max(1, page_size)
+        where, args = ("WHERE noun LIKE ? ESCAPE '\\'", [_like(query)]) if query else ("", [])
+        with self._lock:
+            db = self._conn()
+            total = db.execute(f"SELECT COUNT(*) FROM nouns {where}", args).fetchone()[0]
+            rows = db.execute(
+                f"SELECT noun, df, cf FROM nouns {where} ORDER BY {order} LIMIT ? OFFSET ?",
+                [*args, page_size, (page - 1) * page_size],
+            ).fetchall()
+            n = db.execute("SELECT COUNT(*) FROM docs").fetchone()[0]
+        items = [
+            {"noun": noun, "df": df, "cf": cf, "idf": round(math.log((1 + n) / (1 + df)) + 1, 6)}
+            for noun, df, cf in rows
+        ]
+        return {"items": items, "total": total, "page": page, "page_size": page_size}
+
+    def noun_documents(self, noun: str, limit: int = 50) -> Optional[Dict[str, Any]]:
+        """
+        Documents mentioning noun, ranked by TF-IDF. None if no document does.
+        """
+        with self._lock:
+            db = self._conn()
+            row = db.execute("SELECT id, df, cf FROM nouns WHERE noun = ?", (noun,)).fetchone()
+            if row is None:
+                return None
+            noun_id, df, cf = row
+            idf = self._idf(db, df)
+            rows = db.execute(
+                "SELECT p.job_id, d.filename, p.count, d.noun_total FROM postings p"
+                " JOIN docs d ON d.job_id = p.job_id WHERE p.noun_id = ?",
+                (noun_id,),
+            ).fetchall()
+        docs = []
+        for job_id, filename, count, noun_total in rows:
+            tf = count / noun_total if noun_total else 0.0
+            docs.append(
+                {"job_id": job_id, "filename": filename, "count": count, "tf": round(tf, 6), "tfidf": round(tf * idf, 6)}
+            )
+        docs.sort(key=lambda d: (-d["tfidf"], -d["count"], d["job_id"]))
+        return {"noun": noun, "df": df, "cf": cf, "idf": round(idf, 6), "documents": docs[: max(1, limit)]}
+
+    def keywords(self, job_id: str, limit: int = 20) -> Optional[List[Dict[str, Any]]]:
+        """
+        A document's nouns ranked by TF-IDF against the corpus. None if not indexed.
+        """
+        with self._lock:
+            db = self._conn()
+            doc = db.execute("SELECT noun_total FROM docs WHERE job_id = ?", (job_id,)).fetchone()
+            if doc is None:
+                return None
+            n = db.execute("SELECT COUNT(*) FROM docs").fetchone()[0]
+            rows = db.execute(
+                "SELECT n.noun, p.count, n.df FROM postings p JOIN nouns n ON n.id = p.noun_id WHERE p.job_id = ?",
+                (job_id,),
+            ).fetchall()
+        total = doc[0] or 1
+        items = []
+        for noun, count, df in rows:
+            tf = count / total
+            items.append(
+                {"noun": noun, "count": count, "df": df, "tfidf": round(tf * (math.log((1 + n) / (1 + df)) + 1), 6)}
+            )
+        items.sort(key=lambda x: (-x["tfidf"], x["noun"]))
+        return items[: max(1, limit)]
+
+    def occurrences(
+        self, noun: str, job_id: Optional[str] = None, limit: int = 20, offset: int = 0
+    ) -> Dict[str, Any]:
+        """
+        Per-document positions of noun, documents with the most occurrences first.
+        """
+        with self._lock:
+            db = self._conn()
+            row = db.execute("SELECT id FROM nouns WHERE noun = ?", (noun,)).fetchone()
+            if row is None:
+                return {"noun": noun, "items": [], "total": 0}
+            where, args = "WHERE p.noun_id = ?", [row[0]]
+            if job_id:
+                where += " AND p.job_id = ?"
+                args.append(job_id)
+            total = db.execute(f"SELECT COUNT(*) FROM postings p {where}", args).fetchone()[0]
+            rows = db.execute(
+                "SELECT p.job_id, d.filename, p.count, p.pages, p.lines FROM postings p"
+                f" JOIN docs d ON d.job_id = p.job_id {where}"
+                " ORDER BY p.count DESC, p.job_id LIMIT ? OFFSET ?",
+                [*args, max(1, limit), max(0, offset)],
+            ).fetchall()
+        items = [
+            {"job_id": jid, "filename": filename, "count": count, "positions": _positions(pages, lines)}
+            for jid, filename, count, pages, lines in rows
+        ]
+        return {"noun": noun, "items": items, "total": total}
@@ -0,0 +1,198 @@
+"""
+Prebuilt jieba prefix dictionary (main dict.txt + custom dictionary).
+
+jieba normally builds its prefix dict from dict.txt on first use, then
+word_fetcher re-added every custom entry with jieba.add_word on each
+reload. Instead the combined FREQ/total/POS-tag tables are marshalled once
+to data/cache/jieba-dict-<key>.marshal, keyed by the jieba version, the main
+dictionary file and the custom dictionary content, and swapped into jieba as
+a whole. Loading the artifact takes about half as long as jieba's own
+initialization and, because the tables are rebuilt from the pristine main
+dictionary, removing a custom word really removes it.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import marshal
+import os
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import jieba
+import jieba.posseg as pseg
+from jieba import finalseg
+
+from word_fetcher.work.storage import cache_dir
+
+logger = logging.getLogger(__name__)
+
+# (FREQ, total, word_tag_tab)
+PrefixDict = Tuple[Dict[str, int], int, Dict[str, str]]
+
+_DEFAULT_FREQ = 200000
+_DEFAULT_TAG = "n"
+
+_lock = threading.RLock()
+_installed: Optional[str] = None
+ready = threading.Event()
+
+
+def custom_entries(path: Path) -> List[Tuple[str, int, str]]:
+    """
+    支持两种格式：
+    1) 仅词：       机器学习
+    2) 词 频率 词性：机器学习 200000 n
+    未提供频率/词性时使用高频+n 以提升命中率。
+    """
+    entries: List[Tuple[str, int, str]] = []
+    if not path.exists():
+        return entries
+    for ln in path.read_text(encoding="utf-8").splitlines():
+        ln = ln.strip()
+        if not ln or ln.startswith("#"):
+            continue
+        parts = ln.split()
+        if not parts:
+            continue
+        freq = _DEFAULT_FREQ
+        tag = _DEFAULT_TAG
+        if len(parts) >= 2:
+            try:
+                freq = int(parts[1])
+            except ValueError:
+                freq = _DEFAULT_FREQ
+        if len(parts) >= 3:
+            tag = parts[2]
+        entries.append((parts[0], freq, tag))
+    return entries
+
+
+def _main_dict_path() -> Path:
+    return Path(jieba.dt.dictionary or os.path.join(os.path.dirname(jieba.__file__), jieba.DEFAULT_DICT_NAME))
+
+
+def _main_key() -> str:
+    p = _main_dict_path()
+    st = p.stat()
+    raw = f"{jieba.__version__}:{p}:{st.st_size}:{st.st_mtime_ns}"
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:16]
+
+
+def artifact_key(custom_path: Path) -> str:
+    custom = custom_path.read_bytes() if custom_path.exists() else b""
+    return hashlib.sha1(_main_key().encode("ascii") + b"\0" + custom).hexdigest()[:16]
+
+
+def _load(path: Path) -> Optional[PrefixDict]:
+    try:
+        # marshal.loads on the whole buffer is ~4x faster than marshal.load(f)
+        freq, total, tags = marshal.loads(path.read_bytes())
+        return freq, total, tags
+    except (OSError, EOFError, ValueError, TypeError):
+        logger.warning("ignoring unreadable jieba dictionary artifact %s", path)
+        return None
+
+
+def _save(path: Path, data: PrefixDict) -> None:
+    tmp = path.with_suffix(f".{os.getpid()}.tmp")
+    try:
+        tmp.write_bytes(marshal.dumps(data))
+        os.replace(tmp, path)
+    except OSError:
+        logger.exception("failed to write jieba dictionary artifact %s", path)
+        tmp.unlink(missing_ok=True)
+
+
+def _main_dict() -> PrefixDict:
+    """
+    The main dictionary alone. Only needed when the combined artifact is
+    missing (first start, dictionary edits), so it is not kept in memory.
+    """
+    path = cache_dir() / f"jieba-main-{_main_key()}.marshal"
+    if path.exists():
+        data = _load(path)
+        if data is not None:
+            return data
+    freq, total = jieba.dt.gen_pfdict(jieba.dt.get_dict_file())
+    tags: Dict[str, str] = {}
+    with _main_dict_path().open("rb") as f:
+        for line in f:
+            parts = line.strip().decode("utf-8").split(" ")
+            if len(parts) == 3:
+                tags[parts[0]] = parts[2]
+    data = (freq, total, tags)
+    _save(path, data)
+    return data
+
+
+def _apply(data: PrefixDict, entries: List[Tuple[str, int, str]]) -> PrefixDict:
+    # same effect as jieba.Tokenizer.add_word, without the per-call overhead
+    freq, total, tags = dict(data[0]), data[1], dict(data[2])
+    for word, f, tag in entries:
+        freq[word] = f
+        total += f
+        if tag:
+            tags[word] = tag
+        for i in range(1, len(word)):
+            freq.setdefault(word[:i], 0)
+    return freq, total, tags
+
+
+def _install_tables(data: PrefixDict, entries: List[Tuple[str, int, str]]) -> None:
+    freq, total, tags = data
+    with jieba.dt.lock:
+        jieba.dt.FREQ = freq
+        jieba.dt.total = total
+        jieba.dt.user_word_tag_tab = {}
+        jieba.dt.initialized = True
+    pseg.dt.word_tag_tab = tags
+    for word, f, _tag in entries:
+        if f == 0:
+            finalseg.add_force_split(word)
+
+
+def _prune(keep: Path) -> None:
+    for p in keep.parent.glob("jieba-dict-*.marshal"):
+        if p != keep:
+            p.unlink(missing_ok=True)
+
+
+def install(custom_path: Path) -> str:
+    """
+    Make jieba use main + custom dictionary; a no-op when that exact
+    combination is already installed. Returns the artifact key.
+    """
+    global _installed
+    with _lock:
+        key = artifact_key(custom_path)
+        if key == _installed:
+            return key
+        entries = custom_entries(custom_path)
+        path = cache_dir() / f"jieba-dict-{key}.marshal"
+        data = _load(path) if path.exists() else None
+        if data is None:
+            data = _apply(_main_dict(), entries)
+            _save(path, data)
+            _prune(path)
+        _install_tables(data, entries)
+        _installed = key
+        ready.set()
+        return key
+
+
+def add_entry(custom_path: Path, word: str) -> None:
+    """
+    Fast path after appending one word to the custom dictionary: patch the
+    live tables instead of reinstalling. The artifact for the new content is
+    built the next time a process starts.
+    """
+    global _installed
+    with _lock:
+        if _installed is None:
+            install(custom_path)
+            return
+        jieba.add_word(word, freq=_DEFAULT_FREQ, tag=_DEFAULT_TAG)
+        _installed = artifact_key(custom_path)
@@ -1,64 +1,400 @@
 from __future__ import annotations
 
+import hashlib
+import logging
+import multiprocessing
+import os
 import re
 import shutil
+import threading
+import time
 import uuid
+from bisect import bisect_right
+from concurrent.futures import Future, ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
 
 import fitz  # PyMuPDF
+
+from word_fetcher.work.corpus import CorpusIndex
+from word_fetcher.work.layout import EXTRACT_VERSION, extract_pages, join_lines
+from word_fetcher.work.marks import MarkStores
+from word_fetcher.work.nounindex import NounIndex
+from word_fetcher.work.metrics import Counter, Histogram, Sampled, stage
 from word_fetcher.work.models import Job, JobStatus
-from word_fetcher.work.nlp import get_dict_words, is_maybe_wrong_word, iter_nouns, reload_resources
-from word_fetcher.work.storage import job_dir, job_marks_path, read_json, write_json
+from word_fetcher.work.annotations import job_annotations, refresh_loaded_annotations
+from word_fetcher.work.nlp import (
+    dict_changes_since,
+    dict_version,
+    ensure_resources,
+    mode_version,
+    noun_extractor,
+    on_dict_change,
+    sentence_cache,
+    stopwords_version,
+    warm_up,
+)
+from word_fetcher.work.results import JobResult, result_cache, write_result
+from word_fetcher.work.scheduler import JobScheduler, scheduler_max_queue, scheduler_workers
+from word_fetcher.work.search import match_spans
+from word_fetcher.work.status import StatusRegistry, persist_interval
+from word_fetcher.work.storage import (
+    corpus_path,
+    job_dir,
+    job_marks_log_path,
+    job_marks_path,
+    jobs_dir,
+    read_json,
+    result_store_dir,
+    utc_ms,
+    write_json,
+)
+from word_fetcher.work.textcache import PageParagraphs, PageText, PageTextWriter, iter_page_text, merge_page_text, read_page, tee_pages
+
 
+logger = logging.getLogger(__name__)
 
 _SENT_SPLIT_RE = re.compile(r"(?<=[。！？；…])")
 
+# Documents shorter than this are indexed in-process; shipping shards to the pool is not worth it.
+_PARALLEL_MIN_PAGES = 16
+# Each worker gets several smaller page ranges so slow pages do not stall one shard.
+_SHARDS_PER_WORKER = 4
+# sentences handed to the analyzer at once (LTP re-batches them by length)
+_NOUN_BATCH_SENTENCES = 256
+
+# content key -> job id of the job currently queued/running for that content
+_inflight: Dict[str, str] = {}
+_inflight_lock = threading.Lock()
+# jobs whose missing text cache is being built in the background
+_text_builds: Set[str] = set()
+_text_builds_lock = threading.Lock()
+# page-shard process pool shared by all jobs, started on first use (see _submit_shard)
+_shard_pool: Optional[ProcessPoolExecutor] = None
+_shard_pool_lock = threading.Lock()
+
+
+def job_workers() -> int:
+    """
+    Page-shard worker processes, shared by all jobs, from WORD_FETCHER_WORKERS
+    (default: CPU count). 1 disables the process pool.
+    """
+    raw = os.getenv("WORD_FETCHER_WORKERS", "").strip()
+    if raw:
+        try:
+            return max(1, int(raw))
+        except ValueError:
+            pass
+    return os.cpu_count() or 1
+
 
 def _status_path(job_id: str) -> Path:
     return job_dir(job_id) / "status.json"
 
 
 def _result_path(job_id: str) -> Path:
+    return job_dir(job_id) / "result.bin"
+
+
+def _legacy_result_path(job_id: str) -> Path:
     return job_dir(job_id) / "result.json"
 
 
+def _meta_path(job_id: str) -> Path:
+    return job_dir(job_id) / "job.json"
+
+
+def _text_path(job_id: str) -> Path:
+    return job_dir(job_id) / "pages.bin"
+
+
 def _input_path(job_id: str, filename: str) -> Path:
     safe = filename.replace("/", "_").replace("\\", "_")
     return job_dir(job_id) / safe
 
 
-def _set_status(job_id: str, state: str, progress: int, message: str) -> None:
-    write_json(_status_path(job_id), {"state": state, "progress": progress, "message": message})
+status_registry = StatusRegistry(_status_path, persist_interval())
+
+
+def _set_status(
+    job_id: str,
+    state: str,
+    progress: int,
+    message: str,
+    pages_done: Optional[int] = None,
+    pages_total: Optional[int] = None,
+    stats: Optional[Dict[str, Any]] = None,
+) -> None:
+    status_registry.set(
+        job_id, state, progress, message, pages_done=pages_done, pages_total=pages_total, stats=stats
+    )
+
+
+def _with_queue_position(job_id: str, st: JobStatus) -> JobStatus:
+    if st.get("state") == "queued":
+        pos = scheduler.position(job_id)
+        if pos is not None:
+            st["queue_position"] = pos
+            st["message"] = f"queued (position {pos})"
+    return st
 
 
 def get_job_status(job_id: str) -> Optional[JobStatus]:
-    p = _status_path(job_id)
-    if not p.exists():
+    st = status_registry.get(job_id)
+    if st is None:
         return None
-    return read_json(p)
+    return _with_queue_position(job_id, st)
+
+
+def get_job_status_versioned(job_id: str) -> Tuple[int, Optional[JobStatus]]:
+    """
+    (version, status); the version changes with every status update, so
+    streaming clients can cheaply detect changes.
+    """
+    version, st = status_registry.get_versioned(job_id)
+    return version, (_with_queue_position(job_id, st) if st is not None else None)
+
+
+def flush_statuses() -> None:
+    status_registry.flush()
+
+
+class UploadTooLargeError(Exception):
+    pass
 
 
-async def create_job(upload) -> Job:
-    job_id = uuid.uuid4().hex
-    input_path = _input_path(job_id, upload.filename)
-    with input_path.open("wb") as f:
-        shutil.copyfileobj(upload.file, f)
+class PageTextPendingError(Exception):
+    """
+    The job's text cache is still being built; retry shortly.
+    """
 
+
+def max_upload_bytes() -> int:
+    """
+    Upload size limit from WORD_FETCHER_MAX_UPLOAD_MB (default 200).
+    """
+    raw = os.getenv("WORD_FETCHER_MAX_UPLOAD_MB", "").strip()
+    try:
+        mb = float(raw) if raw else 200.0
+    except ValueError:
+        mb = 200.0
+    return int(mb * 1024 * 1024)
+
+
+def _write_job_files(job_id: str, filename: str, sha256: str, mode: str = "full") -> None:
+    meta = {
+        "filename": filename,
+        "sha256": sha256,
+        "mode": mode,
+        "extract_version": EXTRACT_VERSION,
+        "created_ms": utc_ms(),
+    }
+    write_json(_meta_path(job_id), meta)
     _set_status(job_id, "queued", 0, "queued")
-    return Job(job_id=job_id, filename=upload.filename, input_path=str(input_path))
-
-
-def _extract_pdf_lines(pdf_path: Path) -> List[Dict[str, Any]]:
-    doc = fitz.open(str(pdf_path))
-    out: List[Dict[str, Any]] = []
-    for page_idx in range(doc.page_count):
-        page = doc.load_page(page_idx)
-        text = page.get_text("text") or ""
-        lines = [ln.strip() for ln in text.splitlines() if ln.strip()]
-        for i, ln in enumerate(lines, start=1):
-            out.append({"page": page_idx + 1, "line": i, "text": ln})
-    return out
+
+
+class JobUpload:
+    """
+    A new job receiving its input file chunk by chunk (the upload sink of
+    web/multipart.py, also fed from zip members). Bytes are hashed as they are
+    written, so deduplication needs no second pass, and the size limit
+    (max_upload_bytes()) is enforced as they arrive (UploadTooLargeError).
+    close() writes the job files and returns the queued Job; abort() discards
+    the job, also after close().
+    """
+
+    def __init__(self, filename: str, mode: str = "full"):
+        self.job_id = uuid.uuid4().hex
+        self.filename = filename
+        self.mode = mode
+        self.input_path = _input_path(self.job_id, filename)
+        self._limit = max_upload_bytes()
+        self._digest = hashlib.sha256()
+        self._size = 0
+        self._f = self.input_path.open("wb")
+
+    def write(self, chunk: bytes) -> None:
+        self._size += len(chunk)
+        if self._size > self._limit:
+            raise UploadTooLargeError(f"file exceeds {self._limit // (1024 * 1024)} MB limit")
+        self._digest.update(chunk)
+        self._f.write(chunk)
+
+    def close(self) -> Job:
+        self._f.close()
+        sha256 = self._digest.hexdigest()
+        _write_job_files(self.job_id, self.filename, sha256, self.mode)
+        return Job(
+            job_id=self.job_id, filename=self.filename, input_path=str(self.input_path), sha256=sha256, mode=self.mode
+        )
+
+    def abort(self) -> None:
+        self._f.close()
+        discard_job(self.job_id)
+
+
+def _content_key(sha256: str, mode: str = "full", extract: str = EXTRACT_VERSION) -> str:
+    """
+    Results are reusable only for the same file under the same dictionary,
+    stopwords, extraction mode and text extraction (jobs created before
+    layout-aware extraction have extract == "").
+    """
+    key = f"{sha256}-{dict_version()}-{stopwords_version()}"
+    extra = mode_version(mode)
+    key = f"{key}-{extra}" if extra else key
+    return f"{key}-{extract}" if extract else key
+
+
+def _stored_result_path(key: str) -> Path:
+    return result_store_dir() / f"{key}.bin"
+
+
+def _stored_text_path(sha256: str, extract: str = EXTRACT_VERSION) -> Path:
+    # page text depends on the file and the extraction only, not on the dictionaries
+    return result_store_dir() / (f"{sha256}-{extract}.pages.bin" if extract else f"{sha256}.pages.bin")
+
+
+def _link_or_copy(src: Path, dst: Path) -> None:
+    tmp = dst.with_suffix(dst.suffix + ".tmp")
+    tmp.unlink(missing_ok=True)
+    try:
+        os.link(src, tmp)
+    except OSError:
+        shutil.copyfile(src, tmp)
+    os.replace(tmp, dst)
+
+
+def _reuse_or_claim(job: Job) -> Tuple[Optional[Dict[str, Any]], str]:
+    """
+    (response, content key): a response when the job's content was already
+    processed (reused) or is being processed (coalesced, the new job is
+    discarded); otherwise None and the job is registered as in flight for its
+    key, which the caller must release if it cannot queue the job.
+    """
+    key = _content_key(job.sha256, job.mode) if job.sha256 else ""
+    stored = _stored_result_path(key) if key else None
+    if stored is not None and stored.exists():
+        _link_or_copy(stored, _result_path(job.job_id))
+        stored_text = _stored_text_path(job.sha256)
+        if stored_text.exists():
+            _link_or_copy(stored_text, _text_path(job.job_id))
+        _index_in_corpus(job.job_id)
+        _set_status(job.job_id, "done", 100, "done (reused result)")
+        return {"job_id": job.job_id, "reused": True}, key
+
+    if key:
+        with _inflight_lock:
+            running = _inflight.get(key)
+            if running is not None:
+                discard_job(job.job_id)
+                return {"job_id": running, "coalesced": True}, key
+            _inflight[key] = job.job_id
+    return None, key
+
+
+def _release_inflight(job_id: str) -> None:
+    with _inflight_lock:
+        for key in [k for k, v in _inflight.items() if v == job_id]:
+            del _inflight[key]
+
+
+def submit_or_reuse(job: Job, priority: int = 0) -> Dict[str, Any]:
+    """
+    Queue a freshly created job unless its content was already processed:
+    - a stored result for the same content key is reused instantly;
+    - an identical upload still queued/running absorbs this one (the new job
+      is discarded and the running job's id is returned).
+    Raises QueueFullError when it has to queue and the queue is full.
+    """
+    response, _key = _reuse_or_claim(job)
+    if response is not None:
+        return response
+    try:
+        position = scheduler.submit(job.job_id, priority)
+    except Exception:
+        _release_inflight(job.job_id)
+        raise
+    return {"job_id": job.job_id, "queue_position": position}
+
+
+def _job_meta(job_id: str) -> Dict[str, Any]:
+    p = _meta_path(job_id)
+    return read_json(p) if p.exists() else {}
+
+
+def _job_mode(job_id: str) -> str:
+    return _job_meta(job_id).get("mode", "full")
+
+
+def _record_index_versions(job_id: str) -> None:
+    """
+    Note which dictionary/stopwords the job's result reflects, and publish the
+    result (and page text) to the content-addressed store under that key.
+    """
+    meta = _job_meta(job_id)
+    meta["dict_version"] = dict_version()
+    meta["stopwords_version"] = stopwords_version()
+    write_json(_meta_path(job_id), meta)
+    if meta.get("sha256"):
+        key = _content_key(meta["sha256"], meta.get("mode", "full"), meta.get("extract_version", ""))
+        _link_or_copy(_result_path(job_id), _stored_result_path(key))
+        _publish_text(job_id, meta)
+
+
+def _publish_text(job_id: str, meta: Dict[str, Any]) -> None:
+    """
+    Share the job's text cache through the result store, so jobs reusing its
+    result get page text without extracting the PDF again.
+    """
+    text_path = _text_path(job_id)
+    if meta.get("sha256") and text_path.exists():
+        _link_or_copy(text_path, _stored_text_path(meta["sha256"], meta.get("extract_version", "")))
+
+
+# --------- corpus ----------
+corpus = CorpusIndex(corpus_path())
+
+
+def _index_in_corpus(job_id: str) -> None:
+    """
+    Add (or replace) a finished job in the corpus index. Failures are logged,
+    not raised: the job's own result is already saved.
+    """
+    try:
+        corpus.add_document(job_id, _job_meta(job_id).get("filename", ""), _load_result(job_id))
+    except Exception:
+        logger.exception("failed to add job %s to the corpus index", job_id)
+
+
+def sync_corpus() -> int:
+    """
+    Index finished jobs the corpus does not know yet (jobs from before the
+    corpus existed, or whose indexing failed). Returns how many were added.
+    """
+    known = corpus.document_ids()
+    added = 0
+    for path in sorted(jobs_dir().glob("*/status.json")):
+        job_id = path.parent.name
+        if job_id in known or not _result_path(job_id).exists():
+            continue
+        st = get_job_status(job_id)
+        if st is None or st.get("state") != "done":
+            continue
+        _index_in_corpus(job_id)
+        added += 1
+    return added
+
+
+def _pdf_page_count(pdf_path: Path) -> int:
+    """
+    Page count of a PDF about to be indexed; raises ValueError for a PDF
+    without pages, which has nothing to index (and no page shards).
+    """
+    with fitz.open(str(pdf_path)) as doc:
+        if doc.page_count == 0:
+            raise ValueError("the PDF has no pages")
+        return doc.page_count
 
 
 def _sentences_from_line(line_text: str) -> List[str]:
@@ -67,24 +403,320 @@ def _sentences_from_line(line_text: str) -> List[str]:
     return parts if parts else [line_text.strip()]
 
 
-def _build_index(lines: List[Dict[str, Any]]) -> Dict[str, Any]:
-    noun_counts: Dict[str, int] = {}
-    occurrences_by_noun: Dict[str, List[Dict[str, Any]]] = {}
+def _paragraph_sentences(lines: List[str]) -> List[Tuple[int, str]]:
+    """
+    (line offset, sentence) for one paragraph: wrapped lines are joined back
+    before splitting, and each sentence belongs to the line it starts on.
+    """
+    if len(lines) == 1:
+        return [(0, sent) for sent in _sentences_from_line(lines[0])]
+    text, starts = join_lines(lines)
+    out: List[Tuple[int, str]] = []
+    pos = 0
+    for part in _SENT_SPLIT_RE.split(text):
+        sent = part.strip()
+        if sent:
+            begin = pos + len(part) - len(part.lstrip())
+            out.append((bisect_right(starts, begin) - 1, sent))
+        pos += len(part)
+    return out
+
+
+def _page_sentences(paragraphs: List[List[str]]) -> Iterator[Tuple[int, str]]:
+    """
+    (line, sentence) for one page, lines numbered from 1.
+    """
+    line = 1
+    for para in paragraphs:
+        for offset, sent in _paragraph_sentences(para):
+            yield line + offset, sent
+        line += len(para)
+
+
+def _timed_pages(pages: Iterable[PageParagraphs], stats: Dict[str, Any]) -> Iterator[PageParagraphs]:
+    """
+    Charge the time spent producing each page (fitz + text cache) to "extract".
+    """
+    it = iter(pages)
+    while True:
+        with stage(stats, "extract"):
+            item = next(it, None)
+        if item is None:
+            return
+        yield item
+
+
+def _build_index(
+    pages: Iterable[PageParagraphs],
+    on_page: Optional[Callable[[int], None]] = None,
+    stats: Optional[Dict[str, Any]] = None,
+    mode: str = "full",
+) -> NounIndex:
+    """
+    Build the noun index incrementally from a stream of (page, paragraphs). Sentences
+    are buffered across pages only up to one analyzer batch, so memory stays
+    bounded. on_page(pages_done) runs as pages complete. stats, if given,
+    accumulates extract/tokenize seconds and page/sentence/noun counts.
+    mode selects the extractor (nlp.noun_extractor).
+    """
+    if stats is None:
+        stats = {}
+    extract = noun_extractor(mode)
+    index = NounIndex()
+    pending: List[Tuple[int, int, str]] = []  # (page, line, sentence)
+    pending_pages = 0
+    pages_done = 0
+    found = 0
+
+    def flush() -> None:
+        nonlocal pending_pages, pages_done, found
+        with stage(stats, "tokenize"):
+            batch = extract([x[2] for x in pending])
+        for (page, line, sent), nouns in zip(pending, batch):
+            if not nouns:
+                continue
+            sid = index.sentence_id(sent)
+            for noun, _flag in nouns:
+                index.add(index.noun_id(noun), page, line, sid)
+            found += len(nouns)
+        stats["sentences"] = stats.get("sentences", 0) + len(pending)
+        pending.clear()
+        pages_done += pending_pages
+        pending_pages = 0
+        if on_page is not None:
+            on_page(pages_done)
+
+    for page, paragraphs in _timed_pages(pages, stats):
+        for line, sent in _page_sentences(paragraphs):
+            pending.append((page, line, sent))
+        pending_pages += 1
+        if len(pending) >= _NOUN_BATCH_SENTENCES:
+            flush()
+    flush()
+    stats["pages"] = stats.get("pages", 0) + pages_done
+    stats["nouns"] = stats.get("nouns", 0) + found
+    return index
 
-    for row in lines:
-        page = int(row["page"])
-        line = int(row["line"])
-        text = str(row["text"])
 
-        for sent in _sentences_from_line(text):
-            for noun, _flag in iter_nouns(sent):
-                noun_counts[noun] = noun_counts.get(noun, 0) + 1
-                occ = {"page": page, "line": line, "sentence": sent}
-                occurrences_by_noun.setdefault(noun, []).append(occ)
+def _page_ranges(page_count: int, shards: int) -> List[Tuple[int, int]]:
+    shards = max(1, min(shards, page_count))
+    size = -(-page_count // shards)
+    return [(start, min(start + size, page_count)) for start in range(0, page_count, size)]
+
+
+def _index_page_range(
+    pdf_path: str, start: int, stop: int, text_path: str, mode: str = "full"
+) -> Tuple[NounIndex, Dict[str, Any]]:
+    """
+    Process-pool entry point: each worker opens its own fitz document and loads
+    dictionaries through ensure_resources() (once per process, again only if
+    their files changed). The shard's page text is cached to text_path for the
+    parent to merge. Also returns the shard's stats, including its
+    sentence-cache counters and new entries, for the parent to absorb (the
+    worker's memory ends with the pool).
+    """
+    ensure_resources()
+    sentence_cache.begin_export()
+    stats: Dict[str, Any] = {}
+    pages = tee_pages(extract_pages(Path(pdf_path), start, stop, stats), PageTextWriter(Path(text_path)))
+    index = _build_index(pages, stats=stats, mode=mode)
+    stats["sentence_cache"] = sentence_cache.export()
+    return index, stats
+
+
+def _pool_context() -> Any:
+    # never fork: this process runs scheduler and request threads, and a child
+    # forked while one of them holds a lock (status registry, sqlite, logging)
+    # can deadlock on it. A forkserver forks from a clean single-threaded
+    # process that has this module imported already.
+    if "forkserver" in multiprocessing.get_all_start_methods():
+        ctx = multiprocessing.get_context("forkserver")
+        ctx.set_forkserver_preload([__name__])
+        return ctx
+    return multiprocessing.get_context("spawn")
+
+
+def _submit_shard(fn: Callable[..., Any], *args: Any) -> Future:
+    """
+    Run fn(*args) (normally _index_page_range) in the shard pool. The pool is shared by every
+    job, so no more than job_workers() worker processes exist however many
+    jobs run at once; workers outlive jobs and keep their dictionaries loaded.
+    A pool broken by a dead worker is replaced on the next submit.
+    """
+    global _shard_pool
+    with _shard_pool_lock:
+        if _shard_pool is not None:
+            try:
+                return _shard_pool.submit(fn, *args)
+            except BrokenProcessPool:
+                _shard_pool.shutdown(wait=False, cancel_futures=True)
+        _shard_pool = ProcessPoolExecutor(max_workers=job_workers(), mp_context=_pool_context())
+        return _shard_pool.submit(fn, *args)
+
+
+def warm_shard_pool() -> None:
+    """
+    Start the shard pool's workers and warm each one up (dictionaries and
+    analyzer, see nlp.warm_up), so the first long document does not wait for
+    them. Run in the background at server start-up.
+    """
+    workers = job_workers()
+    if workers <= 1:
+        return
+    try:
+        for fut in [_submit_shard(warm_up) for _ in range(workers)]:
+            fut.result()
+    except Exception:
+        logger.exception("shard pool warm-up failed")
+
 
-    nouns = [{"noun": n, "count": c} for n, c in noun_counts.items()]
-    nouns.sort(key=lambda x: (-x["count"], x["noun"]))
-    return {"nouns": nouns, "occurrences_by_noun": occurrences_by_noun}
+def shutdown_shard_pool() -> None:
+    """
+    Stop the shard pool's worker processes (on server shutdown); a later shard
+    starts a new pool.
+    """
+    global _shard_pool
+    with _shard_pool_lock:
+        pool, _shard_pool = _shard_pool, None
+    if pool is not None:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+def _merge_stats(into: Dict[str, Any], part: Dict[str, Any]) -> None:
+    for key, value in part.items():
+        if key == "stages":
+            stages = into.setdefault("stages", {})
+            for name, seconds in value.items():
+                stages[name] = stages.get(name, 0.0) + seconds
+        else:
+            into[key] = into.get(key, 0) + value
+
+
+def _merge_indexes(parts: List[NounIndex]) -> NounIndex:
+    """
+    Merge partial indexes; parts must be in page order so occurrences stay sorted.
+    """
+    merged = NounIndex()
+    for part in parts:
+        merged.extend(part)
+    return merged
+
+
+def _page_progress(job_id: str, page_count: int, lo: int, hi: int) -> Callable[[int], None]:
+    """
+    Progress callback mapping pages done onto [lo, hi]; status is only rewritten
+    when the percentage actually moves.
+    """
+    last = -1
+
+    def report(pages_done: int) -> None:
+        nonlocal last
+        pct = lo + (hi - lo) * pages_done // max(1, page_count)
+        if pct != last:
+            last = pct
+            _set_status(
+                job_id,
+                "running",
+                pct,
+                f"extracting nouns ({pages_done}/{page_count} pages)",
+                pages_done=pages_done,
+                pages_total=page_count,
+            )
+
+    return report
+
+
+def _shard_text_paths(text_path: Path, shards: int) -> List[Path]:
+    return [text_path.with_name(f"{text_path.name}.{i}") for i in range(shards)]
+
+
+def _merge_shards(
+    parts: List[Optional[NounIndex]], shard_text: List[Path], text_path: Path, stats: Dict[str, Any]
+) -> NounIndex:
+    with stage(stats, "merge"):
+        merge_page_text(shard_text, text_path)
+        return _merge_indexes([p for p in parts if p is not None])
+
+
+def _build_index_parallel(
+    pdf_path: Path,
+    page_count: int,
+    workers: int,
+    on_page: Callable[[int], None],
+    text_path: Path,
+    stats: Dict[str, Any],
+    mode: str = "full",
+) -> NounIndex:
+    """
+    Index page shards in the shared process pool. Shard extract/tokenize times
+    are summed into stats, so they are worker seconds rather than wall time.
+    """
+    ranges = _page_ranges(page_count, workers * _SHARDS_PER_WORKER)
+    shard_text = _shard_text_paths(text_path, len(ranges))
+    parts: List[Optional[NounIndex]] = [None] * len(ranges)
+    pages_done = 0
+    futures: Dict[Future, int] = {}
+    try:
+        for i, (start, stop) in enumerate(ranges):
+            futures[_submit_shard(_index_page_range, str(pdf_path), start, stop, str(shard_text[i]), mode)] = i
+        for fut in as_completed(futures):
+            i = futures[fut]
+            parts[i], shard_stats = fut.result()
+            sentence_cache.absorb(shard_stats.pop("sentence_cache"))
+            _merge_stats(stats, shard_stats)
+            pages_done += ranges[i][1] - ranges[i][0]
+            on_page(pages_done)
+    except BaseException:
+        # the pool outlives this job: do not leave its other shards queued
+        for fut in futures:
+            fut.cancel()
+        raise
+    return _merge_shards(parts, shard_text, text_path, stats)
+
+
+# --------- metrics ----------
+job_stage_seconds = Histogram(
+    "word_fetcher_job_stage_seconds",
+    "Seconds per job stage; extract/tokenize are summed over page shards (worker seconds).",
+    ["stage"],
+)
+jobs_finished = Counter(
+    "word_fetcher_jobs_total", "Finished jobs by kind (run, batch, reindex) and outcome.", ["kind", "outcome"]
+)
+items_processed = Counter("word_fetcher_processed_total", "Pages, sentences and noun occurrences indexed.", ["unit"])
+result_size_bytes = Histogram(
+    "word_fetcher_result_bytes",
+    "Size of written result files.",
+    buckets=(1e4, 1e5, 1e6, 1e7, 1e8, 1e9),
+)
+
+# queue wait of jobs a worker just picked up, handed from the scheduler to run_job
+_queue_waits: Dict[str, float] = {}
+
+
+def _job_stats(job_id: str) -> Dict[str, Any]:
+    stats: Dict[str, Any] = {"stages": {}}
+    wait = _queue_waits.pop(job_id, None)
+    if wait is not None:
+        stats["stages"]["queue_wait"] = wait
+    return stats
+
+
+def _publish_stats(stats: Dict[str, Any], kind: str, outcome: str) -> Dict[str, Any]:
+    """
+    Feed a finished job's stats into the metrics; returns them rounded for its status.
+    """
+    for name, seconds in stats.get("stages", {}).items():
+        job_stage_seconds.observe(seconds, stage=name)
+    for unit in ("pages", "sentences", "nouns"):
+        if stats.get(unit):
+            items_processed.inc(stats[unit], unit=unit)
+    if "result_bytes" in stats:
+        result_size_bytes.observe(stats["result_bytes"])
+    jobs_finished.inc(kind=kind, outcome=outcome)
+    out = dict(stats)
+    out["stages"] = {name: round(seconds, 4) for name, seconds in stats.get("stages", {}).items()}
+    return out
 
 
 def run_job(job_id: str) -> None:
@@ -106,125 +738,518 @@ def run_job(job_id: str) -> None:
         _set_status(job_id, "error", 0, "unsupported file type (only .pdf)")
         return
 
+    stats = _job_stats(job_id)
     try:
         _set_status(job_id, "running", 5, "preparing")
-        _set_status(job_id, "running", 35, "extracting text")
-        lines = _extract_pdf_lines(input_path)
+        with stage(stats, "prepare"):
+            page_count = _pdf_page_count(input_path)
+
+        # dictionaries stay loaded between jobs (here and in the pool workers);
+        # they are only re-read when their files changed on disk
+        _set_status(job_id, "running", 10, "loading dictionaries")
+        with stage(stats, "load_dictionaries"):
+            ensure_resources()
+
+        result = _index_document(job_id, input_path, page_count, job_workers(), stats)
+        _finish_job(job_id, result, stats, "run")
+    except Exception as e:
+        _fail_job(job_id, e, stats, "run")
+    finally:
+        _release_inflight(job_id)
+
+
+def _index_document(
+    job_id: str, input_path: Path, page_count: int, workers: int, stats: Dict[str, Any]
+) -> NounIndex:
+    mode = _job_mode(job_id)
+    on_page = _page_progress(job_id, page_count, 15, 90)
+    with stage(stats, "index"):
+        if workers > 1 and page_count >= _PARALLEL_MIN_PAGES:
+            return _build_index_parallel(input_path, page_count, workers, on_page, _text_path(job_id), stats, mode)
+        pages = tee_pages(extract_pages(input_path, stats=stats), PageTextWriter(_text_path(job_id)))
+        return _build_index(pages, on_page, stats, mode)
+
+
+def _finish_job(job_id: str, result: NounIndex, stats: Dict[str, Any], kind: str, message: str = "done") -> None:
+    """
+    Save a job's new result, publish it (result store, corpus) and mark it done.
+    """
+    _set_status(job_id, "running", 90, "saving result")
+    with stage(stats, "save_result"):
+        write_result(_result_path(job_id), result)
+        result_cache.invalidate(job_id)
+        _record_index_versions(job_id)
+    with stage(stats, "corpus"):
+        _index_in_corpus(job_id)
+    stats["distinct_nouns"] = result.distinct_nouns()
+    stats["result_bytes"] = _result_path(job_id).stat().st_size
+    _set_status(job_id, "done", 100, message, stats=_publish_stats(stats, kind, "done"))
+
+
+def _fail_job(job_id: str, error: BaseException, stats: Dict[str, Any], kind: str) -> None:
+    _set_status(job_id, "error", 100, f"error: {error}", stats=_publish_stats(stats, kind, "error"))
+
+
+# --------- running jobs for other schedulers (batches) ----------
+def claim_job(job: Job, message: str = "queued") -> Optional[Dict[str, Any]]:
+    """
+    The response for a new job whose content was already processed or is in
+    flight (reused/coalesced, see submit_or_reuse). Otherwise None: the job is
+    marked queued with message and claimed as in flight for its content until
+    release_job().
+    """
+    response, _key = _reuse_or_claim(job)
+    if response is None:
+        _set_status(job.job_id, "queued", 0, message)
+    return response
+
+
+def release_job(job_id: str) -> None:
+    _release_inflight(job_id)
+
+
+def take_queue_wait(task_id: str) -> Optional[float]:
+    """
+    Seconds the scheduler task task_id waited in the queue (once, when it starts).
+    """
+    return _queue_waits.pop(task_id, None)
+
+
+class JobRun:
+    """
+    One queued job indexed by a caller that schedules the work itself
+    (run_batch). prepare() opens the PDF; then either index() runs it
+    in-process, or start_shards() submits its page shards to a pool and
+    shard_done() takes each back, saving the result with the last one. fail()
+    records an error at any point. kind labels the job's metrics.
+    """
+
+    def __init__(self, job_id: str, kind: str, queue_wait: Optional[float] = None):
+        self.job_id = job_id
+        self.kind = kind
+        self.stats: Dict[str, Any] = {"stages": {}}
+        if queue_wait is not None:
+            self.stats["stages"]["queue_wait"] = queue_wait
+        self.input_path: Optional[Path] = None
+        self.page_count = 0
+        self._ranges: List[Tuple[int, int]] = []
+        self._parts: List[Optional[NounIndex]] = []
+        self._shard_text: List[Path] = []
+        self._left = 0
+        self._pages_done = 0
+        self._failed: Optional[BaseException] = None
+        self._on_page: Optional[Callable[[int], None]] = None
+        self._started = 0.0
+
+    def prepare(self) -> None:
+        input_path = _find_input_pdf(self.job_id)
+        if input_path is None:
+            raise FileNotFoundError("input file missing")
+        with stage(self.stats, "prepare"):
+            self.page_count = _pdf_page_count(input_path)
+        self.input_path = input_path
+
+    def index(self) -> None:
+        """
+        Index the document in this process and save the result.
+        """
+        assert self.input_path is not None
+        self.finish(_index_document(self.job_id, self.input_path, self.page_count, 1, self.stats))
+
+    def start_shards(self, workers: int) -> Dict[Future, int]:
+        """
+        Submit the document's page shards to the shared pool (one shard unless
+        it is long enough to split for workers); returns future -> shard number. If a submit fails, the
+        shards already submitted still count and the job fails once they are back.
+        """
+        assert self.input_path is not None
+        shards = workers * _SHARDS_PER_WORKER if self.page_count >= _PARALLEL_MIN_PAGES else 1
+        self._ranges = _page_ranges(self.page_count, shards)
+        text_path = _text_path(self.job_id)
+        self._shard_text = _shard_text_paths(text_path, len(self._ranges))
+        self._parts = [None] * len(self._ranges)
+        self._left = len(self._ranges)
+        self._on_page = _page_progress(self.job_id, self.page_count, 15, 90)
+        self._started = time.perf_counter()
+        _set_status(self.job_id, "running", 15, "extracting nouns")
+        mode = _job_mode(self.job_id)
+        futures: Dict[Future, int] = {}
+        for i, (lo, hi) in enumerate(self._ranges):
+            try:
+                fut = _submit_shard(_index_page_range, str(self.input_path), lo, hi, str(self._shard_text[i]), mode)
+            except Exception as e:
+                self._failed = e
+                self._left = len(futures)
+                if not futures:
+                    self._finish_shards()
+                break
+            futures[fut] = i
+        return futures
+
+    def shard_done(self, i: int, fut: Future) -> None:
+        try:
+            self._parts[i], shard_stats = fut.result()
+            sentence_cache.absorb(shard_stats.pop("sentence_cache"))
+            _merge_stats(self.stats, shard_stats)
+            lo, hi = self._ranges[i]
+            self._pages_done += hi - lo
+            if self._on_page is not None:
+                self._on_page(self._pages_done)
+        except Exception as e:
+            self._failed = self._failed or e
+        self._left -= 1
+        if self._left == 0:
+            self._finish_shards()
 
-        _set_status(job_id, "running", 55, "loading dictionaries")
-        reload_resources()
+    def _finish_shards(self) -> None:
+        stages = self.stats["stages"]
+        stages["index"] = stages.get("index", 0.0) + time.perf_counter() - self._started
+        try:
+            if self._failed is not None:
+                raise self._failed
+            self.finish(_merge_shards(self._parts, self._shard_text, _text_path(self.job_id), self.stats))
+        except Exception as e:
+            self.fail(e)
 
-        _set_status(job_id, "running", 70, "extracting nouns")
-        result = _build_index(lines)
+    def finish(self, result: NounIndex) -> None:
+        _finish_job(self.job_id, result, self.stats, self.kind)
 
-        _set_status(job_id, "running", 90, "saving result")
-        write_json(_result_path(job_id), result)
+    def fail(self, error: BaseException) -> None:
+        for part in self._shard_text:
+            part.unlink(missing_ok=True)
+        _fail_job(self.job_id, error, self.stats, self.kind)
 
-        _set_status(job_id, "done", 100, "done")
+
+# --------- re-index ----------
+def _find_input_pdf(job_id: str) -> Optional[Path]:
+    for p in job_dir(job_id).glob("*"):
+        if p.suffix.lower() == ".pdf":
+            return p
+    return None
+
+
+def _cached_pages(job_id: str) -> Iterator[PageParagraphs]:
+    """
+    Page text from the job's text cache; jobs from before the cache existed
+    are extracted once more and cached on the way.
+    """
+    text_path = _text_path(job_id)
+    if text_path.exists():
+        return iter_page_text(text_path)
+    pdf = _find_input_pdf(job_id)
+    if pdf is None:
+        raise FileNotFoundError(text_path)
+    return tee_pages(extract_pages(pdf), PageTextWriter(text_path))
+
+
+def _build_text(job_id: str) -> None:
+    try:
+        for _ in _cached_pages(job_id):
+            pass
+        _publish_text(job_id, _job_meta(job_id))
+    except Exception:
+        logger.exception("failed to build the text cache of job %s", job_id)
+    finally:
+        with _text_builds_lock:
+            _text_builds.discard(job_id)
+
+
+def _page_text_path(job_id: str) -> Path:
+    """
+    The job's text cache. Jobs that predate it (or reused a result stored
+    without page text) have it extracted in a background thread, never on the
+    caller's request: PageTextPendingError until it is written. Raises
+    FileNotFoundError for unknown or unfinished jobs.
+    """
+    text_path = _text_path(job_id)
+    if text_path.exists():
+        return text_path
+    st = get_job_status(job_id)
+    if st is None or st.get("state") != "done":
+        raise FileNotFoundError(text_path)
+    with _text_builds_lock:
+        if job_id not in _text_builds:
+            _text_builds.add(job_id)
+            threading.Thread(target=_build_text, args=(job_id,), name=f"text-{job_id}", daemon=True).start()
+    raise PageTextPendingError("page text is being prepared, retry shortly")
+
+
+def get_page_lines(job_id: str, page: int) -> List[str]:
+    """
+    Text lines of one page from the job's text cache. Raises FileNotFoundError
+    for unknown or unfinished jobs, PageTextPendingError while the cache is
+    being built and KeyError for pages outside the document.
+    """
+    return read_page(_page_text_path(job_id), page)
+
+
+def _patch_index(
+    index: NounIndex, pages: Iterable[PageParagraphs], words: List[str], mode: str = "full"
+) -> NounIndex:
+    """
+    Re-segment only the sentences containing one of `words` and splice the new
+    occurrences into index in place; everything else is left untouched.
+    """
+    words = [w for w in words if w]
+    affected: Dict[Tuple[int, int], List[str]] = {}
+    for page, paragraphs in pages:
+        for line, sent in _page_sentences(paragraphs):
+            if any(w in sent for w in words):
+                affected.setdefault((page, line), []).append(sent)
+    if not affected:
+        return index
+
+    sentences = index.sentences
+    index.keep(lambda page, line, sid: sentences[sid] not in affected.get((page, line), ()))
+    rows = [(page, line, sent) for (page, line), sents in affected.items() for sent in sents]
+    for (page, line, sent), nouns in zip(rows, noun_extractor(mode)([r[2] for r in rows])):
+        if not nouns:
+            continue
+        sid = index.sentence_id(sent)
+        for noun, _flag in nouns:
+            index.add(index.noun_id(noun), page, line, sid)
+    return index
+
+
+def reindex_job(job_id: str, words: Optional[List[str]] = None) -> None:
+    """
+    Bring a finished job up to the current dictionary from its cached page text.
+    words: the dictionary words that were added/removed; when omitted they are
+    taken from the dictionary change journal, and if that is unknown every
+    sentence is re-segmented (still without re-running fitz).
+    """
+    stats = _job_stats(job_id)
+    try:
+        _set_status(job_id, "running", 10, "re-indexing")
+        meta = _job_meta(job_id)
+        mode = meta.get("mode", "full")
+        if not words:
+            since = meta.get("dict_version")
+            words = dict_changes_since(since) if since else None
+
+        with stage(stats, "index"):
+            if words is None:
+                result = _build_index(_cached_pages(job_id), stats=stats, mode=mode)
+            else:
+                result = _patch_index(NounIndex.from_result(_load_result(job_id)), _cached_pages(job_id), words, mode)
+
+        _finish_job(job_id, result, stats, "reindex", message="done (re-indexed)")
     except Exception as e:
-        _set_status(job_id, "error", 100, f"error: {e}")
+        _fail_job(job_id, e, stats, "reindex")
+
+
+def submit_reindex(job_id: str, words: Optional[List[str]] = None, priority: int = 0) -> int:
+    """
+    Queue a re-index of a finished job. Raises FileNotFoundError for unknown
+    jobs, ValueError when the job is not finished, QueueFullError when full.
+    """
+    st = get_job_status(job_id)
+    if st is None:
+        raise FileNotFoundError(_status_path(job_id))
+    if st.get("state") not in ("done", "error"):
+        raise ValueError(f"job is {st.get('state')}")
+    previous = dict(st)
+    _set_status(job_id, "queued", 0, "queued (re-index)")
+    try:
+        return scheduler.submit(job_id, priority, task=lambda: reindex_job(job_id, words))
+    except Exception:
+        status_registry.put(job_id, previous)
+        raise
 
 
-def _load_result(job_id: str) -> Dict[str, Any]:
+def _job_started(job_id: str, queue_wait: float) -> None:
+    _queue_waits[job_id] = queue_wait
+
+
+scheduler = JobScheduler(
+    run_job, workers=scheduler_workers(), max_queue=scheduler_max_queue(), on_start=_job_started
+)
+
+
+Sampled("word_fetcher_queue_depth", "Jobs waiting in the queue.", lambda: scheduler.stats()["queued"])
+Sampled("word_fetcher_jobs_running", "Jobs being processed.", lambda: scheduler.stats()["running"])
+Sampled("word_fetcher_result_cache_bytes", "Bytes charged to the result cache.", lambda: result_cache.stats()["bytes"])
+Sampled("word_fetcher_result_cache_hits_total", "Result cache hits.", lambda: result_cache.hits, kind="counter")
+Sampled("word_fetcher_result_cache_misses_total", "Result cache misses.", lambda: result_cache.misses, kind="counter")
+Sampled(
+    "word_fetcher_sentence_cache_hits_total",
+    "Sentence memo hits (memory and disk).",
+    lambda: sentence_cache.counters["hits"] + sentence_cache.counters["disk_hits"],
+    kind="counter",
+)
+Sampled(
+    "word_fetcher_sentence_cache_misses_total",
+    "Sentence memo misses.",
+    lambda: sentence_cache.counters["misses"],
+    kind="counter",
+)
+
+
+def queue_has_capacity() -> bool:
+    return scheduler.has_capacity()
+
+
+def discard_job(job_id: str) -> None:
+    """
+    Remove a job that was created but never queued.
+    """
+    status_registry.forget(job_id)
+    mark_stores.forget(job_id)
+    shutil.rmtree(job_dir(job_id), ignore_errors=True)
+
+
+def scheduler_stats() -> Dict[str, Any]:
+    return scheduler.stats()
+
+
+def _load_result(job_id: str) -> JobResult:
     p = _result_path(job_id)
     if not p.exists():
-        raise FileNotFoundError(p)
-    return read_json(p)
+        legacy = _legacy_result_path(job_id)
+        if not legacy.exists():
+            raise FileNotFoundError(p)
+        # jobs finished before the columnar format: convert once
+        write_result(p, read_json(legacy))
+    return result_cache.get(job_id, p)
 
 
-# --------- marks ----------
-def _load_marks(job_id: str) -> List[Dict[str, Any]]:
-    path = job_marks_path(job_id)
-    if not path.exists():
-        return []
-    return read_json(path)
+def result_cache_stats() -> Dict[str, Any]:
+    return result_cache.stats()
+
 
+# keep cached annotation flags in step with /api/dict edits
+on_dict_change(lambda _word: refresh_loaded_annotations(result_cache.loaded()))
 
-def list_marks(job_id: str) -> List[Dict[str, Any]]:
-    return _load_marks(job_id)
+
+# --------- marks ----------
+mark_stores = MarkStores(job_marks_log_path, job_marks_path)
 
 
-def _mark_key(noun: str, page: int, line: int, sentence: str) -> str:
-    return f"{page}:{line}:{noun}:{sentence}"
+def list_marks(
+    job_id: str, noun: Optional[str] = None, page_from: Optional[int] = None, page_to: Optional[int] = None
+) -> List[Dict[str, Any]]:
+    return mark_stores.get(job_id).query(noun=noun, page_from=page_from, page_to=page_to)
 
 
 def add_mark(job_id: str, noun: str, page: int, line: int, sentence: str) -> Dict[str, Any]:
-    noun = str(noun).strip()
-    if not noun:
-        raise ValueError("noun required")
-    key = _mark_key(noun, int(page), int(line), str(sentence))
-    entry = {
-        "noun": noun,
-        "page": int(page),
-        "line": int(line),
-        "sentence": str(sentence),
-        "id": key,
-    }
-    marks = _load_marks(job_id)
-    # avoid duplicates
-    if any(m.get("id") == key for m in marks):
-        return entry
-    marks.append(entry)
-    write_json(job_marks_path(job_id), marks)
-    return entry
+    return mark_stores.get(job_id).add(noun, page, line, sentence)
 
 
 def toggle_mark(job_id: str, noun: str, page: int, line: int, sentence: str) -> Dict[str, Any]:
-    noun = str(noun).strip()
-    if not noun:
-        raise ValueError("noun required")
-    key = _mark_key(noun, int(page), int(line), str(sentence))
-    marks = _load_marks(job_id)
-    remaining = [m for m in marks if m.get("id") != key]
-    if len(remaining) != len(marks):
-        # existed -> remove
-        write_json(job_marks_path(job_id), remaining)
-        return {"removed": True, "added": False, "id": key}
-    # not exist -> add
-    entry = {
-        "noun": noun,
-        "page": int(page),
-        "line": int(line),
-        "sentence": str(sentence),
-        "id": key,
-    }
-    remaining.append(entry)
-    write_json(job_marks_path(job_id), remaining)
-    return {"removed": False, "added": True, "id": key}
+    return mark_stores.get(job_id).toggle(noun, page, line, sentence)
+
+
+def _sort_ids(result: JobResult, ids: List[int], sort: str) -> List[int]:
+    """
+    Order a subset of noun ids like result.order(sort) would.
+    """
+    if sort == "count_asc":
+        counts, nouns = result.noun_counts, result.nouns()
+        return sorted(ids, key=lambda i: (counts[i], nouns[i]))
+    if sort == "alpha":
+        nouns = result.nouns()
+        return sorted(ids, key=lambda i: nouns[i])
+    return sorted(ids)
 
 
-def list_job_nouns(job_id: str, query: Optional[str], sort: str) -> List[Dict[str, Any]]:
+def list_job_nouns(
+    job_id: str,
+    query: Optional[str],
+    sort: str,
+    page: int = 1,
+    page_size: int = 50,
+    min_len: int = 0,
+    match: str = "substring",
+) -> Dict[str, Any]:
+    """
+    One page of the job's nouns in a precomputed sort order, with the total
+    number of matches; only the returned page is materialized and annotated.
+    query is matched through the job's gram index, as a substring or (match=
+    "prefix") a prefix; matching items carry highlight offsets in "match".
+    """
     result = _load_result(job_id)
-    nouns = list(result.get("nouns", []))
-    dict_words = get_dict_words()
+    order = result.order(sort)
+    page = max(1, int(page))
+    page_size = max(1, int(page_size))
+    start = (page - 1) * page_size
+    prefix = match == "prefix"
 
-    if query:
-        q = query.strip()
-        if q:
-            nouns = [x for x in nouns if q in x.get("noun", "")]
-
-    if sort == "count_desc":
-        nouns.sort(key=lambda x: (-int(x.get("count", 0)), str(x.get("noun", ""))))
-    elif sort == "count_asc":
-        nouns.sort(key=lambda x: (int(x.get("count", 0)), str(x.get("noun", ""))))
-    elif sort == "alpha":
-        nouns.sort(key=lambda x: str(x.get("noun", "")))
+    q = (query or "").strip()
+    if q:
+        index = result.search_index
+        ids = index.prefix(q) if prefix else index.substring(q)
+        if min_len > 1:
+            nouns = result.nouns()
+            ids = [i for i in ids if len(nouns[i]) >= min_len]
+        ids = _sort_ids(result, ids, sort)
+        total = len(ids)
+        page_ids = ids[start : start + page_size]
+    elif min_len > 1:
+        nouns = result.nouns()
+        ids = [i for i in order if len(nouns[i]) >= min_len]
+        total = len(ids)
+        page_ids = ids[start : start + page_size]
     else:
-        # keep default
-        nouns.sort(key=lambda x: (-int(x.get("count", 0)), str(x.get("noun", ""))))
+        total = result.noun_count
+        page_ids = order[start : start + page_size]
 
-    for item in nouns:
-        noun = item.get("noun")
-        item["in_dict"] = noun in dict_words
-        item["maybe_wrong"] = is_maybe_wrong_word(noun, dict_words)
+    ann = job_annotations(job_id, result)
+    items: List[Dict[str, Any]] = []
+    for i in page_ids:
+        noun = result.noun(i)
+        items.append(
+            {
+                "noun": noun,
+                "count": result.noun_counts[i],
+                "in_dict": ann.in_dict(i),
+                "maybe_wrong": ann.maybe_wrong(i),
+            }
+        )
+        if q:
+            items[-1]["match"] = match_spans(noun, q, prefix)
 
-    return nouns
+    return {"items": items, "total": total, "page": page, "page_size": page_size}
 
 
-def list_noun_occurrences(job_id: str, noun: str) -> List[Dict[str, Any]]:
+def list_noun_occurrences(
+    job_id: str,
+    noun: str,
+    cursor: int = 0,
+    limit: int = 100,
+    page_from: Optional[int] = None,
+    page_to: Optional[int] = None,
+    context: int = 0,
+) -> Dict[str, Any]:
+    """
+    One window of a noun's occurrences in page/line order, sliced straight out
+    of the result's per-noun rows (stored presorted; an inclusive page range is
+    found by binary search). cursor is the position within the matching
+    occurrences to start at, next_cursor the one to pass for the following
+    window (None after the last). context > 0 adds up to that many page lines
+    before and after each occurrence's line, read from the page text cache for
+    the returned pages only (PageTextPendingError while it is being built).
+    """
     result = _load_result(job_id)
-    occ = result.get("occurrences_by_noun", {}).get(noun, [])
-    # stable ordering: page asc, line asc
-    return sorted(occ, key=lambda x: (int(x.get("page", 0)), int(x.get("line", 0))))
+    noun_id = result.noun_id(noun)
+    if noun_id is None:
+        return {"items": [], "total": 0, "cursor": cursor, "next_cursor": None}
+    lo, hi = result.occurrence_range(noun_id, page_from, page_to)
+    start = min(hi, lo + max(0, int(cursor)))
+    stop = min(hi, start + max(1, int(limit)))
+    items = [result.occurrence(row) for row in range(start, stop)]
+    if context > 0 and items:
+        _add_context(job_id, items, int(context))
+    return {"items": items, "total": hi - lo, "cursor": start - lo, "next_cursor": stop - lo if stop < hi else None}
 
 
+def _add_context(job_id: str, items: List[Dict[str, Any]], context: int) -> None:
+    lines: List[str] = []
+    loaded = None
+    with PageText(_page_text_path(job_id)) as text:
+        for item in items:
+            page, i = item["page"], item["line"] - 1
+            if page != loaded:
+                lines = text.lines(page) if page in text else []
+                loaded = page
+            item["before"] = lines[max(0, i - context) : i]
+            item["after"] = lines[i + 1 : i + 1 + context]
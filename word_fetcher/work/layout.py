@@ -0,0 +1,154 @@
+"""
+Layout-aware page text extraction.
+
+Pages are read with get_text("dict"), so every text line comes with its block
+and position. The lines themselves are the same non-empty lines
+get_text("text") gives (line numbers do not change), but they are grouped into
+paragraphs: a line that runs to the right edge of its block, followed by a
+line on the next row that is not indented further and does not start a list
+item, was wrapped by the layout and the two belong together. Sentences are
+then split per paragraph, so a sentence broken across lines reaches the
+analyzer as one string instead of two fragments.
+
+Pages that draw exactly the same thing as an earlier page of the same
+document (same content stream, resources and geometry: blank or template
+pages, duplicated appendices) reuse that page's paragraphs without running
+fitz text extraction again.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import re
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import fitz  # PyMuPDF
+
+from word_fetcher.work.textcache import PageParagraphs
+
+# part of the result store key: bump when extraction changes the text or
+# paragraphs a PDF yields, so results from the old extraction are not reused
+EXTRACT_VERSION = "layout1"
+
+# the flags get_text("text") uses, so lines match the plain-text extraction
+_FLAGS = fitz.TEXTFLAGS_TEXT
+# distinct pages whose paragraphs are kept for reuse while extracting
+_SEEN_PAGES = 64
+# a line starting like this opens a new list item / clause
+_ITEM_RE = re.compile(
+    r"[•·●○■□▪◆◇▶►\-–—*]"
+    r"|\(?\d{1,3}[.)](?=\s)|\(\d{1,3}\)|\d{1,3}、|（[\d一二三四五六七八九十]{1,3}）|[一二三四五六七八九十]{1,3}、"
+    r"|第[\d一二三四五六七八九十百]+[章节条款]"
+)
+
+
+def _line_text(line: Dict[str, Any]) -> str:
+    return "".join(span["text"] for span in line["spans"]).strip()
+
+
+def _wraps(prev: Dict[str, Any], cur: Dict[str, Any], right: float, hanging: bool) -> bool:
+    """
+    Whether cur continues prev's paragraph: both horizontal, cur on the next
+    row down, prev filled out to the block's right edge and cur not indented
+    past prev (hanging: prev opens a list item, whose wrapped lines may be
+    indented to its text).
+    """
+    if prev["dir"][1] or cur["dir"][1] or prev["dir"][0] <= 0:
+        return False
+    x0, y0, x1, y1 = prev["bbox"]
+    height = y1 - y0
+    if height <= 0:
+        return False
+    top = cur["bbox"][1]
+    if top < y1 - height / 2 or top > y1 + height:
+        return False
+    indent = (3 if hanging else 1) * height
+    return x1 >= right - 2 * height and cur["bbox"][0] <= x0 + indent
+
+
+def _block_paragraphs(block: Dict[str, Any]) -> List[List[str]]:
+    lines = [(ln, text) for ln in block.get("lines", ()) for text in (_line_text(ln),) if text]
+    if not lines:
+        return []
+    right = max(ln["bbox"][2] for ln, _text in lines)
+    paragraphs = [[lines[0][1]]]
+    for (prev, prev_text), (cur, text) in zip(lines, lines[1:]):
+        hanging = len(paragraphs[-1]) == 1 and _ITEM_RE.match(prev_text) is not None
+        if not _ITEM_RE.match(text) and _wraps(prev, cur, right, hanging):
+            paragraphs[-1].append(text)
+        else:
+            paragraphs.append([text])
+    return paragraphs
+
+
+def page_paragraphs(page: fitz.Page) -> List[List[str]]:
+    """
+    Non-empty lines of one page in reading order, grouped into paragraphs.
+    """
+    paragraphs: List[List[str]] = []
+    for block in page.get_text("dict", flags=_FLAGS)["blocks"]:
+        if block.get("type") == 0:
+            paragraphs.extend(_block_paragraphs(block))
+    return paragraphs
+
+
+def _page_key(doc: fitz.Document, page: fitz.Page) -> bytes:
+    """
+    What a page draws: its content stream, the resources it draws with and its
+    geometry. Within one document, equal keys mean equal text.
+    """
+    h = hashlib.blake2b(page.read_contents(), digest_size=16)
+    kind, value = resources = doc.xref_get_key(page.xref, "Resources")
+    if kind == "xref":
+        # the dictionary itself: pages often get equal copies of it
+        resources = ("dict", doc.xref_object(int(value.split()[0]), compressed=True))
+    elif kind == "null":
+        # inherited from the page tree
+        resources = ("parent",) + doc.xref_get_key(page.xref, "Parent")
+    h.update(repr((resources, tuple(page.mediabox), tuple(page.cropbox), page.rotation)).encode())
+    return h.digest()
+
+
+def extract_pages(
+    pdf_path: Path, start: int = 0, stop: Optional[int] = None, stats: Optional[Dict[str, Any]] = None
+) -> Iterator[PageParagraphs]:
+    """
+    Lazily yield (page, paragraphs) for pages [start, stop) (0-based), one page
+    at a time; page numbers are 1-based and absolute. Pages served from an
+    identical earlier page are counted in stats["duplicate_pages"]. The yielded
+    lists may be shared between pages and must not be modified.
+    """
+    seen: "OrderedDict[bytes, List[List[str]]]" = OrderedDict()
+    with fitz.open(str(pdf_path)) as doc:
+        end = doc.page_count if stop is None else min(stop, doc.page_count)
+        for page_idx in range(start, end):
+            page = doc.load_page(page_idx)
+            key = _page_key(doc, page)
+            paragraphs = seen.get(key)
+            if paragraphs is None:
+                paragraphs = seen[key] = page_paragraphs(page)
+                if len(seen) > _SEEN_PAGES:
+                    seen.popitem(last=False)
+            else:
+                seen.move_to_end(key)
+                if stats is not None:
+                    stats["duplicate_pages"] = stats.get("duplicate_pages", 0) + 1
+            yield page_idx + 1, paragraphs
+
+
+def join_lines(lines: List[str]) -> Tuple[str, List[int]]:
+    """
+    A paragraph's lines as one string, and the offset each line starts at.
+    Lines are joined directly (CJK text wraps anywhere), with a space only
+    between two ASCII characters so wrapped English words stay apart.
+    """
+    text = lines[0]
+    starts = [0]
+    for line in lines[1:]:
+        if text[-1].isascii() and line[0].isascii():
+            text += " "
+        starts.append(len(text))
+        text += line
+    return text, starts
@@ -0,0 +1,190 @@
+"""
+Per-job marks kept as an append-only operation log (marks.log, one JSON
+object per line: {"op": "add" | "del", ...}) replayed into an in-memory index.
+
+A toggle appends one line instead of rewriting the whole file, and runs under
+the job's lock, so concurrent toggles from several reviewers are serialized
+rather than lost. Once the log holds enough superseded operations it is
+compacted into one "add" line per live mark (written aside, then renamed).
+A torn last line from a crash is skipped on replay.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+import weakref
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from word_fetcher.work.storage import read_json, utc_ms
+
+# compact when the log holds this many more lines than there are live marks
+_COMPACT_SLACK = 256
+# replayed stores kept loaded for recently used jobs
+_MAX_LOADED = 128
+
+
+def _mark_key(noun: str, page: int, line: int, sentence: str) -> str:
+    return f"{page}:{line}:{noun}:{sentence}"
+
+
+def _mark_entry(noun: str, page: int, line: int, sentence: str) -> Dict[str, Any]:
+    noun = str(noun).strip()
+    if not noun:
+        raise ValueError("noun required")
+    page, line, sentence = int(page), int(line), str(sentence)
+    return {"noun": noun, "page": page, "line": line, "sentence": sentence, "id": _mark_key(noun, page, line, sentence)}
+
+
+class MarkStore:
+    def __init__(self, log_path: Path, legacy_path: Optional[Path] = None):
+        self.log_path = log_path
+        self._lock = threading.Lock()
+        # id -> mark, in the order marks were added
+        self._marks: Dict[str, Dict[str, Any]] = {}
+        self._by_noun: Dict[str, Dict[str, None]] = {}
+        self._by_page: Dict[int, Dict[str, None]] = {}
+        self._log_lines = 0
+        if log_path.exists():
+            self._replay()
+        elif legacy_path is not None and legacy_path.exists():
+            # marks.json from before the log: import once
+            for m in read_json(legacy_path):
+                self._index(_mark_entry(m["noun"], m["page"], m["line"], m.get("sentence", "")))
+            self._compact()
+            legacy_path.unlink()
+
+    # --------- index ----------
+    def _index(self, entry: Dict[str, Any]) -> None:
+        key = entry["id"]
+        self._marks[key] = entry
+        self._by_noun.setdefault(entry["noun"], {})[key] = None
+        self._by_page.setdefault(entry["page"], {})[key] = None
+
+    def _unindex(self, key: str) -> None:
+        entry = self._marks.pop(key)
+        for table, field in ((self._by_noun, "noun"), (self._by_page, "page")):
+            ids = table[entry[field]]
+            del ids[key]
+            if not ids:
+                del table[entry[field]]
+
+    def _replay(self) -> None:
+        raw = "\n"
+        with self.log_path.open("r", encoding="utf-8") as f:
+            for raw in f:
+                self._log_lines += 1
+                try:
+                    op = json.loads(raw)
+                    entry = _mark_entry(op["noun"], op["page"], op["line"], op.get("sentence", ""))
+                except (ValueError, KeyError, TypeError):
+                    continue
+                if op.get("op") == "del":
+                    if entry["id"] in self._marks:
+                        self._unindex(entry["id"])
+                elif entry["id"] not in self._marks:
+                    self._index(entry)
+        if not raw.endswith("\n"):
+            # torn write: rewrite so the next append does not extend the broken line
+            self._compact()
+
+    # --------- log ----------
+    def _append(self, op: str, entry: Dict[str, Any]) -> None:
+        line = json.dumps({"op": op, "ts": utc_ms(), **entry}, ensure_ascii=False) + "\n"
+        with self.log_path.open("a", encoding="utf-8") as f:
+            f.write(line)
+        self._log_lines += 1
+        if self._log_lines > len(self._marks) + _COMPACT_SLACK:
+            self._compact()
+
+    def _compact(self) -> None:
+        tmp = self.log_path.with_suffix(self.log_path.suffix + ".tmp")
+        with tmp.open("w", encoding="utf-8") as f:
+            for entry in self._marks.values():
+                f.write(json.dumps({"op": "add", **entry}, ensure_ascii=False) + "\n")
+        os.replace(tmp, self.log_path)
+        self._log_lines = len(self._marks)
+
+    # --------- operations ----------
+    def add(self, noun: str, page: int, line: int, sentence: str) -> Dict[str, Any]:
+        entry = _mark_entry(noun, page, line, sentence)
+        with self._lock:
+            if entry["id"] not in self._marks:
+                self._index(entry)
+                self._append("add", entry)
+        return entry
+
+    def toggle(self, noun: str, page: int, line: int, sentence: str) -> Dict[str, Any]:
+        entry = _mark_entry(noun, page, line, sentence)
+        key = entry["id"]
+        with self._lock:
+            if key in self._marks:
+                self._unindex(key)
+                self._append("del", entry)
+                return {"removed": True, "added": False, "id": key}
+            self._index(entry)
+            self._append("add", entry)
+        return {"removed": False, "added": True, "id": key}
+
+    def query(
+        self, noun: Optional[str] = None, page_from: Optional[int] = None, page_to: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        All marks in the order they were added; with a noun and/or an
+        inclusive page range, the matching marks ordered by page and line.
+        """
+        with self._lock:
+            if noun is None and page_from is None and page_to is None:
+                return [dict(m) for m in self._marks.values()]
+            if noun is not None:
+                ids = list(self._by_noun.get(noun, {}))
+            else:
+                ids = [k for p, keys in self._by_page.items() if _in_range(p, page_from, page_to) for k in keys]
+            out = [dict(self._marks[k]) for k in ids if _in_range(self._marks[k]["page"], page_from, page_to)]
+        out.sort(key=lambda m: (m["page"], m["line"]))
+        return out
+
+
+def _in_range(page: int, lo: Optional[int], hi: Optional[int]) -> bool:
+    return (lo is None or page >= lo) and (hi is None or page <= hi)
+
+
+class MarkStores:
+    """
+    Loaded MarkStore per job; a job's log is replayed on first access only.
+    The max_loaded most recently used stores stay loaded. An evicted store that
+    a caller still holds is handed out again rather than replayed a second
+    time, so there is never more than one store (and lock) per job.
+    """
+
+    def __init__(
+        self, log_path: Callable[[str], Path], legacy_path: Callable[[str], Path], max_loaded: int = _MAX_LOADED
+    ):
+        self._log_path = log_path
+        self._legacy_path = legacy_path
+        self.max_loaded = max_loaded
+        self._lock = threading.Lock()
+        self._stores: "OrderedDict[str, MarkStore]" = OrderedDict()
+        self._live: "weakref.WeakValueDictionary[str, MarkStore]" = weakref.WeakValueDictionary()
+
+    def get(self, job_id: str) -> MarkStore:
+        with self._lock:
+            store = self._stores.get(job_id)
+            if store is None:
+                store = self._live.get(job_id)
+                if store is None:
+                    store = self._live[job_id] = MarkStore(self._log_path(job_id), self._legacy_path(job_id))
+                self._stores[job_id] = store
+                while len(self._stores) > self.max_loaded:
+                    self._stores.popitem(last=False)
+            else:
+                self._stores.move_to_end(job_id)
+            return store
+
+    def forget(self, job_id: str) -> None:
+        with self._lock:
+            self._stores.pop(job_id, None)
+            self._live.pop(job_id, None)
@@ -0,0 +1,161 @@
+"""
+Minimal Prometheus-style metrics (text exposition format 0.0.4), stdlib only.
+
+Metrics register themselves in the module registry on creation; render()
+produces the /api/metrics payload. Values live in memory and reset on restart.
+"""
+
+from __future__ import annotations
+
+import math
+import threading
+import time
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Sequence, Tuple
+
+LabelValues = Tuple[str, ...]
+
+# seconds: sub-millisecond API calls up to multi-minute jobs
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(str(v))}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _num(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric(ABC):
+    kind = ""
+
+    def __init__(self, name: str, doc: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.doc = doc
+        self.label_names = tuple(labels)
+        self._lock = threading.Lock()
+        registry.append(self)
+
+    def _key(self, labels: Dict[str, Any]) -> LabelValues:
+        return tuple(str(labels.get(n, "")) for n in self.label_names)
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.doc}", f"# TYPE {self.name} {self.kind}"]
+
+    @abstractmethod
+    def samples(self) -> List[str]:
+        ...
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, doc: str, labels: Sequence[str] = ()):
+        super().__init__(name, doc, labels)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_labels(self.label_names, k)} {_num(v)}" for k, v in items]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, doc: str, labels: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, doc, labels)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        # per label set: [count per bucket (non-cumulative)..., sum, count]
+        self._values: Dict[LabelValues, List[float]] = {}
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            row = self._values.get(key)
+            if row is None:
+                row = self._values[key] = [0.0] * (len(self.buckets) + 2)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    row[i] += 1
+                    break
+            row[-2] += value
+            row[-1] += 1
+
+    @contextmanager
+    def time(self, **labels: Any) -> Iterator[None]:
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - t0, **labels)
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = sorted((k, list(v)) for k, v in self._values.items())
+        out: List[str] = []
+        for key, row in items:
+            cumulative = 0.0
+            for i, bound in enumerate(self.buckets):
+                cumulative += row[i]
+                le = f'le="{_num(bound)}"'
+                out.append(f"{self.name}_bucket{_labels(self.label_names, key, le)} {_num(cumulative)}")
+            out.append(f"{self.name}_sum{_labels(self.label_names, key)} {_num(row[-2])}")
+            out.append(f"{self.name}_count{_labels(self.label_names, key)} {_num(row[-1])}")
+        return out
+
+
+class Sampled(_Metric):
+    """
+    Value read from elsewhere at scrape time (queue depth, cache counters).
+    """
+
+    def __init__(self, name: str, doc: str, fn: Callable[[], float], kind: str = "gauge"):
+        super().__init__(name, doc)
+        self.kind = kind
+        self._fn = fn
+
+    def samples(self) -> List[str]:
+        return [f"{self.name} {_num(self._fn())}"]
+
+
+registry: List[_Metric] = []
+
+
+def render() -> str:
+    lines: List[str] = []
+    for metric in registry:
+        lines.extend(metric.header())
+        lines.extend(metric.samples())
+    return "\n".join(lines) + "\n"
+
+
+@contextmanager
+def stage(stats: Dict[str, Any], name: str) -> Iterator[None]:
+    """
+    Add the duration of the block to stats["stages"][name] (seconds).
+    """
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        stages = stats.setdefault("stages", {})
+        stages[name] = stages.get(name, 0.0) + time.perf_counter() - t0
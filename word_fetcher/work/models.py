@@ -1,22 +1,38 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Literal, TypedDict
+from typing import Any, Dict, Literal, TypedDict
 
 
 JobState = Literal["queued", "running", "done", "error"]
 
 
-class JobStatus(TypedDict):
+class _JobStatusBase(TypedDict):
     state: JobState
     progress: int
     message: str
 
 
+class JobStatus(_JobStatusBase, total=False):
+    # 1-based position in the job queue while state == "queued"
+    queue_position: int
+    # page-level progress and estimated seconds left while extracting
+    pages_done: int
+    pages_total: int
+    eta_seconds: float
+    updated_ms: int
+    # per-stage seconds and counts, on finished jobs
+    stats: Dict[str, Any]
+
+
 @dataclass(frozen=True)
 class Job:
     job_id: str
     filename: str
     input_path: str
+    # sha256 of the uploaded file
+    sha256: str = ""
+    # extraction mode, see nlp.EXTRACT_MODES
+    mode: str = "full"
 
 
@@ -1,14 +1,20 @@
 from __future__ import annotations
 
+import hashlib
+import logging
+import os
 import re
+from collections import deque
 from functools import lru_cache
 from pathlib import Path
-from typing import Callable, Iterable, List, Sequence, Tuple
+from typing import AbstractSet, Callable, Iterable, List, Optional, Sequence, Tuple
 
-import jieba
 import jieba.posseg as pseg
 
-from word_fetcher.work.storage import custom_dict_path, stopwords_path
+from word_fetcher.work import jiebadict
+from word_fetcher.work.sentcache import SentenceCache
+from word_fetcher.work.storage import cache_dir, custom_dict_path, ner_terms_path, stopwords_path
+from word_fetcher.work.termmatch import TermMatcher
 
 try:
     from ltp import LTP  # type: ignore
@@ -17,6 +23,8 @@ try:
 except Exception:  # pragma: no cover
     _LTP_AVAILABLE = False
 
+logger = logging.getLogger(__name__)
+
 # simple regex filters
 _RE_NUMERIC = re.compile(r"^[0-9]+([.,:/-][0-9]+)*$")
 _RE_ALPHA = re.compile(r"^[A-Za-z]+$")
@@ -52,36 +60,6 @@ def _parse_dict_words(path: Path) -> set[str]:
     return words
 
 
-def _load_custom_dict(path: Path) -> None:
-    """
-    支持两种格式：
-    1) 仅词：       机器学习
-    2) 词 频率 词性：机器学习 200000 n
-    未提供频率/词性时使用高频+n 以提升命中率。
-    """
-    if not path.exists():
-        return
-    lines = path.read_text(encoding="utf-8").splitlines()
-    for ln in lines:
-        ln = ln.strip()
-        if not ln or ln.startswith("#"):
-            continue
-        parts = ln.split()
-        if not parts:
-            continue
-        word = parts[0]
-        freq = 200000
-        tag = "n"
-        if len(parts) >= 2:
-            try:
-                freq = int(parts[1])
-            except ValueError:
-                freq = 200000
-        if len(parts) >= 3:
-            tag = parts[2]
-        jieba.add_word(word, freq=freq, tag=tag)
-
-
 def list_custom_dict_words() -> List[str]:
     """
     Return all words in the custom dict, deduplicated and sorted.
@@ -103,17 +81,61 @@ def remove_from_custom_dict(word: str) -> bool:
     if word not in words:
         return False
     remaining = [w for w in words if w != word]
+    old_version = dict_version()
     path.write_text("\n".join(remaining) + ("\n" if remaining else ""), encoding="utf-8")
     reload_resources()
+    _dict_changed(old_version, word)
     return True
 
 
+def replace_custom_dict(content: bytes) -> None:
+    """
+    Overwrite the custom dict wholesale (dictionary upload).
+    """
+    old_version = dict_version()
+    custom_dict_path().write_bytes(content)
+    reload_resources()
+    _dict_changed(old_version, None)
+
+
+def _content_version(path: Path) -> str:
+    """
+    Hash of a word-list file's meaningful lines (order and comments ignored).
+    """
+    lines: List[str] = []
+    if path.exists():
+        lines = [ln.strip() for ln in path.read_text(encoding="utf-8").splitlines()]
+    body = "\n".join(sorted(ln for ln in lines if ln and not ln.startswith("#")))
+    return hashlib.sha1(body.encode("utf-8")).hexdigest()[:16]
+
+
+def _files_stamp() -> Tuple[Tuple[int, int], ...]:
+    stamps = []
+    for path in (custom_dict_path(), stopwords_path(), ner_terms_path()):
+        try:
+            st = path.stat()
+            stamps.append((st.st_mtime_ns, st.st_size))
+        except FileNotFoundError:
+            stamps.append((0, 0))
+    return tuple(stamps)
+
+
 @lru_cache(maxsize=1)
 def _resources():
+    stamp = _files_stamp()
     sw = _load_stopwords(stopwords_path())
-    dict_words = _parse_dict_words(custom_dict_path())
-    _load_custom_dict(custom_dict_path())
-    return {"stopwords": sw, "dict_words": dict_words}
+    dict_words = frozenset(_parse_dict_words(custom_dict_path()))
+    # no-op unless the custom dictionary changed since the last install
+    jiebadict.install(custom_dict_path())
+    return {
+        "stopwords": sw,
+        "dict_words": dict_words,
+        "dict_version": _content_version(custom_dict_path()),
+        "stopwords_version": _content_version(stopwords_path()),
+        "ner_terms": frozenset(_parse_dict_words(ner_terms_path())),
+        "ner_version": _content_version(ner_terms_path()),
+        "files": stamp,
+    }
 
 
 def reload_resources() -> None:
@@ -121,12 +143,133 @@ def reload_resources() -> None:
     _resources()
 
 
+def ensure_resources() -> None:
+    """
+    Reload dictionaries only if their files changed on disk since they were
+    loaded (edits through the API already reload); costs a few stat() calls.
+    """
+    if _resources()["files"] != _files_stamp():
+        reload_resources()
+
+
+def warm_up() -> None:
+    """
+    Load dictionaries and the analyzer ahead of the first job (run in a
+    background thread at startup); see dictionary_ready().
+    """
+    try:
+        _resources()
+        _mode, analyze_batch = _get_batch_analyzer()
+        analyze_batch(["词典预热"])
+    except Exception:
+        logger.exception("dictionary warm-up failed")
+
+
+def dictionary_ready() -> bool:
+    return jiebadict.ready.is_set()
+
+
+# ---------- dictionary change journal ----------
+# (old_version, new_version, word); word is None when the whole dict was replaced.
+# Only the latest edits are kept: a job whose version has fallen out of it is
+# simply re-indexed in full, which beats patching hundreds of words anyway.
+_DICT_JOURNAL_MAX = 256
+_dict_journal: "deque[Tuple[str, str, Optional[str]]]" = deque(maxlen=_DICT_JOURNAL_MAX)
+_dict_listeners: List[Callable[[Optional[str]], None]] = []
+
+
+def dict_version() -> str:
+    """
+    Content hash of the custom dictionary entries (words, frequencies, tags).
+    """
+    return _resources()["dict_version"]
+
+
+def stopwords_version() -> str:
+    return _resources()["stopwords_version"]
+
+
+def on_dict_change(fn: Callable[[Optional[str]], None]) -> None:
+    """
+    Register fn(word) to run after a word is added/removed (word=None: full replace).
+    """
+    _dict_listeners.append(fn)
+
+
+def _dict_changed(old_version: str, word: Optional[str]) -> None:
+    _dict_journal.append((old_version, dict_version(), word))
+    sentence_cache.prune_disk(_sentence_namespace())
+    for fn in _dict_listeners:
+        fn(word)
+
+
+def dict_changes_since(version: str) -> Optional[List[str]]:
+    """
+    Words added/removed since the dictionary was at `version`, or None when that
+    is unknown (version predates this process or the journal's last
+    _DICT_JOURNAL_MAX edits, or the dict was replaced).
+    """
+    if version == dict_version():
+        return []
+    journal = list(_dict_journal)
+    for i in range(len(journal) - 1, -1, -1):
+        if journal[i][0] == version:
+            words = [w for _old, _new, w in journal[i:]]
+            if any(w is None for w in words):
+                return None
+            return [w for w in words if w is not None]
+    return None
+
+
 # ---------- Analyzer selection (LTP -> Jieba fallback) ----------
 _ltp_model = None
 
-def _get_analyzer() -> Tuple[str, Callable[[str], List[Tuple[str, str, str]]]]:
+Token = Tuple[str, str, str]  # (word, pos, ner)
+
+# LTP pads every batch to its longest sentence; cap both sentences and characters per batch
+def _env_int(name: str, default: int) -> int:
+    raw = os.getenv(name, "").strip()
+    try:
+        return max(1, int(raw)) if raw else default
+    except ValueError:
+        return default
+
+
+_LTP_BATCH_SIZE = _env_int("WORD_FETCHER_LTP_BATCH", 32)
+_LTP_BATCH_CHARS = _env_int("WORD_FETCHER_LTP_BATCH_CHARS", 4096)
+
+
+def _ltp_tokens(tokens: List[str], pos: List[str], ner_spans) -> List[Token]:
+    ner_map: dict[int, str] = {}
+    for start, end, label in ner_spans or []:
+        for i in range(start, end + 1):
+            ner_map[i] = label
+    return [(tok, pos[i] if i < len(pos) else "", ner_map.get(i, "")) for i, tok in enumerate(tokens)]
+
+
+def _length_batches(texts: Sequence[str], max_items: int, max_chars: int) -> List[List[int]]:
     """
-    Returns (mode, analyzer_fn) where analyzer_fn(text) -> [(word, pos, ner)]
+    Group text indices into batches of similar length (least padding), bounded
+    by item count and by total padded characters.
+    """
+    batches: List[List[int]] = []
+    current: List[int] = []
+    for i in sorted(range(len(texts)), key=lambda i: len(texts[i])):
+        # sorted ascending, so the newest item is the longest in the batch
+        if current and (len(current) >= max_items or len(texts[i]) * (len(current) + 1) > max_chars):
+            batches.append(current)
+            current = []
+        current.append(i)
+    if current:
+        batches.append(current)
+    return batches
+
+
+@lru_cache(maxsize=1)
+def _get_batch_analyzer() -> Tuple[str, Callable[[Sequence[str]], List[List[Token]]]]:
+    """
+    Returns (mode, analyze_batch) where analyze_batch(texts) -> one [(word, pos, ner)]
+    list per input text, in input order. Built once per process.
     Order: LTP (if installed) -> Jieba.
     """
     global _ltp_model
@@ -134,37 +277,34 @@ def _get_analyzer() -> Tuple[str, Callable[[str], List[Tuple[str, str, str]]]]:
         if _ltp_model is None:
             _ltp_model = LTP()
 
-        def _analyze(text: str) -> List[Tuple[str, str, str]]:
-            out = _ltp_model.pipeline([text], tasks=["cws", "pos", "ner"], return_dict=True)
-            tokens = out["cws"][0]
-            pos = out["pos"][0]
-            ner_spans = out.get("ner", [[]])[0] if out.get("ner") else []
-            ner_map: dict[int, str] = {}
-            for start, end, label in ner_spans:
-                for i in range(start, end + 1):
-                    ner_map[i] = label
-            result: List[Tuple[str, str, str]] = []
-            for i, tok in enumerate(tokens):
-                result.append((tok, pos[i] if i < len(pos) else "", ner_map.get(i, "")))
-            return result
+        def _analyze_batch(texts: Sequence[str]) -> List[List[Token]]:
+            out_tokens: List[List[Token]] = [[] for _ in texts]
+            for batch in _length_batches(texts, _LTP_BATCH_SIZE, _LTP_BATCH_CHARS):
+                out = _ltp_model.pipeline([texts[i] for i in batch], tasks=["cws", "pos", "ner"], return_dict=True)
+                ners = out.get("ner") or [[] for _ in batch]
+                for j, i in enumerate(batch):
+                    out_tokens[i] = _ltp_tokens(out["cws"][j], out["pos"][j], ners[j])
+            return out_tokens
 
-        return "ltp", _analyze
+        return "ltp", _analyze_batch
 
-    def _jieba_analyze(text: str) -> List[Tuple[str, str, str]]:
-        return [(w.word, w.flag, "") for w in pseg.cut(text)]
+    def _jieba_analyze_batch(texts: Sequence[str]) -> List[List[Token]]:
+        return [[(w.word, w.flag, "") for w in pseg.cut(text)] for text in texts]
 
-    return "jieba", _jieba_analyze
+    return "jieba", _jieba_analyze_batch
 
 
-def iter_nouns(text: str) -> Iterable[Tuple[str, str]]:
+def _get_analyzer() -> Tuple[str, Callable[[str], List[Token]]]:
     """
-    Yields (word, flag) for nouns with basic filtering.
+    Returns (mode, analyzer_fn) where analyzer_fn(text) -> [(word, pos, ner)]
     """
-    res = _resources()
-    stop = res["stopwords"]
-    _mode, analyzer = _get_analyzer()
+    mode, analyze_batch = _get_batch_analyzer()
+    return mode, lambda text: analyze_batch([text])[0]
+
 
-    for word, flag, ner in analyzer(text):
+def _filter_nouns(tokens: Iterable[Token], stop: AbstractSet[str]) -> List[Tuple[str, str]]:
+    out: List[Tuple[str, str]] = []
+    for word, flag, ner in tokens:
         word = (word or "").strip()
         flag = flag or ""
         ner = ner or ""
@@ -182,11 +322,104 @@ def iter_nouns(text: str) -> Iterable[Tuple[str, str]]:
         if not (is_noun or is_ner_keep):
             continue
 
-        yield word, flag
+        out.append((word, flag))
+    return out
+
+
+# ---------- sentence memo ----------
+def _sentence_cache() -> SentenceCache:
+    raw = os.getenv("WORD_FETCHER_SENTENCE_CACHE", "").strip()
+    try:
+        max_entries = max(0, int(raw)) if raw else 100_000
+    except ValueError:
+        max_entries = 100_000
+    disk = os.getenv("WORD_FETCHER_SENTENCE_CACHE_DISK", "").strip().lower() in ("1", "true", "yes")
+    return SentenceCache(max_entries, cache_dir() / "sentences.sqlite" if disk else None)
+
+
+sentence_cache = _sentence_cache()
+
+
+def _sentence_namespace() -> str:
+    # anything that changes the output of iter_nouns for the same text
+    mode, _analyze = _get_batch_analyzer()
+    return f"{mode}:{dict_version()}:{stopwords_version()}"
+
+
+def sentence_cache_stats() -> dict:
+    return sentence_cache.stats()
+
+
+def iter_nouns(text: str) -> Iterable[Tuple[str, str]]:
+    """
+    Yields (word, flag) for nouns with basic filtering.
+    """
+    yield from iter_nouns_batch([text])[0]
+
+
+def iter_nouns_batch(texts: Sequence[str]) -> List[List[Tuple[str, str]]]:
+    """
+    Batch form of iter_nouns: one [(word, flag)] list per input text, in order.
+    With LTP the texts go to the model in length-sorted batches.
+    """
+    if not texts:
+        return []
+    stop = _resources()["stopwords"]
+    _mode, analyze_batch = _get_batch_analyzer()
+    if not sentence_cache.enabled:
+        return [_filter_nouns(tokens, stop) for tokens in analyze_batch(texts)]
+
+    ns = _sentence_namespace()
+    cached = sentence_cache.lookup(ns, texts)
+    # each distinct missing sentence is analyzed once, however often it repeats
+    todo = list(dict.fromkeys(t for t, hit in zip(texts, cached) if hit is None))
+    fresh = {}
+    if todo:
+        fresh = {t: tuple(_filter_nouns(tokens, stop)) for t, tokens in zip(todo, analyze_batch(todo))}
+        sentence_cache.store(ns, list(fresh.items()))
+    return [list(hit if hit is not None else fresh[t]) for t, hit in zip(texts, cached)]
+
+
+# ---------- dictionary-only extraction ----------
+# "full": POS-tag every sentence (LTP/jieba); "dict": only find custom dictionary
+# words and ner_terms.txt entries, with an Aho-Corasick scan instead of tagging
+EXTRACT_MODES = ("full", "dict")
+
+
+@lru_cache(maxsize=2)
+def _term_matcher(dict_ver: str, stop_ver: str, ner_ver: str) -> TermMatcher:
+    # keyed by versions so it is rebuilt only after a dictionary change
+    res = _resources()
+    terms = (res["dict_words"] | res["ner_terms"]) - res["stopwords"]
+    return TermMatcher(t for t in terms if not _RE_NUMERIC.match(t))
+
+
+def dict_nouns_batch(texts: Sequence[str]) -> List[List[Tuple[str, str]]]:
+    """
+    iter_nouns_batch for the dictionary-only mode: dictionary terms found in
+    each text, leftmost-longest and non-overlapping.
+    """
+    res = _resources()
+    matcher = _term_matcher(res["dict_version"], res["stopwords_version"], res["ner_version"])
+    return [[(word, "n") for word in matcher.find(text)] for text in texts]
+
+
+def noun_extractor(mode: str) -> Callable[[Sequence[str]], List[List[Tuple[str, str]]]]:
+    if mode not in EXTRACT_MODES:
+        raise ValueError(f"unknown extraction mode {mode!r}")
+    return dict_nouns_batch if mode == "dict" else iter_nouns_batch
+
+
+def mode_version(mode: str) -> str:
+    """
+    Version of the inputs a mode depends on beyond the dictionary and stopwords.
+    """
+    return f"dict-{_resources()['ner_version']}" if mode == "dict" else ""
 
 
-def get_dict_words() -> set[str]:
-    return set(_resources()["dict_words"])
+def get_dict_words() -> AbstractSet[str]:
+    # shared and immutable; no per-call copy
+    return _resources()["dict_words"]
 
 
 def add_to_custom_dict(word: str) -> bool:
@@ -200,13 +433,16 @@ def add_to_custom_dict(word: str) -> bool:
     existing = _parse_dict_words(path)
     if word in existing:
         return False
+    old_version = dict_version()
     with path.open("a", encoding="utf-8") as f:
         f.write(f"{word}\n")
+    jiebadict.add_entry(path, word)
     reload_resources()
+    _dict_changed(old_version, word)
     return True
 
 
-def is_maybe_wrong_word(word: str, dict_words: set[str]) -> bool:
+def is_maybe_wrong_word(word: str, dict_words: AbstractSet[str]) -> bool:
     """
     Heuristic: mark as potential typo/噪声 when
     - not in custom dict, AND one of:
@@ -233,8 +469,7 @@ def is_maybe_wrong_word(word: str, dict_words: set[str]) -> bool:
 
 def extract_nouns_from_sentences(sentences: Sequence[str]) -> List[str]:
     out: List[str] = []
-    for sent in sentences:
-        for word, _ in iter_nouns(sent):
-            out.append(word)
+    for nouns in iter_nouns_batch(sentences):
+        out.extend(word for word, _ in nouns)
     return out
 
@@ -0,0 +1,157 @@
+"""
+In-memory noun index built while a job runs.
+
+Nouns and sentences are interned to integer ids, and each occurrence is one
+entry in four parallel u32 arrays (noun, page, line, sentence) instead of a
+dict per occurrence. Counts are aggregated from the noun column when needed
+(collections.Counter counts in C), and the layout written by write_result is
+a single integer sort. The {"nouns", "occurrences_by_noun"} dict shape is
+only built by to_index() for callers that ask for it.
+"""
+
+from __future__ import annotations
+
+from array import array
+from collections import Counter
+from typing import Any, Callable, Dict, List, Tuple
+
+_U32 = "I"
+# sort key layout: rank << 44 | page << 22 | line
+_PAGE_SHIFT = 22
+_RANK_SHIFT = 44
+
+
+class NounIndex:
+    def __init__(self) -> None:
+        self.nouns: List[str] = []
+        self.sentences: List[str] = []
+        self._noun_ids: Dict[str, int] = {}
+        self._sentence_ids: Dict[str, int] = {}
+        self.occ_noun = array(_U32)
+        self.occ_page = array(_U32)
+        self.occ_line = array(_U32)
+        self.occ_sentence = array(_U32)
+
+    def __len__(self) -> int:
+        return len(self.occ_noun)
+
+    def noun_id(self, noun: str) -> int:
+        nid = self._noun_ids.get(noun)
+        if nid is None:
+            nid = self._noun_ids[noun] = len(self.nouns)
+            self.nouns.append(noun)
+        return nid
+
+    def sentence_id(self, sentence: str) -> int:
+        sid = self._sentence_ids.get(sentence)
+        if sid is None:
+            sid = self._sentence_ids[sentence] = len(self.sentences)
+            self.sentences.append(sentence)
+        return sid
+
+    def add(self, noun_id: int, page: int, line: int, sentence_id: int) -> None:
+        self.occ_noun.append(noun_id)
+        self.occ_page.append(page)
+        self.occ_line.append(line)
+        self.occ_sentence.append(sentence_id)
+
+    # --------- aggregation ----------
+    def counts(self) -> List[int]:
+        """
+        Occurrences per noun id (0 for nouns whose occurrences were dropped).
+        """
+        c = Counter(self.occ_noun)
+        return [c.get(i, 0) for i in range(len(self.nouns))]
+
+    def distinct_nouns(self) -> int:
+        return len(set(self.occ_noun))
+
+    def ranked(self) -> Tuple[List[int], List[int]]:
+        """
+        (noun ids with occurrences by count desc then noun, counts per noun id).
+        """
+        counts = self.counts()
+        live = [i for i, c in enumerate(counts) if c]
+        live.sort(key=lambda i: (-counts[i], self.nouns[i]))
+        return live, counts
+
+    def top(self, n: int) -> List[Tuple[str, int]]:
+        order, counts = self.ranked()
+        return [(self.nouns[i], counts[i]) for i in order[:n]]
+
+    def occurrence_order(self, rank: Any) -> List[int]:
+        """
+        Occurrence positions grouped by rank[noun id], then by page and line;
+        ties keep insertion order (the sort is stable).
+        """
+        keys = [
+            (rank[n] << _RANK_SHIFT) | (p << _PAGE_SHIFT) | ln
+            for n, p, ln in zip(self.occ_noun, self.occ_page, self.occ_line)
+        ]
+        return sorted(range(len(keys)), key=keys.__getitem__)
+
+    # --------- merging / editing ----------
+    def extend(self, other: "NounIndex") -> None:
+        """
+        Append other's occurrences (after this index's, e.g. the next page shard).
+        """
+        nmap = [self.noun_id(n) for n in other.nouns]
+        smap = [self.sentence_id(s) for s in other.sentences]
+        self.occ_noun.extend(array(_U32, map(nmap.__getitem__, other.occ_noun)))
+        self.occ_page.extend(other.occ_page)
+        self.occ_line.extend(other.occ_line)
+        self.occ_sentence.extend(array(_U32, map(smap.__getitem__, other.occ_sentence)))
+
+    def keep(self, pred: Callable[[int, int, int], bool]) -> None:
+        """
+        Drop every occurrence for which pred(page, line, sentence_id) is false.
+        """
+        idx = [i for i, row in enumerate(zip(self.occ_page, self.occ_line, self.occ_sentence)) if pred(*row)]
+        if len(idx) == len(self.occ_noun):
+            return
+        for name in ("occ_noun", "occ_page", "occ_line", "occ_sentence"):
+            col = getattr(self, name)
+            setattr(self, name, array(_U32, map(col.__getitem__, idx)))
+
+    # --------- conversions ----------
+    def to_index(self) -> Dict[str, Any]:
+        order, counts = self.ranked()
+        occ: Dict[str, List[Dict[str, Any]]] = {self.nouns[i]: [] for i in order}
+        for n, p, ln, s in zip(self.occ_noun, self.occ_page, self.occ_line, self.occ_sentence):
+            occ[self.nouns[n]].append({"page": p, "line": ln, "sentence": self.sentences[s]})
+        return {
+            "nouns": [{"noun": self.nouns[i], "count": counts[i]} for i in order],
+            "occurrences_by_noun": occ,
+        }
+
+    @classmethod
+    def from_index(cls, index: Dict[str, Any]) -> "NounIndex":
+        """
+        From the dict shape. Nouns are interned in list order, so that order is
+        kept for nouns whose counts tie.
+        """
+        out = cls()
+        for item in index.get("nouns", []):
+            out.noun_id(str(item["noun"]))
+        for noun, occs in index.get("occurrences_by_noun", {}).items():
+            nid = out.noun_id(str(noun))
+            for o in occs:
+                out.add(nid, int(o["page"]), int(o["line"]), out.sentence_id(str(o["sentence"])))
+        return out
+
+    @classmethod
+    def from_result(cls, result: Any) -> "NounIndex":
+        """
+        From an open JobResult, column by column (no per-occurrence objects).
+        """
+        out = cls()
+        # copied: the reader's list is cached and shared with other requests
+        out.nouns = list(result.nouns())
+        out._noun_ids = {n: i for i, n in enumerate(out.nouns)}
+        out.sentences = [result.sentence(i) for i in range(result.sentence_count)]
+        out._sentence_ids = {s: i for i, s in enumerate(out.sentences)}
+        for name in ("occ_noun", "occ_page", "occ_line", "occ_sentence"):
+            col = array(_U32)
+            col.frombytes(result.section(name).tobytes())
+            setattr(out, name, col)
+        return out
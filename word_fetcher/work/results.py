@@ -0,0 +1,399 @@
+"""
+Columnar on-disk job result (result.bin).
+
+Layout: MAGIC | u32 header length | JSON header | padding | 8-byte aligned sections.
+The header only describes where each section lives; the sections are raw
+native-endian arrays read through mmap, so opening a result costs a header
+parse and nothing else:
+
+  noun_text / noun_offsets          utf-8 blob + (n+1) offsets, ids in count_desc order
+  noun_counts                       occurrence count per noun id
+  sentence_text / sentence_offsets  deduplicated sentence table
+  occ_noun / occ_page / occ_line / occ_sentence
+                                    one row per occurrence, grouped by noun id and
+                                    in document order within a noun
+  occ_start                         (n+1) row offsets of each noun's group
+  order_count_asc / order_alpha     noun id permutations for the other sort orders
+                                    (count_desc is the id order itself)
+  gram_*                            unigram/bigram inverted index over nouns (see search.py)
+
+Sections are only ever added; readers fill in a missing one on open.
+"""
+
+from __future__ import annotations
+
+import json
+import mmap
+import os
+import struct
+import sys
+import threading
+import uuid
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from word_fetcher.work.nounindex import NounIndex
+from word_fetcher.work.search import NounSearchIndex, build_search_sections
+
+
+MAGIC = b"WFRS"
+FORMAT_VERSION = 1
+_ALIGN = 8
+_U32 = "I"
+_U64 = "Q"
+
+
+def _pad(n: int) -> int:
+    return (-n) % _ALIGN
+
+
+def _string_table(strings: List[str]) -> tuple[bytes, array]:
+    offsets = array(_U64, [0])
+    chunks: List[bytes] = []
+    pos = 0
+    for s in strings:
+        b = s.encode("utf-8")
+        chunks.append(b)
+        pos += len(b)
+        offsets.append(pos)
+    return b"".join(chunks), offsets
+
+
+SORT_ORDERS = ("count_desc", "count_asc", "alpha")
+
+
+def _sort_orders(nouns: List[str], counts: Any) -> Dict[str, array]:
+    ids = range(len(nouns))
+    return {
+        "order_count_asc": array(_U32, sorted(ids, key=lambda i: (counts[i], nouns[i]))),
+        "order_alpha": array(_U32, sorted(ids, key=lambda i: nouns[i])),
+    }
+
+
+def write_result(path: Path, index: Union[NounIndex, Dict[str, Any]]) -> None:
+    """
+    Serialize a NounIndex (or the {"nouns": [...], "occurrences_by_noun": {...}}
+    dict shape) into the columnar format (atomic replace, like write_json).
+    Nouns are ordered by count desc then noun; each noun's occurrences by page
+    and line; sentences are numbered in that order and unreferenced ones dropped.
+    """
+    if not isinstance(index, NounIndex):
+        index = NounIndex.from_index(index)
+    order, counts = index.ranked()
+    rank = array(_U32, bytes(4 * len(index.nouns)))
+    for r, nid in enumerate(order):
+        rank[nid] = r
+    perm = index.occurrence_order(rank)
+
+    noun_list = [index.nouns[i] for i in order]
+    noun_text, noun_offsets = _string_table(noun_list)
+    noun_counts = array(_U32, (counts[i] for i in order))
+    occ_start = array(_U64, [0])
+    for c in noun_counts:
+        occ_start.append(occ_start[-1] + c)
+
+    # dicts keep insertion order: first use along perm gives the new sentence ids
+    sentence_ids: Dict[int, int] = {}
+    src_sentence = index.occ_sentence
+    occ_sentence = array(_U32, (sentence_ids.setdefault(src_sentence[i], len(sentence_ids)) for i in perm))
+    sentence_text, sentence_offsets = _string_table([index.sentences[s] for s in sentence_ids])
+    occ_noun = array(_U32, (rank[n] for n in map(index.occ_noun.__getitem__, perm)))
+    occ_page = array(_U32, map(index.occ_page.__getitem__, perm))
+    occ_line = array(_U32, map(index.occ_line.__getitem__, perm))
+
+    sections: Dict[str, Any] = {
+        "noun_text": noun_text,
+        "noun_offsets": noun_offsets,
+        "noun_counts": noun_counts,
+        "sentence_text": sentence_text,
+        "sentence_offsets": sentence_offsets,
+        "occ_noun": occ_noun,
+        "occ_page": occ_page,
+        "occ_line": occ_line,
+        "occ_sentence": occ_sentence,
+        "occ_start": occ_start,
+    }
+    sections.update(_sort_orders(noun_list, noun_counts))
+    sections.update(build_search_sections(noun_list))
+    _write_sections(
+        path,
+        sections,
+        {"nouns": len(noun_list), "sentences": len(sentence_ids), "occurrences": len(occ_noun)},
+    )
+
+
+def _write_sections(path: Path, sections: Dict[str, Any], counts: Dict[str, int]) -> None:
+    # section offsets are relative to the (aligned) end of the header
+    layout: Dict[str, Dict[str, Any]] = {}
+    rel = 0
+    for name, data in sections.items():
+        if isinstance(data, array):
+            typecode, nbytes, length = data.typecode, len(data) * data.itemsize, len(data)
+        else:
+            typecode, nbytes, length = "B", len(data), len(data)
+        layout[name] = {"offset": rel, "length": length, "typecode": typecode}
+        rel += nbytes + _pad(nbytes)
+
+    header = {
+        "version": FORMAT_VERSION,
+        "byteorder": sys.byteorder,
+        "result_id": uuid.uuid4().hex,
+        "counts": counts,
+        "sections": layout,
+    }
+    header_bytes = json.dumps(header, ensure_ascii=False).encode("utf-8")
+    prefix = len(MAGIC) + 4 + len(header_bytes)
+
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    with tmp.open("wb") as f:
+        f.write(MAGIC)
+        f.write(struct.pack("<I", len(header_bytes)))
+        f.write(header_bytes)
+        f.write(b"\0" * _pad(prefix))
+        for data in sections.values():
+            raw = data.tobytes() if isinstance(data, array) else data
+            f.write(raw)
+            f.write(b"\0" * _pad(len(raw)))
+    os.replace(tmp, path)
+
+
+class JobResult:
+    """
+    Read-only view over a result.bin file. Columns are memoryviews into an mmap;
+    strings are decoded on demand.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        with path.open("rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        buf = memoryview(self._mm)
+        if bytes(buf[: len(MAGIC)]) != MAGIC:
+            raise ValueError(f"not a result file: {path}")
+        (hlen,) = struct.unpack_from("<I", buf, len(MAGIC))
+        start = len(MAGIC) + 4
+        self.header: Dict[str, Any] = json.loads(bytes(buf[start : start + hlen]).decode("utf-8"))
+        if self.header.get("version") != FORMAT_VERSION:
+            raise ValueError(f"unsupported result version: {self.header.get('version')}")
+        if self.header.get("byteorder") != sys.byteorder:
+            raise ValueError("result file was written on a machine with different byte order")
+
+        self._buf = buf
+        self._data_start = start + hlen + _pad(start + hlen)
+        self._noun_ids: Optional[Dict[str, int]] = None
+        self._noun_list: Optional[List[str]] = None
+        self._search: Optional[NounSearchIndex] = None
+        # per-noun dictionary flags, attached by annotations.py while this reader is alive
+        self.annotations: Optional[Any] = None
+
+        self.noun_text = self.section("noun_text")
+        self.noun_offsets = self.section("noun_offsets")
+        self.noun_counts = self.section("noun_counts")
+        self.sentence_text = self.section("sentence_text")
+        self.sentence_offsets = self.section("sentence_offsets")
+        self.occ_page = self.section("occ_page")
+        self.occ_line = self.section("occ_line")
+        self.occ_sentence = self.section("occ_sentence")
+        self.occ_start = self.section("occ_start")
+        self._orders: Dict[str, Any] = {"count_desc": range(self.noun_count)}
+        if "order_alpha" in self.header["sections"]:
+            self._orders["count_asc"] = self.section("order_count_asc")
+            self._orders["alpha"] = self.section("order_alpha")
+        else:
+            computed = _sort_orders(self.nouns(), self.noun_counts)
+            self._orders["count_asc"] = computed["order_count_asc"]
+            self._orders["alpha"] = computed["order_alpha"]
+
+    def section(self, name: str) -> memoryview:
+        meta = self.header["sections"][name]
+        typecode = meta["typecode"]
+        itemsize = array(typecode).itemsize
+        start = self._data_start + int(meta["offset"])
+        view = self._buf[start : start + int(meta["length"]) * itemsize]
+        return view if typecode == "B" else view.cast(typecode)
+
+    def close(self) -> None:
+        for name in list(vars(self)):
+            if isinstance(getattr(self, name), memoryview):
+                getattr(self, name).release()
+        self._mm.close()
+
+    def __enter__(self) -> "JobResult":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    @property
+    def result_id(self) -> str:
+        """
+        Identity of this particular result file; changes whenever it is rewritten.
+        """
+        return self.header.get("result_id") or f"mtime:{self.path.stat().st_mtime_ns}"
+
+    @property
+    def noun_count(self) -> int:
+        return int(self.header["counts"]["nouns"])
+
+    @property
+    def sentence_count(self) -> int:
+        return len(self.sentence_offsets) - 1
+
+    def noun(self, noun_id: int) -> str:
+        return bytes(self.noun_text[self.noun_offsets[noun_id] : self.noun_offsets[noun_id + 1]]).decode("utf-8")
+
+    def nouns(self) -> List[str]:
+        if self._noun_list is None:
+            raw = bytes(self.noun_text)
+            offs = self.noun_offsets
+            self._noun_list = [raw[offs[i] : offs[i + 1]].decode("utf-8") for i in range(self.noun_count)]
+        return self._noun_list
+
+    def order(self, sort: str) -> Any:
+        """
+        Noun ids in the given sort order (unknown sorts fall back to count_desc).
+        """
+        return self._orders.get(sort, self._orders["count_desc"])
+
+    @property
+    def search_index(self) -> NounSearchIndex:
+        if self._search is None:
+            self._search = NounSearchIndex(self)
+        return self._search
+
+    def noun_id(self, noun: str) -> Optional[int]:
+        if self._noun_ids is None:
+            self._noun_ids = {n: i for i, n in enumerate(self.nouns())}
+        return self._noun_ids.get(noun)
+
+    def sentence(self, sentence_id: int) -> str:
+        offs = self.sentence_offsets
+        return bytes(self.sentence_text[offs[sentence_id] : offs[sentence_id + 1]]).decode("utf-8")
+
+    def occurrence_range(
+        self, noun_id: int, page_from: Optional[int] = None, page_to: Optional[int] = None
+    ) -> Tuple[int, int]:
+        """
+        [lo, hi) rows of a noun's occurrences, narrowed to an inclusive page
+        range by binary search over occ_page (rows are in page/line order).
+        """
+        lo, hi = self.occ_start[noun_id], self.occ_start[noun_id + 1]
+        if page_from is not None:
+            lo = bisect_left(self.occ_page, page_from, lo, hi)
+        if page_to is not None:
+            hi = bisect_right(self.occ_page, page_to, lo, hi)
+        return lo, hi
+
+    def occurrence(self, row: int) -> Dict[str, Any]:
+        return {"page": self.occ_page[row], "line": self.occ_line[row], "sentence": self.sentence(self.occ_sentence[row])}
+
+    def occurrences(self, noun_id: int) -> List[Dict[str, Any]]:
+        lo, hi = self.occurrence_range(noun_id)
+        return [self.occurrence(i) for i in range(lo, hi)]
+
+    def to_index(self) -> Dict[str, Any]:
+        """
+        Materialize the {"nouns", "occurrences_by_noun"} shape accepted by write_result.
+        """
+        nouns = self.nouns()
+        return {
+            "nouns": [{"noun": n, "count": self.noun_counts[i]} for i, n in enumerate(nouns)],
+            "occurrences_by_noun": {n: self.occurrences(i) for i, n in enumerate(nouns)},
+        }
+
+
+def open_result(path: Path) -> JobResult:
+    return JobResult(path)
+
+
+# ---------- in-process cache of opened results ----------
+# rough per-noun cost of the decoded noun list and noun -> id map
+_NOUN_OVERHEAD_BYTES = 160
+
+
+def _cache_budget_bytes() -> int:
+    raw = os.getenv("WORD_FETCHER_RESULT_CACHE_MB", "").strip()
+    try:
+        mb = float(raw) if raw else 256.0
+    except ValueError:
+        mb = 256.0
+    return int(mb * 1024 * 1024)
+
+
+class ResultCache:
+    """
+    Bounded LRU of opened JobResult objects keyed by job id and file mtime.
+    Entries are charged their file size plus decoded-noun overhead and evicted
+    least-recently-used first once the memory budget is exceeded. A rewritten
+    result file (new mtime) is reloaded transparently.
+    """
+
+    def __init__(self, budget_bytes: int):
+        self.budget_bytes = budget_bytes
+        self._entries: "OrderedDict[str, Tuple[int, int, JobResult]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, job_id: str, path: Path) -> JobResult:
+        mtime = path.stat().st_mtime_ns
+        with self._lock:
+            entry = self._entries.get(job_id)
+            if entry is not None and entry[0] == mtime:
+                self._entries.move_to_end(job_id)
+                self.hits += 1
+                return entry[2]
+            self.misses += 1
+
+        # open outside the lock; a concurrent miss on the same job just loads twice
+        result = open_result(path)
+        size = path.stat().st_size + result.noun_count * _NOUN_OVERHEAD_BYTES
+        with self._lock:
+            self._drop(job_id)
+            self._entries[job_id] = (mtime, size, result)
+            self._bytes += size
+            # always keep the entry just loaded, even if it alone exceeds the budget
+            while self._bytes > self.budget_bytes and len(self._entries) > 1:
+                oldest = next(iter(self._entries))
+                self._drop(oldest)
+                self.evictions += 1
+        return result
+
+    def _drop(self, job_id: str) -> None:
+        # readers are not closed here: a request may still hold one; the mmap
+        # is released once the last reference goes away
+        entry = self._entries.pop(job_id, None)
+        if entry is not None:
+            self._bytes -= entry[1]
+
+    def loaded(self) -> List[Tuple[str, JobResult]]:
+        """
+        Snapshot of (job_id, result) for every cached result.
+        """
+        with self._lock:
+            return [(job_id, entry[2]) for job_id, entry in self._entries.items()]
+
+    def invalidate(self, job_id: str) -> None:
+        with self._lock:
+            self._drop(job_id)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "budget_bytes": self.budget_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            }
+
+
+result_cache = ResultCache(_cache_budget_bytes())
@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+import heapq
+import itertools
+import logging
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class QueueFullError(Exception):
+    pass
+
+
+def _env_int(name: str, default: int) -> int:
+    raw = os.getenv(name, "").strip()
+    try:
+        return max(1, int(raw)) if raw else default
+    except ValueError:
+        return default
+
+
+class JobScheduler:
+    """
+    Fixed pool of worker threads fed from a bounded priority queue.
+
+    Jobs with a lower priority value run first; equal priorities are FIFO.
+    Workers are separate from the web server's request threads and are started
+    lazily on the first submit.
+    """
+
+    def __init__(
+        self,
+        run: Callable[[str], None],
+        workers: int,
+        max_queue: int,
+        on_start: Optional[Callable[[str, float], None]] = None,
+    ):
+        """
+        on_start(job_id, queue_wait_seconds) runs on the worker right before a job.
+        """
+        self._run = run
+        self.workers = workers
+        self.max_queue = max_queue
+        self._on_start = on_start
+        # (priority, seq, job_id, task, enqueued_at)
+        self._heap: List[Tuple[int, int, str, Optional[Callable[[], None]], float]] = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._threads: List[threading.Thread] = []
+        self._running: set[str] = set()
+
+    def _ensure_workers(self) -> None:
+        while len(self._threads) < self.workers:
+            t = threading.Thread(target=self._worker, name=f"job-worker-{len(self._threads)}", daemon=True)
+            self._threads.append(t)
+            t.start()
+
+    def has_capacity(self) -> bool:
+        with self._cond:
+            return len(self._heap) < self.max_queue
+
+    def submit(self, job_id: str, priority: int = 0, task: Optional[Callable[[], None]] = None) -> int:
+        """
+        Queue a job; returns its 1-based queue position. Raises QueueFullError.
+        task overrides the default run(job_id) (e.g. re-indexing an existing job).
+        """
+        with self._cond:
+            if len(self._heap) >= self.max_queue:
+                raise QueueFullError(f"job queue is full ({self.max_queue})")
+            entry = (int(priority), next(self._seq), job_id, task, time.monotonic())
+            heapq.heappush(self._heap, entry)
+            self._ensure_workers()
+            self._cond.notify()
+            return sorted(self._heap).index(entry) + 1
+
+    def position(self, job_id: str) -> Optional[int]:
+        """
+        1-based position among queued jobs, None if not queued.
+        """
+        with self._cond:
+            for i, entry in enumerate(sorted(self._heap), start=1):
+                if entry[2] == job_id:
+                    return i
+        return None
+
+    def _worker(self) -> None:
+        while True:
+            with self._cond:
+                while not self._heap:
+                    self._cond.wait()
+                _prio, _seq, job_id, task, enqueued_at = heapq.heappop(self._heap)
+                self._running.add(job_id)
+            try:
+                if self._on_start is not None:
+                    self._on_start(job_id, time.monotonic() - enqueued_at)
+                if task is not None:
+                    task()
+                else:
+                    self._run(job_id)
+            except Exception:  # run_job records its own errors; never kill the worker
+                logger.exception("job %s crashed", job_id)
+            finally:
+                with self._cond:
+                    self._running.discard(job_id)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            return {
+                "workers": self.workers,
+                "max_queue": self.max_queue,
+                "queued": len(self._heap),
+                "running": len(self._running),
+            }
+
+
+def scheduler_workers() -> int:
+    """
+    Jobs processed concurrently, from WORD_FETCHER_CONCURRENT_JOBS (default 1;
+    each job already fans out across WORD_FETCHER_WORKERS processes).
+    """
+    return _env_int("WORD_FETCHER_CONCURRENT_JOBS", 1)
+
+
+def scheduler_max_queue() -> int:
+    return _env_int("WORD_FETCHER_QUEUE_SIZE", 64)
@@ -0,0 +1,137 @@
+"""
+Substring / prefix search over a job's noun vocabulary.
+
+The index maps every character unigram and bigram to the sorted ids of the
+nouns containing it. A query of length >= 2 intersects the postings of its
+bigrams (shortest list first) and verifies the survivors, so cost follows the
+number of candidates rather than the vocabulary size. Prefix queries binary
+search the precomputed alpha order instead.
+"""
+
+from __future__ import annotations
+
+from array import array
+from bisect import bisect_left
+from typing import Any, Dict, List, Sequence, Tuple
+
+
+def _grams(text: str) -> set[str]:
+    out = set(text)
+    out.update(text[i : i + 2] for i in range(len(text) - 1))
+    return out
+
+
+def build_search_sections(nouns: Sequence[str]) -> Dict[str, Any]:
+    """
+    Sections for result.bin: gram string table plus postings (noun ids) with
+    per-gram row offsets, grams in sorted order.
+    """
+    postings: Dict[str, array] = {}
+    for noun_id, noun in enumerate(nouns):
+        for g in _grams(noun):
+            postings.setdefault(g, array("I")).append(noun_id)
+
+    grams = sorted(postings)
+    gram_offsets = array("Q", [0])
+    gram_start = array("Q", [0])
+    gram_postings = array("I")
+    chunks: List[bytes] = []
+    pos = 0
+    for g in grams:
+        b = g.encode("utf-8")
+        chunks.append(b)
+        pos += len(b)
+        gram_offsets.append(pos)
+        gram_postings.extend(postings[g])
+        gram_start.append(len(gram_postings))
+    return {
+        "gram_text": b"".join(chunks),
+        "gram_offsets": gram_offsets,
+        "gram_postings": gram_postings,
+        "gram_start": gram_start,
+    }
+
+
+class NounSearchIndex:
+    """
+    Query-side view of the gram index of one JobResult.
+    """
+
+    def __init__(self, result: Any):
+        self._result = result
+        if "gram_postings" in result.header["sections"]:
+            names = ("gram_text", "gram_offsets", "gram_start", "gram_postings")
+            sections = {name: result.section(name) for name in names}
+        else:
+            # result written before the index existed: build it in memory
+            sections = build_search_sections(result.nouns())
+        raw = bytes(sections["gram_text"])
+        offs = sections["gram_offsets"]
+        start = sections["gram_start"]
+        self._postings_data: Sequence[int] = sections["gram_postings"]
+        self._gram_rows: Dict[str, Tuple[int, int]] = {
+            raw[offs[i] : offs[i + 1]].decode("utf-8"): (start[i], start[i + 1]) for i in range(len(offs) - 1)
+        }
+
+    def _postings(self, gram: str) -> Sequence[int]:
+        row = self._gram_rows.get(gram)
+        if row is None:
+            return ()
+        return self._postings_data[row[0] : row[1]]
+
+    def substring(self, q: str) -> List[int]:
+        if len(q) == 1:
+            return list(self._postings(q))
+        lists = sorted((self._postings(q[i : i + 2]) for i in range(len(q) - 1)), key=len)
+        if not lists[0]:
+            return []
+        candidates = set(lists[0])
+        for lst in lists[1:]:
+            candidates.intersection_update(lst)
+            if not candidates:
+                return []
+        if len(q) == 2:
+            return sorted(candidates)
+        nouns = self._result.nouns()
+        return sorted(i for i in candidates if q in nouns[i])
+
+    def prefix(self, q: str) -> List[int]:
+        nouns = self._result.nouns()
+        alpha = self._result.order("alpha")
+        keys = _AlphaKeys(alpha, nouns)
+        lo = bisect_left(keys, q)
+        # every string with prefix q sorts before q + U+10FFFF
+        hi = bisect_left(keys, q + "\U0010ffff", lo)
+        return list(alpha[lo:hi])
+
+
+class _AlphaKeys:
+    """
+    Sequence adapter so bisect can search nouns through the alpha permutation.
+    """
+
+    def __init__(self, order: Sequence[int], nouns: Sequence[str]):
+        self._order = order
+        self._nouns = nouns
+
+    def __len__(self) -> int:
+        return len(self._order)
+
+    def __getitem__(self, i: int) -> str:
+        return self._nouns[self._order[i]]
+
+
+def match_spans(noun: str, q: str, prefix: bool = False) -> List[List[int]]:
+    """
+    [start, end) character offsets of q inside noun, for frontend highlighting.
+    """
+    if not q:
+        return []
+    if prefix:
+        return [[0, len(q)]] if noun.startswith(q) else []
+    spans: List[List[int]] = []
+    i = noun.find(q)
+    while i >= 0:
+        spans.append([i, i + len(q)])
+        i = noun.find(q, i + len(q))
+    return spans
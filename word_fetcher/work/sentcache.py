@@ -0,0 +1,216 @@
+"""
+Memo of per-sentence noun extraction, shared by all jobs.
+
+Templated documents repeat the same clauses, headers and footers on every page
+and across uploads; a sentence seen before skips jieba/LTP entirely. Entries
+are keyed by a hash of the sentence within a namespace made of the analyzer
+mode and the dictionary and stopword versions, so any dictionary edit starts a
+fresh namespace instead of serving stale segmentation.
+
+Tier 1 is an in-process LRU bounded by entry count. Page-shard pool workers
+keep their own; what they add is also handed back to the parent when their
+shard finishes (begin_export/export/absorb), so it outlives the workers. Tier 2 (optional) is a sqlite file under data/cache shared
+by every process and surviving restarts.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+Nouns = Tuple[Tuple[str, str], ...]
+
+_COUNTERS = ("hits", "disk_hits", "misses")
+
+
+def _digest(sentence: str) -> bytes:
+    return hashlib.blake2b(sentence.encode("utf-8"), digest_size=16).digest()
+
+
+class SentenceCache:
+    def __init__(self, max_entries: int, disk_path: Optional[Path] = None):
+        self.max_entries = max_entries
+        self.disk_path = disk_path
+        self._mem: "OrderedDict[bytes, Nouns]" = OrderedDict()
+        self._ns = ""
+        self._lock = threading.Lock()
+        self._db: Optional[sqlite3.Connection] = None
+        self._db_pid = 0
+        self.counters: Dict[str, int] = dict.fromkeys(_COUNTERS, 0)
+        # set between begin_export() and export() in a pool worker
+        self._export: Optional[Dict[str, Any]] = None
+        if hasattr(os, "register_at_fork"):
+            os.register_at_fork(after_in_child=self._after_fork)
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0
+
+    def _after_fork(self) -> None:
+        # the parent may have held the lock mid-fork; the child counts its own
+        # lookups so the parent can add them up (see absorb)
+        self._lock = threading.Lock()
+        self._db = None
+        self.counters = dict.fromkeys(_COUNTERS, 0)
+        self._export = None
+
+    def _switch(self, ns: str) -> None:
+        if ns != self._ns:
+            self._mem.clear()
+            self._ns = ns
+
+    def _conn(self) -> Optional[sqlite3.Connection]:
+        if self.disk_path is None:
+            return None
+        if self._db is None or self._db_pid != os.getpid():
+            self.disk_path.parent.mkdir(parents=True, exist_ok=True)
+            db = sqlite3.connect(str(self.disk_path), timeout=30, check_same_thread=False)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS sentences ("
+                " ns TEXT NOT NULL, key BLOB NOT NULL, nouns TEXT NOT NULL,"
+                " PRIMARY KEY (ns, key)) WITHOUT ROWID"
+            )
+            self._db, self._db_pid = db, os.getpid()
+        return self._db
+
+    def lookup(self, ns: str, sentences: Sequence[str]) -> List[Optional[Nouns]]:
+        """
+        Cached nouns per sentence, None for misses.
+        """
+        keys = [_digest(s) for s in sentences]
+        out: List[Optional[Nouns]] = [None] * len(keys)
+        with self._lock:
+            self._switch(ns)
+            missing: Dict[bytes, List[int]] = {}
+            for i, key in enumerate(keys):
+                hit = self._mem.get(key)
+                if hit is not None:
+                    self._mem.move_to_end(key)
+                    out[i] = hit
+                    self.counters["hits"] += 1
+                else:
+                    missing.setdefault(key, []).append(i)
+            if missing:
+                for key, nouns in self._disk_get(ns, list(missing)):
+                    self._remember(key, nouns)
+                    for i in missing.pop(key):
+                        out[i] = nouns
+                        self.counters["disk_hits"] += 1
+            self.counters["misses"] += sum(len(v) for v in missing.values())
+        return out
+
+    def store(self, ns: str, items: Sequence[Tuple[str, Nouns]]) -> None:
+        rows = [(_digest(sentence), nouns) for sentence, nouns in items]
+        with self._lock:
+            self._switch(ns)
+            for key, nouns in rows:
+                self._remember(key, nouns)
+            self._disk_put(ns, rows)
+            if self._export is not None and self._export["size"] < self.max_entries:
+                self._export["entries"].append((ns, rows))
+                self._export["size"] += len(rows)
+
+    def _remember(self, key: bytes, nouns: Nouns) -> None:
+        self._mem[key] = nouns
+        self._mem.move_to_end(key)
+        while len(self._mem) > self.max_entries:
+            self._mem.popitem(last=False)
+
+    def _disk_get(self, ns: str, keys: List[bytes]) -> List[Tuple[bytes, Nouns]]:
+        db = self._conn()
+        if db is None:
+            return []
+        found: List[Tuple[bytes, Nouns]] = []
+        try:
+            for i in range(0, len(keys), 500):
+                chunk = keys[i : i + 500]
+                marks = ",".join("?" * len(chunk))
+                rows = db.execute(f"SELECT key, nouns FROM sentences WHERE ns = ? AND key IN ({marks})", [ns, *chunk])
+                found.extend((bytes(k), tuple(tuple(x) for x in json.loads(v))) for k, v in rows)
+        except sqlite3.Error:
+            logger.exception("sentence cache read failed")
+        return found
+
+    def _disk_put(self, ns: str, rows: List[Tuple[bytes, Nouns]]) -> None:
+        db = self._conn()
+        if db is None or not rows:
+            return
+        try:
+            with db:
+                db.executemany(
+                    "INSERT OR IGNORE INTO sentences (ns, key, nouns) VALUES (?, ?, ?)",
+                    [(ns, key, json.dumps(nouns, ensure_ascii=False)) for key, nouns in rows],
+                )
+        except sqlite3.Error:
+            logger.exception("sentence cache write failed")
+
+    def prune_disk(self, keep_ns: str) -> None:
+        """
+        Drop on-disk entries of other namespaces (older dictionary versions).
+        """
+        with self._lock:
+            db = self._conn()
+            if db is None:
+                return
+            try:
+                with db:
+                    db.execute("DELETE FROM sentences WHERE ns != ?", (keep_ns,))
+            except sqlite3.Error:
+                logger.exception("sentence cache prune failed")
+
+    # --------- pool workers ----------
+    def begin_export(self) -> None:
+        """
+        In a pool worker: start collecting the entries this process stores and
+        the lookups it counts, for export().
+        """
+        with self._lock:
+            self._export = {"before": dict(self.counters), "entries": [], "size": 0}
+
+    def export(self) -> Dict[str, Any]:
+        """
+        Counters and new entries since begin_export(), picklable for the parent.
+        """
+        with self._lock:
+            exp, self._export = self._export, None
+            before = exp["before"] if exp else {}
+            counters = {name: self.counters[name] - before.get(name, 0) for name in _COUNTERS}
+        return {"counters": counters, "entries": exp["entries"] if exp else []}
+
+    def absorb(self, exported: Dict[str, Any]) -> None:
+        """
+        In the parent: add a worker's counters and keep the entries it stored
+        (memory tier only; the worker already wrote the disk tier).
+        """
+        with self._lock:
+            for name in _COUNTERS:
+                self.counters[name] += int(exported.get("counters", {}).get(name, 0))
+            for ns, rows in exported.get("entries", ()):
+                self._switch(ns)
+                for key, nouns in rows:
+                    self._remember(key, nouns)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            c = dict(self.counters)
+            entries = len(self._mem)
+        total = c["hits"] + c["disk_hits"] + c["misses"]
+        return {
+            "enabled": self.enabled,
+            "disk": self.disk_path is not None,
+            "entries": entries,
+            "max_entries": self.max_entries,
+            **c,
+            "hit_rate": round((c["hits"] + c["disk_hits"]) / total, 4) if total else 0.0,
+        }
@@ -0,0 +1,131 @@
+"""
+In-memory job status registry.
+
+While the process runs the registry is authoritative: status reads never touch
+the disk, and every update bumps a per-job version that streaming clients
+(SSE) watch. status.json is written lazily: on state changes right away, on
+progress-only updates at most every WORD_FETCHER_STATUS_PERSIST_S seconds,
+and for everything still dirty on shutdown.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from word_fetcher.work.storage import read_json, utc_ms, write_json
+
+_TERMINAL = ("done", "error")
+
+
+def persist_interval() -> float:
+    raw = os.getenv("WORD_FETCHER_STATUS_PERSIST_S", "").strip()
+    try:
+        return float(raw) if raw else 2.0
+    except ValueError:
+        return 2.0
+
+
+class _Entry:
+    __slots__ = ("status", "version", "persisted_at", "dirty", "started")
+
+    def __init__(self, status: Dict[str, Any]):
+        self.status = status
+        self.version = 0
+        self.persisted_at = 0.0
+        self.dirty = False
+        self.started: Optional[float] = None
+
+
+class StatusRegistry:
+    def __init__(self, path_for: Callable[[str], Path], persist_interval: float):
+        self._path_for = path_for
+        self.persist_interval = persist_interval
+        self._entries: Dict[str, _Entry] = {}
+        self._lock = threading.Lock()
+
+    def set(
+        self,
+        job_id: str,
+        state: str,
+        progress: int,
+        message: str,
+        pages_done: Optional[int] = None,
+        pages_total: Optional[int] = None,
+        stats: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(job_id)
+            prev_state = entry.status.get("state") if entry is not None else None
+            if entry is None:
+                entry = self._entries[job_id] = _Entry({})
+            if state == "running" and prev_state != "running":
+                entry.started = now
+
+            status: Dict[str, Any] = {"state": state, "progress": progress, "message": message}
+            if pages_total:
+                status["pages_total"] = pages_total
+                status["pages_done"] = pages_done or 0
+                if state == "running" and pages_done and entry.started is not None:
+                    rate = (now - entry.started) / pages_done
+                    status["eta_seconds"] = round(rate * (pages_total - pages_done), 1)
+            if stats:
+                status["stats"] = stats
+            status["updated_ms"] = utc_ms()
+            entry.status = status
+            entry.version += 1
+            entry.dirty = True
+
+            # written under the lock so an older snapshot can never land last
+            if state != prev_state or state in _TERMINAL or now - entry.persisted_at >= self.persist_interval:
+                write_json(self._path_for(job_id), status)
+                entry.persisted_at = now
+                entry.dirty = False
+
+    def put(self, job_id: str, status: Dict[str, Any]) -> None:
+        """
+        Replace a job's status wholesale and persist it (e.g. rolling back).
+        """
+        with self._lock:
+            entry = self._entries.setdefault(job_id, _Entry({}))
+            entry.status = dict(status)
+            entry.version += 1
+            entry.dirty = False
+            entry.persisted_at = time.monotonic()
+            write_json(self._path_for(job_id), status)
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        return self.get_versioned(job_id)[1]
+
+    def get_versioned(self, job_id: str) -> Tuple[int, Optional[Dict[str, Any]]]:
+        with self._lock:
+            entry = self._entries.get(job_id)
+            if entry is not None:
+                return entry.version, dict(entry.status)
+        # jobs from before this process started
+        path = self._path_for(job_id)
+        if not path.exists():
+            return 0, None
+        status = read_json(path)
+        with self._lock:
+            entry = self._entries.setdefault(job_id, _Entry(status))
+            return entry.version, dict(entry.status)
+
+    def forget(self, job_id: str) -> None:
+        with self._lock:
+            self._entries.pop(job_id, None)
+
+    def flush(self) -> None:
+        """
+        Persist every status with unwritten updates.
+        """
+        with self._lock:
+            for job_id, entry in self._entries.items():
+                if entry.dirty:
+                    write_json(self._path_for(job_id), entry.status)
+                    entry.dirty = False
+                    entry.persisted_at = time.monotonic()
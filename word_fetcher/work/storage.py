@@ -8,8 +8,12 @@ from typing import Any
 
 
 def base_data_dir() -> Path:
-    root = Path(__file__).resolve().parent.parent.parent
-    d = root / "data"
+    # WORD_FETCHER_DATA_DIR relocates all data (e.g. an isolated benchmark run)
+    override = os.getenv("WORD_FETCHER_DATA_DIR", "").strip()
+    if override:
+        d = Path(override)
+    else:
+        d = Path(__file__).resolve().parent.parent.parent / "data"
     d.mkdir(parents=True, exist_ok=True)
     return d
 
@@ -26,10 +30,45 @@ def job_dir(job_id: str) -> Path:
     return d
 
 
+def result_store_dir() -> Path:
+    """
+    Content-addressed store of finished results, shared by all jobs.
+    """
+    d = base_data_dir() / "results"
+    d.mkdir(parents=True, exist_ok=True)
+    return d
+
+
+def cache_dir() -> Path:
+    """
+    Caches shared by all jobs (safe to delete).
+    """
+    d = base_data_dir() / "cache"
+    d.mkdir(parents=True, exist_ok=True)
+    return d
+
+
+def batches_dir() -> Path:
+    d = base_data_dir() / "batches"
+    d.mkdir(parents=True, exist_ok=True)
+    return d
+
+
+def corpus_path() -> Path:
+    """
+    Cross-job inverted index (noun -> jobs, counts, positions).
+    """
+    return base_data_dir() / "corpus.sqlite"
+
+
 def job_marks_path(job_id: str) -> Path:
     return job_dir(job_id) / "marks.json"
 
 
+def job_marks_log_path(job_id: str) -> Path:
+    return job_dir(job_id) / "marks.log"
+
+
 def write_json(path: Path, obj: Any) -> None:
     tmp = path.with_suffix(path.suffix + ".tmp")
     tmp.write_text(json.dumps(obj, ensure_ascii=False, indent=2), encoding="utf-8")
@@ -55,6 +94,13 @@ def custom_dict_path() -> Path:
     return dicts_dir() / "custom_dict.txt"
 
 
+def ner_terms_path() -> Path:
+    """
+    Extra terms (people, organizations, places) matched by the dictionary-only mode.
+    """
+    return dicts_dir() / "ner_terms.txt"
+
+
 def stopwords_path() -> Path:
     return dicts_dir() / "stopwords.txt"
 
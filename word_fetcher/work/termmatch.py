@@ -0,0 +1,106 @@
+"""
+Aho-Corasick matcher for the dictionary-only extraction mode.
+
+All terms are found in one left-to-right pass over the text, however many
+terms there are. Overlapping hits are resolved like a dictionary segmenter
+would: leftmost first, longest at the same start, no overlaps. Terms that
+begin or end with an ASCII letter/digit only match on ASCII word boundaries
+("AI" does not match inside "MAIL").
+"""
+
+from __future__ import annotations
+
+from collections import deque
+from typing import Dict, Iterable, List, Tuple
+
+
+def _is_ascii_word(ch: str) -> bool:
+    return ch.isascii() and ch.isalnum()
+
+
+class TermMatcher:
+    def __init__(self, terms: Iterable[str]):
+        # state 0 is the root; goto[s][ch] -> state
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        # length of the term ending at this state (0: none), and the nearest
+        # state on the fail chain that ends a term (0: none)
+        self._term_len: List[int] = [0]
+        self._out: List[int] = [0]
+        self.size = 0
+        for term in terms:
+            if term:
+                self._insert(term)
+        self._alphabet = frozenset(ch for edges in self._goto for ch in edges)
+        self._link()
+
+    def _insert(self, term: str) -> None:
+        s = 0
+        for ch in term:
+            nxt = self._goto[s].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[s][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._term_len.append(0)
+                self._out.append(0)
+            s = nxt
+        if not self._term_len[s]:
+            self.size += 1
+        self._term_len[s] = len(term)
+
+    def _link(self) -> None:
+        goto, fail, term_len, out = self._goto, self._fail, self._term_len, self._out
+        queue = deque(goto[0].values())
+        while queue:
+            s = queue.popleft()
+            for ch, t in goto[s].items():
+                f = fail[s]
+                while f and ch not in goto[f]:
+                    f = fail[f]
+                fail[t] = goto[f].get(ch, 0)
+                out[t] = fail[t] if term_len[fail[t]] else out[fail[t]]
+                queue.append(t)
+
+    def spans(self, text: str) -> List[Tuple[int, int]]:
+        """
+        Non-overlapping (start, end) of term hits, leftmost-longest, in order.
+        """
+        goto, fail, term_len, out, alphabet = self._goto, self._fail, self._term_len, self._out, self._alphabet
+        hits: List[Tuple[int, int]] = []
+        s = 0
+        for i, ch in enumerate(text):
+            if ch not in alphabet:
+                s = 0
+                continue
+            while s and ch not in goto[s]:
+                s = fail[s]
+            s = goto[s].get(ch, 0)
+            t = s if term_len[s] else out[s]
+            while t:
+                hits.append((i + 1 - term_len[t], i + 1))
+                t = out[t]
+        if not hits:
+            return hits
+        # leftmost first, longest first among equal starts
+        hits.sort(key=lambda h: (h[0], h[0] - h[1]))
+        chosen: List[Tuple[int, int]] = []
+        end = 0
+        for start, stop in hits:
+            if start < end or not self._on_boundary(text, start, stop):
+                continue
+            chosen.append((start, stop))
+            end = stop
+        return chosen
+
+    @staticmethod
+    def _on_boundary(text: str, start: int, stop: int) -> bool:
+        if _is_ascii_word(text[start]) and start > 0 and _is_ascii_word(text[start - 1]):
+            return False
+        if _is_ascii_word(text[stop - 1]) and stop < len(text) and _is_ascii_word(text[stop]):
+            return False
+        return True
+
+    def find(self, text: str) -> List[str]:
+        return [text[a:b] for a, b in self.spans(text)]
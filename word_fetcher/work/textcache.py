@@ -0,0 +1,195 @@
+"""
+Extracted page text kept next to each job (pages.bin), so re-processing never
+has to reopen the PDF with fitz.
+
+Layout: 8-byte magic, then one zlib-compressed block per page, then the page
+index and a fixed-size footer:
+
+    index  = count x <u32 page, u64 offset, u32 length, u32 line count>
+    footer = <u64 index offset, u32 count, 4s magic>
+
+A block holds the page's lines joined by "\\n", with paragraphs separated by
+an empty line (lines are never empty). Version 1 files have no paragraphs:
+every line reads back as its own. Blocks are compressed independently, so
+reading page N decompresses only that page. Pages are stored in page order.
+"""
+
+from __future__ import annotations
+
+import os
+import struct
+import zlib
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+
+# (page, paragraphs), each paragraph a list of lines
+PageParagraphs = Tuple[int, List[List[str]]]
+
+MAGIC = b"WFPT"
+VERSION = 2
+_HEAD = MAGIC + bytes([VERSION, 0, 0, 0])  # magic + format version
+_ENTRY = struct.Struct("<IQII")
+_FOOTER = struct.Struct("<QI4s")
+_LEVEL = 6
+
+
+class PageTextWriter:
+    def __init__(self, path: Path):
+        self.path = path
+        self._tmp = path.with_suffix(path.suffix + ".tmp")
+        self._f = self._tmp.open("wb")
+        self._f.write(_HEAD)
+        self._index: List[Tuple[int, int, int, int]] = []
+
+    def write(self, page: int, paragraphs: List[List[str]]) -> None:
+        text = "\n\n".join("\n".join(p) for p in paragraphs if p)
+        self.write_block(page, zlib.compress(text.encode("utf-8"), _LEVEL), sum(len(p) for p in paragraphs))
+
+    def write_block(self, page: int, block: bytes, line_count: int) -> None:
+        """
+        Append an already compressed page (used when merging caches).
+        """
+        self._index.append((page, self._f.tell(), len(block), line_count))
+        self._f.write(block)
+
+    def close(self) -> None:
+        index_offset = self._f.tell()
+        for entry in self._index:
+            self._f.write(_ENTRY.pack(*entry))
+        self._f.write(_FOOTER.pack(index_offset, len(self._index), MAGIC))
+        self._f.close()
+        os.replace(self._tmp, self.path)
+
+    def abort(self) -> None:
+        self._f.close()
+        self._tmp.unlink(missing_ok=True)
+
+
+class PageText:
+    """
+    Random-access reader; only the index is loaded up front.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._f = path.open("rb")
+        try:
+            head = self._f.read(len(_HEAD))
+            if head[:4] != MAGIC:
+                raise ValueError(f"not a page text cache: {path}")
+            self.version = head[4]
+            self._f.seek(-_FOOTER.size, os.SEEK_END)
+            index_offset, count, magic = _FOOTER.unpack(self._f.read(_FOOTER.size))
+            if magic != MAGIC:
+                raise ValueError(f"truncated page text cache: {path}")
+            self._f.seek(index_offset)
+            raw = self._f.read(count * _ENTRY.size)
+        except BaseException:
+            self._f.close()
+            raise
+        entries = [_ENTRY.unpack_from(raw, i * _ENTRY.size) for i in range(count)]
+        self._pages: List[int] = [e[0] for e in entries]
+        self._blocks: Dict[int, Tuple[int, int, int]] = {e[0]: (e[1], e[2], e[3]) for e in entries}
+
+    def close(self) -> None:
+        self._f.close()
+
+    def __enter__(self) -> "PageText":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self._pages)
+
+    def __contains__(self, page: int) -> bool:
+        return page in self._blocks
+
+    def pages(self) -> List[int]:
+        return list(self._pages)
+
+    def block(self, page: int) -> Tuple[bytes, int]:
+        """
+        Compressed block and line count of one page.
+        """
+        offset, length, line_count = self._blocks[page]
+        self._f.seek(offset)
+        return self._f.read(length), line_count
+
+    def _text(self, page: int) -> str:
+        block, line_count = self.block(page)
+        return zlib.decompress(block).decode("utf-8") if line_count else ""
+
+    def lines(self, page: int) -> List[str]:
+        """
+        Lines of one 1-based page; KeyError if the page is not cached.
+        """
+        return [ln for ln in self._text(page).split("\n") if ln]
+
+    def paragraphs(self, page: int) -> List[List[str]]:
+        text = self._text(page)
+        if not text:
+            return []
+        if self.version < 2:
+            return [[ln] for ln in text.split("\n")]
+        return [p.split("\n") for p in text.split("\n\n")]
+
+    def iter_pages(self, start: int = 1, stop: Optional[int] = None) -> Iterator[PageParagraphs]:
+        for page in self._pages:
+            if page < start:
+                continue
+            if stop is not None and page >= stop:
+                break
+            yield page, self.paragraphs(page)
+
+
+def tee_pages(pages: Iterable[PageParagraphs], writer: PageTextWriter) -> Iterator[PageParagraphs]:
+    """
+    Pass pages through unchanged while recording them; the cache is committed
+    only if the stream is fully consumed.
+    """
+    try:
+        for page, paragraphs in pages:
+            writer.write(page, paragraphs)
+            yield page, paragraphs
+    except BaseException:
+        writer.abort()
+        raise
+    writer.close()
+
+
+def merge_page_text(parts: List[Path], dest: Path) -> None:
+    """
+    Combine per-shard caches (already in page order) into dest without
+    recompressing.
+    """
+    writer = PageTextWriter(dest)
+    try:
+        for part in parts:
+            with PageText(part) as src:
+                if src.version != VERSION:
+                    raise ValueError(f"page text cache version {src.version}: {part}")
+                for page in src.pages():
+                    block, line_count = src.block(page)
+                    writer.write_block(page, block, line_count)
+    except BaseException:
+        writer.abort()
+        raise
+    writer.close()
+    for part in parts:
+        part.unlink(missing_ok=True)
+
+
+def iter_page_text(path: Path, start: int = 1, stop: Optional[int] = None) -> Iterator[PageParagraphs]:
+    """
+    Yield (page, paragraphs) for 1-based pages in [start, stop).
+    """
+    with PageText(path) as text:
+        yield from text.iter_pages(start, stop)
+
+
+def read_page(path: Path, page: int) -> List[str]:
+    with PageText(path) as text:
+        return text.lines(page)